@@ -4,16 +4,21 @@
 ResumAI API - FastAPI REST API for Resume Evaluation
 Endpoints para avaliar currículos usando ML + Rule-Based Scoring
 """
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from bson import ObjectId
 import logging
+import os
 
 from app.db.mongo import get_db
-from app.scoring.hybrid_scorer import HybridScorer
+from app.ml.model_registry import registry
+from app.nlp.analysis_cache import analysis_cache
+from app.scoring.feature_store import get_feature_store
+from app.scoring.rubric import RubricError, get_rubric, reload_rubric, rubric_from_dict, set_rubric
+from app.scoring.hybrid_scorer import HybridScorer, get_hybrid_scorer, DEFAULT_MODEL_PATH
 from app.scoring.use_case import evaluate_resume_from_doc
 
 # Configurar logging
@@ -38,17 +43,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Scorer híbrido singleton
-_scorer = None
-
 def get_scorer() -> HybridScorer:
-    """Dependency injection para scorer"""
-    global _scorer
-    if _scorer is None:
-        logger.info("Carregando HybridScorer...")
-        _scorer = HybridScorer()
-        logger.info("HybridScorer carregado com sucesso!")
-    return _scorer
+    """Dependency injection para scorer (instância compartilhada do registro de modelos)"""
+    return get_hybrid_scorer()
 
 
 # ==================== Modelos Pydantic ====================
@@ -56,6 +53,7 @@ def get_scorer() -> HybridScorer:
 class EvaluationRequest(BaseModel):
     resume_text: str = Field(..., description="Texto do currículo", min_length=100)
     job_description: Optional[str] = Field(None, description="Descrição da vaga (opcional)")
+    deadline_ms: Optional[float] = Field(None, description="Orçamento de latência: etapas caras que não cabem usam o fallback", gt=0)
     
     class Config:
         schema_extra = {
@@ -74,6 +72,8 @@ class EvaluationResponse(BaseModel):
     method: str = Field(..., description="Método usado (hybrid/rule_based/ml_only)")
     is_experienced: bool = Field(..., description="Classificação de experiência")
     explanation: Dict[str, List[str]] = Field(..., description="Explicação dos subscores")
+    timings: Dict[str, Any] = Field(default_factory=dict, description="Tempo por ramo (ml, rule_based) e etapa em ms")
+    degraded: List[str] = Field(default_factory=list, description="Etapas trocadas pelo fallback por falta de tempo (deadline_ms)")
     
     class Config:
         schema_extra = {
@@ -120,12 +120,22 @@ class FeatureExtractionResponse(BaseModel):
     sections_present: int
 
 
+class RubricDefinition(BaseModel):
+    version: str = Field(..., description="Versão do rubric (gravada em scores.version)")
+    cutoffs: Dict[str, float] = Field(..., description="Cutoff Bom/Ruim por agente (noexp, experienced)")
+    weights: Dict[str, Dict[str, float]] = Field(..., description="Peso de cada subscore por agente")
+
+
 class HealthResponse(BaseModel):
     status: str
     timestamp: str
     models_loaded: bool
     database_connected: bool
     version: str
+    models: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="Tempo de carga e memória por modelo")
+    analysis_cache: Dict[str, Any] = Field(default_factory=dict, description="Hits/misses do cache de análise NLP")
+    rubric_version: Optional[str] = Field(None, description="Versão do rubric ativo")
+    feature_store: Dict[str, Any] = Field(default_factory=dict, description="Versão e hits/misses do feature store")
 
 
 # ==================== Endpoints ====================
@@ -148,6 +158,22 @@ async def root():
     }
 
 
+# semantic tem peso zero no rubric: é pedido explicitamente quando há vaga (semantic_match)
+SEMANTIC = ("semantic",)
+
+
+def _semantic_if(job_description: Optional[str]) -> tuple:
+    return SEMANTIC if job_description else ()
+
+
+def _feature_store_stats() -> Dict[str, Any]:
+    # Não abre o store só para o health check
+    if not registry.is_loaded("feature_store"):
+        return {}
+    store = get_feature_store()
+    return store.stats() if store is not None else {}
+
+
 @app.get("/health", response_model=HealthResponse, tags=["Monitoring"])
 async def health_check():
     """Health check - verifica status da API e dependências"""
@@ -162,14 +188,18 @@ async def health_check():
         logger.error(f"Erro ao conectar MongoDB: {e}")
     
     # Verificar se modelos estão carregados
-    models_loaded = _scorer is not None
+    models_loaded = registry.is_loaded(f"hybrid_scorer:{DEFAULT_MODEL_PATH}")
     
     return HealthResponse(
         status="healthy" if (db_connected and models_loaded) else "degraded",
         timestamp=datetime.utcnow().isoformat(),
         models_loaded=models_loaded,
         database_connected=db_connected,
-        version="1.0.0"
+        version="1.0.0",
+        models=registry.stats(),
+        analysis_cache=analysis_cache.stats(),
+        rubric_version=get_rubric().version,
+        feature_store=_feature_store_stats()
     )
 
 
@@ -194,11 +224,11 @@ async def evaluate_resume(
         }
         
         # Avaliar com scorer híbrido
-        result = scorer.score(doc)
+        result = scorer.score(doc, require=_semantic_if(request.job_description), deadline=request.deadline_ms)
         
-        # Extrair semantic score se disponível
+        # Extrair semantic score se disponível (não calculado quando degradado pelo deadline)
         semantic_match = None
-        if request.job_description:
+        if request.job_description and "semantic" not in result.get('degraded', []):
             semantic_match = result.get('rb_subscores', {}).get('semantic', None)
         
         return EvaluationResponse(
@@ -208,7 +238,9 @@ async def evaluate_resume(
             subscores=result['rb_subscores'],
             method=result.get('method', 'hybrid'),
             is_experienced=result.get('is_experienced', False),
-            explanation=result.get('explain', {})
+            explanation=result.get('explain', {}),
+            timings=result.get('timings', {}),
+            degraded=result.get('degraded', [])
         )
         
     except Exception as e:
@@ -241,7 +273,7 @@ async def evaluate_by_id(
             doc["job_description"] = job_description
         
         # Avaliar
-        result = scorer.score(doc)
+        result = scorer.score(doc, use_store=True, require=_semantic_if(job_description))
         
         semantic_match = None
         if job_description:
@@ -254,7 +286,9 @@ async def evaluate_by_id(
             subscores=result['rb_subscores'],
             method=result.get('method', 'hybrid'),
             is_experienced=result.get('is_experienced', False),
-            explanation=result.get('explain', {})
+            explanation=result.get('explain', {}),
+            timings=result.get('timings', {}),
+            degraded=result.get('degraded', [])
         )
         
     except HTTPException:
@@ -291,25 +325,32 @@ async def rank_resumes(
         if not resumes:
             raise HTTPException(status_code=404, detail="Nenhum currículo encontrado")
         
-        # Avaliar todos
-        results = []
+        # Avaliar todos de uma vez (features, ML e rubric em lote)
         for resume in resumes:
-            try:
-                resume["job_description"] = request.job_description
-                evaluation = scorer.score(resume)
-                
-                results.append({
-                    "resume_id": str(resume["_id"]),
-                    "filename": resume.get("filename", "unknown"),
-                    "score": evaluation['score'],
-                    "label": evaluation['label'],
-                    "semantic_match": evaluation.get('rb_subscores', {}).get('semantic', 0),
-                    "is_experienced": evaluation.get('is_experienced', False),
-                    "skills": resume.get("skills", [])[:5]  # Top 5 skills
-                })
-            except Exception as e:
-                logger.warning(f"Erro ao avaliar currículo {resume['_id']}: {e}")
-                continue
+            resume["job_description"] = request.job_description
+        try:
+            evaluated = list(zip(resumes, scorer.score_batch(resumes, use_store=True, require=SEMANTIC)))
+        except Exception as e:
+            # Um currículo malformado derruba o lote: avalia um a um e pula só os que falham
+            logger.warning(f"Erro ao avaliar lote de currículos, avaliando individualmente: {e}")
+            evaluated = []
+            for resume in resumes:
+                try:
+                    evaluated.append((resume, scorer.score(resume, use_store=True, require=SEMANTIC)))
+                except Exception as e:
+                    logger.warning(f"Erro ao avaliar currículo {resume['_id']}: {e}")
+        
+        results = []
+        for resume, evaluation in evaluated:
+            results.append({
+                "resume_id": str(resume["_id"]),
+                "filename": resume.get("filename", "unknown"),
+                "score": evaluation['score'],
+                "label": evaluation['label'],
+                "semantic_match": evaluation.get('rb_subscores', {}).get('semantic', 0),
+                "is_experienced": evaluation.get('is_experienced', False),
+                "skills": resume.get("skills", [])[:5]  # Top 5 skills
+            })
         
         # Ordenar por score
         results.sort(key=lambda x: x['score'], reverse=True)
@@ -397,6 +438,49 @@ async def get_statistics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ==================== Administração ====================
+
+def _check_admin(token: Optional[str]) -> None:
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="ADMIN_TOKEN não configurado")
+    if token != expected:
+        raise HTTPException(status_code=403, detail="Token inválido")
+
+
+@app.get("/admin/rubric", tags=["Admin"])
+async def get_active_rubric():
+    """Rubric ativo neste processo (versão, pesos e cutoffs)"""
+    return get_rubric().to_dict()
+
+
+@app.post("/admin/rubric", tags=["Admin"])
+async def update_rubric(
+    definition: Optional[RubricDefinition] = None,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Troca o rubric sem reiniciar a API (modelos continuam carregados)
+    
+    - Sem corpo: relê RUBRIC_FILE (ou volta ao padrão de config.py)
+    - Com corpo: ativa a definição enviada neste processo
+    
+    Com vários workers, prefira editar RUBRIC_FILE: cada worker recarrega sozinho.
+    Requer o header X-Admin-Token igual a ADMIN_TOKEN.
+    """
+    _check_admin(x_admin_token)
+    try:
+        if definition is None:
+            rubric = reload_rubric()
+        else:
+            rubric = rubric_from_dict(definition.model_dump(), source="api")
+            set_rubric(rubric)
+    except RubricError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    logger.info(f"🔄 Rubric {rubric.version} ativo ({rubric.source})")
+    return rubric.to_dict()
+
+
 # ==================== Eventos de Startup/Shutdown ====================
 
 @app.on_event("startup")
@@ -408,6 +492,8 @@ async def startup_event():
     # Pre-carregar scorer
     try:
         get_scorer()
+        for name, info in registry.stats().items():
+            logger.info(f"   {name}: {info['load_seconds']:.2f}s, +{info['rss_delta_mb']:.0f} MB")
         logger.info("✅ Modelos carregados com sucesso!")
     except Exception as e:
         logger.error(f"❌ Erro ao carregar modelos: {e}")
@@ -0,0 +1,457 @@
+"""
+Exporta dados_processados, features numéricas e evaluations para Parquet
+particionado por categoria (layout hive: <dataset>/category=<CAT>/part-*.parquet).
+
+A exportação é incremental: cada dataset guarda o último _id exportado em
+_export_state.json e a próxima execução só lê documentos novos. Os arquivos podem
+ser lidos localmente com memory-map (read_dataset), sem passar pelo MongoDB.
+
+Cada execução grava em _staging/<dataset>-<run_id> e só move os arquivos para o
+dataset depois de salvar o estado: uma execução interrompida não deixa linhas
+que seriam exportadas de novo (o staging órfão é apagado na execução seguinte).
+
+Cada dataset tem schema fixo (dataset_schema), igual em todos os arquivos, para a
+leitura de vários arquivos juntos não depender dos valores de cada lote.
+
+Limitação: o incremental só segue _id. Documentos reprocessados no lugar (mesmo
+_id, ex.: recalcular_experiencia) não são exportados de novo; depois de um
+reprocessamento rode com --full, que substitui os datasets escolhidos.
+
+Uso:
+    python -m app.db.exportar_parquet --out-dir data/parquet
+    python -m app.db.exportar_parquet --datasets dados_processados features --full
+"""
+from __future__ import annotations
+
+import argparse
+import json as _json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None  # type: ignore
+
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None  # type: ignore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+
+DATASETS = ("dados_processados", "features", "evaluations")
+STATE_FILE = "_export_state.json"
+STAGING_DIR = "_staging"
+STAGED_KEY = "_staged"  # execuções gravadas no estado e ainda não movidas para o dataset
+UNKNOWN_CATEGORY = "UNKNOWN"
+
+
+def setup_logging() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
+def load_env() -> None:
+    if load_dotenv:
+        load_dotenv()
+
+
+# ======================== CONVERSÃO DE LINHAS ========================
+
+def processed_row(doc: Dict) -> Dict:
+    """Linha plana de dados_processados (experiências serializadas em JSON)."""
+    experiences = doc.get("experiences") or []
+    metadata = doc.get("metadata") or {}
+    return {
+        "_id": str(doc["_id"]),
+        "filename": doc.get("filename"),
+        "resume_text_clean": doc.get("resume_text_clean") or "",
+        "skills": [str(s) for s in (doc.get("skills") or [])],
+        "years_experience": float(doc.get("years_experience") or 0.0),
+        "num_experiences": len(experiences),
+        "experiences_json": _json.dumps(experiences, ensure_ascii=False, default=str),
+        "pages": _pages(metadata.get("pages")),
+    }
+
+
+def feature_row_factory() -> Callable[[Dict], Dict]:
+    """Retorna conversor doc -> features do modelo não-supervisionado (import tardio)."""
+    from app.ml.unsupervised_scoring import FEATURE_NAMES, extract_features_array
+
+    def _row(doc: Dict) -> Dict:
+        values = extract_features_array(doc)
+        row = {"_id": str(doc["_id"])}
+        row.update({name: float(v) for name, v in zip(FEATURE_NAMES, values)})
+        return row
+
+    return _row
+
+
+def _pages(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def evaluation_row(doc: Dict) -> Dict:
+    """Linha plana de evaluations, com subscores em colunas score_<bloco>."""
+    scores = doc.get("scores") or {}
+    row = {
+        "_id": str(doc["_id"]),
+        "source_doc_id": str(doc.get("source_doc_id")),
+        "agent": doc.get("agent"),
+        "rubric_version": scores.get("version"),
+        "final": scores.get("final"),
+        "label": scores.get("label"),
+        "scoring_method": (doc.get("input") or {}).get("scoring_method"),
+        "created_at": str(doc.get("created_at") or ""),
+    }
+    for block, value in (scores.get("by_block") or {}).items():
+        row[f"score_{block}"] = float(value) if value is not None else None
+    return row
+
+
+def dataset_schema(dataset: str):
+    """
+    Schema fixo de cada dataset (import tardio das listas de features/blocos).
+
+    Colunas fora do schema (ex.: um bloco novo em by_block) são descartadas e
+    colunas ausentes viram null, então todos os arquivos têm as mesmas colunas.
+    """
+    if dataset == "dados_processados":
+        return pa.schema([
+            ("_id", pa.string()),
+            ("filename", pa.string()),
+            ("resume_text_clean", pa.string()),
+            ("skills", pa.list_(pa.string())),
+            ("years_experience", pa.float64()),
+            ("num_experiences", pa.int64()),
+            ("experiences_json", pa.string()),
+            ("pages", pa.int64()),
+        ])
+    if dataset == "features":
+        from app.ml.unsupervised_scoring import FEATURE_NAMES
+
+        return pa.schema([("_id", pa.string())] + [(name, pa.float64()) for name in FEATURE_NAMES])
+    if dataset == "evaluations":
+        from app.scoring.subscores import SUBSCORE_FEATURES
+
+        return pa.schema([
+            ("_id", pa.string()),
+            ("source_doc_id", pa.string()),
+            ("agent", pa.string()),
+            ("rubric_version", pa.string()),
+            ("final", pa.float64()),
+            ("label", pa.string()),
+            ("scoring_method", pa.string()),
+            ("created_at", pa.string()),
+        ] + [(f"score_{block}", pa.float64()) for block in SUBSCORE_FEATURES])
+    raise ValueError(f"Dataset desconhecido: {dataset}")
+
+
+# ======================== ESCRITA PARTICIONADA ========================
+
+class PartitionedWriter:
+    """
+    Acumula linhas por categoria e grava um arquivo Parquet por partição
+    a cada `rows_per_file` linhas, mantendo a memória limitada.
+    """
+
+    def __init__(self, root: Path, run_id: str, rows_per_file: int, schema=None):
+        self.root = root
+        self.schema = schema
+        self.run_id = run_id
+        self.rows_per_file = rows_per_file
+        self.buffers: Dict[str, List[Dict]] = {}
+        self.seq = 0
+        self.rows_written = 0
+        self.files_written = 0
+
+    def add(self, category: Optional[str], row: Dict) -> None:
+        cat = _safe_partition(category)
+        buf = self.buffers.setdefault(cat, [])
+        buf.append(row)
+        if len(buf) >= self.rows_per_file:
+            self._flush(cat)
+
+    def close(self) -> None:
+        for cat in list(self.buffers):
+            self._flush(cat)
+
+    def discard(self) -> None:
+        """Descarta as linhas ainda não gravadas (execução interrompida)."""
+        self.buffers.clear()
+
+    def _flush(self, cat: str) -> None:
+        rows = self.buffers.pop(cat, None)
+        if not rows:
+            return
+        part_dir = self.root / f"category={cat}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        path = part_dir / f"part-{self.run_id}-{self.seq:05d}.parquet"
+        self.seq += 1
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        pq.write_table(table, path, compression="zstd")
+        self.rows_written += len(rows)
+        self.files_written += 1
+
+
+def _safe_partition(category: Optional[str]) -> str:
+    cat = (category or UNKNOWN_CATEGORY).strip() or UNKNOWN_CATEGORY
+    return cat.replace("/", "_").replace("=", "_")
+
+
+def load_state(out_dir: Path) -> Dict[str, str]:
+    path = out_dir / STATE_FILE
+    if not path.exists():
+        return {}
+    return _json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_state(out_dir: Path, state: Dict[str, str]) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / (STATE_FILE + ".tmp")
+    tmp.write_text(_json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, out_dir / STATE_FILE)
+
+
+def promote_staged(out_dir: Path, state: Dict) -> None:
+    """
+    Move para os datasets as execuções registradas em state[STAGED_KEY] e apaga
+    os demais diretórios de staging (execuções que não chegaram a salvar o estado).
+    Idempotente: retomada após uma falha no meio, só move o que ainda ficou.
+    """
+    staged = state.get(STAGED_KEY) or {}
+    for dataset, entry in list(staged.items()):
+        staging = out_dir / STAGING_DIR / entry["run"]
+        target = out_dir / dataset
+        if entry.get("replace") and target.exists():
+            shutil.rmtree(target)
+            entry["replace"] = False
+            save_state(out_dir, state)
+        if staging.exists():
+            for path in sorted(staging.rglob("*.parquet")):
+                dest = target / path.relative_to(staging)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(path, dest)
+            shutil.rmtree(staging)
+        del staged[dataset]
+        if not staged:
+            state.pop(STAGED_KEY, None)
+        save_state(out_dir, state)
+
+    staging_root = out_dir / STAGING_DIR
+    if staging_root.exists():
+        for orphan in staging_root.iterdir():
+            logging.warning(f"Removendo staging de execução interrompida: {orphan}")
+            shutil.rmtree(orphan, ignore_errors=True)
+
+
+# ======================== EXPORTAÇÃO ========================
+
+def _incremental_query(last_id) -> Dict:
+    return {"_id": {"$gt": last_id}} if last_id is not None else {}
+
+
+def _iter_evaluations(db, query: Dict, batch_size: int) -> Iterable[Dict]:
+    """Evaluations com a categoria do currículo de origem ($lookup)."""
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"_id": 1}},
+        {"$lookup": {
+            "from": "dados_processados",
+            "localField": "source_doc_id",
+            "foreignField": "_id",
+            "as": "_src",
+            "pipeline": [{"$project": {"category": 1}}],
+        }},
+        {"$addFields": {"category": {"$first": "$_src.category"}}},
+        {"$project": {"_src": 0, "features": 0}},
+    ]
+    return db["evaluations"].aggregate(pipeline, allowDiskUse=True, batchSize=batch_size)
+
+
+def export_dataset(
+    db,
+    dataset: str,
+    out_dir: Path,
+    last_id=None,
+    batch_size: int = 500,
+    rows_per_file: int = 5000,
+    limit: int = 0,
+) -> Dict[str, object]:
+    """
+    Exporta um dataset a partir de last_id (exclusivo) para um diretório de staging.
+
+    Os arquivos só entram no dataset via promote_staged, depois de o estado ser
+    salvo; se a leitura falhar, o staging é apagado.
+
+    Returns:
+        Dict com linhas/arquivos gravados, o último _id visto e o nome do staging.
+    """
+    query = _incremental_query(last_id)
+    if dataset == "evaluations":
+        cursor = _iter_evaluations(db, query, batch_size)
+        to_row = evaluation_row
+    else:
+        projection = None
+        if dataset == "features":
+            projection = {"category": 1, "skills": 1, "years_experience": 1,
+                          "experiences": 1, "resume_text_clean": 1, "metadata": 1}
+        cursor = db["dados_processados"].find(query, projection).sort("_id", 1).batch_size(batch_size)
+        to_row = feature_row_factory() if dataset == "features" else processed_row
+
+    # Sufixo aleatório: duas execuções no mesmo segundo não podem gerar o mesmo part-*
+    run_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    staging = f"{dataset}-{run_id}"
+    writer = PartitionedWriter(out_dir / STAGING_DIR / staging, run_id, rows_per_file,
+                               schema=dataset_schema(dataset))
+    seen = 0
+    newest = last_id
+    try:
+        for doc in cursor:
+            writer.add(doc.get("category"), to_row(doc))
+            newest = doc["_id"]
+            seen += 1
+            if seen % 10000 == 0:
+                logging.info(f"[{dataset}] {seen} documentos lidos...")
+            if limit and seen >= limit:
+                break
+        writer.close()
+    except BaseException:
+        writer.discard()
+        shutil.rmtree(writer.root, ignore_errors=True)
+        raise
+    finally:
+        cursor.close()
+
+    return {
+        "rows": writer.rows_written,
+        "files": writer.files_written,
+        "last_id": newest,
+        "staging": staging,
+    }
+
+
+# ======================== LEITURA ========================
+
+def read_dataset(
+    root: str,
+    dataset: str = "dados_processados",
+    columns: Optional[List[str]] = None,
+    categories: Optional[List[str]] = None,
+):
+    """
+    Lê um dataset exportado como pyarrow.Table, com memory-map.
+
+    Args:
+        root: diretório passado em --out-dir
+        dataset: dados_processados, features ou evaluations
+        columns: subconjunto de colunas (None = todas)
+        categories: filtra partições por categoria (None = todas)
+    """
+    if pq is None:
+        raise ImportError("pyarrow não instalado. Execute: pip install pyarrow")
+    filters = [("category", "in", list(categories))] if categories else None
+    return pq.read_table(
+        str(Path(root) / dataset),
+        columns=columns,
+        filters=filters,
+        memory_map=True,
+        partitioning="hive",
+    )
+
+
+def iter_rows(table, batch_size: int = 1024) -> Iterator[Dict]:
+    """
+    Linhas de uma Table como dicts, um record batch por vez: só o lote atual vira
+    objetos Python, o resto continua no buffer mapeado.
+    """
+    for batch in table.to_batches(max_chunksize=batch_size):
+        yield from batch.to_pylist()
+
+
+# ======================== MAIN ========================
+
+def main() -> None:
+    load_env()
+    setup_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Exporta dados_processados/features/evaluations para Parquet particionado por categoria."
+    )
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI") or os.getenv("MONGODB_URI"), help="URI do MongoDB.")
+    parser.add_argument("--mongo-db", default=os.getenv("MONGO_DB", "resumAI"), help="Banco de dados.")
+    parser.add_argument("--out-dir", default=os.getenv("PARQUET_DIR", "data/parquet"), help="Diretório de saída.")
+    parser.add_argument("--datasets", nargs="+", choices=DATASETS, default=list(DATASETS), help="Datasets a exportar.")
+    parser.add_argument("--full", action="store_true", help="Exporta tudo novamente, substituindo os datasets escolhidos (necessário após reprocessar documentos).")
+    parser.add_argument("--batch-size", type=int, default=500, help="Batch do cursor MongoDB.")
+    parser.add_argument("--rows-per-file", type=int, default=5000, help="Linhas por arquivo Parquet (por partição).")
+    parser.add_argument("--limit", type=int, default=0, help="Limite de documentos por dataset (0 = todos).")
+    args = parser.parse_args()
+
+    if pa is None:
+        logging.error("pyarrow não instalado. Execute: py -m pip install pyarrow")
+        raise SystemExit(2)
+    if MongoClient is None:
+        logging.error("pymongo não instalado. Execute: py -m pip install pymongo")
+        raise SystemExit(2)
+    if not args.mongo_uri:
+        logging.error("Defina MONGO_URI no .env ou via --mongo-uri.")
+        raise SystemExit(2)
+
+    from bson import ObjectId
+
+    out_dir = Path(args.out_dir)
+    # Conclui execuções anteriores (estado salvo, arquivos ainda no staging) e limpa as órfãs
+    state = load_state(out_dir)
+    promote_staged(out_dir, state)
+    client = MongoClient(args.mongo_uri)
+    db = client[args.mongo_db]
+
+    try:
+        for dataset in args.datasets:
+            # --full: só os datasets escolhidos recomeçam; o estado dos outros é mantido
+            last = None if args.full else state.get(dataset)
+            last_id = ObjectId(last) if last and ObjectId.is_valid(last) else last
+            logging.info(f"[{dataset}] exportando a partir de _id > {last_id or 'início'}")
+            res = export_dataset(
+                db, dataset, out_dir,
+                last_id=last_id,
+                batch_size=args.batch_size,
+                rows_per_file=args.rows_per_file,
+                limit=args.limit,
+            )
+            if res["last_id"] is not None:
+                state[dataset] = str(res["last_id"])
+            elif args.full:
+                state.pop(dataset, None)
+            if res["files"] or args.full:
+                state.setdefault(STAGED_KEY, {})[dataset] = {"run": res["staging"], "replace": args.full}
+            save_state(out_dir, state)
+            promote_staged(out_dir, state)
+            logging.info(f"[{dataset}] linhas={res['rows']} | arquivos={res['files']}")
+    finally:
+        client.close()
+
+    logging.info(f"Exportação concluída em {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,19 @@ from __future__ import annotations
 import argparse
 import json as _json
 import logging
+import math
 import os
 import re
+import time
+import tracemalloc
 from collections import Counter
 from datetime import datetime, timezone
 from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 
+from app.nlp.skill_matcher import get_skill_matcher
+
 try:
     from dotenv import load_dotenv
 except ImportError:
@@ -188,12 +193,102 @@ def dedupe_paragraphs_fallback(paragraphs: List[str], threshold: float) -> Dict[
     }
 
 
+# ======================== REGISTROS COMPACTOS ========================
+# Tipos com __slots__ usados dentro do pipeline: sem __dict__ por instância e sem
+# chaves string repetidas por experiência. A conversão para dict acontece só na
+# fronteira com o MongoDB (to_dict / PreprocessResult.to_document).
+
+class Experience:
+    """Bloco de experiência extraído (cargo, empresa, período, descrição)."""
+
+    __slots__ = ("title", "dates", "company", "description")
+
+    def __init__(self, title: str, dates: str, company: str, description: str):
+        self.title = title
+        self.dates = dates
+        self.company = company
+        self.description = description
+
+    def get(self, key: str, default=None):
+        """Acesso estilo dict, para código que ainda trata experiências como dict."""
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "title": self.title,
+            "dates": self.dates,
+            "company": self.company,
+            "description": self.description,
+        }
+
+    def __repr__(self) -> str:
+        return f"Experience(title={self.title!r}, dates={self.dates!r}, company={self.company!r})"
+
+
+class PreprocessStats:
+    """Contadores (e, com profile=True, tempos) de uma execução de preprocess_text."""
+
+    __slots__ = (
+        "paragraphs_input", "paragraphs_kept", "paragraphs_removed_exact",
+        "paragraphs_removed_near", "skills_unique", "experiences_total",
+        "experiences_deduped", "years_experience",
+        "timings_ms", "total_ms", "alloc_kb", "peak_kb",
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+
+
+class PreprocessResult:
+    """Resultado de preprocess_text: texto limpo, skills, experiências e stats."""
+
+    __slots__ = ("text", "skills", "experiences", "years_experience", "stats")
+
+    def __init__(
+        self,
+        text: str,
+        skills: List[str],
+        experiences: List[Experience],
+        years_experience: float,
+        stats: PreprocessStats,
+    ):
+        self.text = text
+        self.skills = skills
+        self.experiences = experiences
+        self.years_experience = years_experience
+        self.stats = stats
+
+    def to_dict(self) -> Dict[str, object]:
+        """Formato dict original (text/skills/experiences/years_experience/stats)."""
+        return {
+            "text": self.text,
+            "skills": list(self.skills),
+            "experiences": [e.to_dict() for e in self.experiences],
+            "years_experience": self.years_experience,
+            "stats": self.stats.to_dict(),
+        }
+
+    def to_document(self) -> Dict[str, object]:
+        """Campos gravados em dados_processados."""
+        return {
+            "resume_text_clean": self.text,
+            "skills": list(self.skills),
+            "experiences": [e.to_dict() for e in self.experiences],
+            "years_experience": self.years_experience,
+        }
+
+
 # ======================== EXTRAÇÃO DE SKILLS ========================
 
 def extract_skills(text: str) -> List[str]:
     """
     Extrai skills de seções como 'Skills:', 'Core Qualifications:', etc.
-    Retorna lista normalizada (stemmed, sem duplicatas).
+    Itens do vocabulário viram o nome canônico do SkillMatcher (node/nodejs -> node.js);
+    os demais são normalizados por stemming. Retorna lista sem duplicatas.
     """
     # regex para encontrar seção de skills
     match = re.search(
@@ -208,14 +303,15 @@ def extract_skills(text: str) -> List[str]:
     # separa por vírgula, ponto-vírgula ou quebra de linha
     raw_skills = re.split(r"[,;\n]+", skills_text)
     stemmer = PorterStemmer() if PorterStemmer else None
+    matcher = get_skill_matcher()
 
     unique: Set[str] = set()
     for s in raw_skills:
         s = s.strip()
         if not s or len(s) < 3:
             continue
-        # normaliza (stem se possível)
-        canonical = signature(s, stemmer)
+        # vocabulário conhecido -> nome canônico; senão normaliza (stem se possível)
+        canonical = matcher.canonicalize(s) or signature(s, stemmer)
         unique.add(canonical)
 
     return sorted(unique)
@@ -299,11 +395,11 @@ def normalize_fragmented_dates(text: str) -> str:
     return '\n'.join(result)
 
 
-def extract_experiences(text: str) -> List[Dict[str, str]]:
+def extract_experiences(text: str) -> List[Experience]:
     """
     Extrai blocos de experiência (cargo, empresa, período) de múltiplos formatos.
     Versão robusta que lida com diversos layouts de currículos, incluindo datas fragmentadas.
-    Retorna lista de dicts: {title, company, dates, description}.
+    Retorna lista de Experience (use .to_dict() para {title, company, dates, description}).
     """
     # PRIMEIRO: Normalizar datas fragmentadas
     text = normalize_fragmented_dates(text)
@@ -399,12 +495,12 @@ def extract_experiences(text: str) -> List[Dict[str, str]]:
                 title = "Professional Experience"
             
             if title.lower() != 'company name':
-                experiences.append({
-                    "title": title[:150],
-                    "dates": dates[:100],
-                    "company": company[:150],
-                    "description": description[:600],
-                })
+                experiences.append(Experience(
+                    title=title[:150],
+                    dates=dates[:100],
+                    company=company[:150],
+                    description=description[:600],
+                ))
             
             i = j
         else:
@@ -413,20 +509,20 @@ def extract_experiences(text: str) -> List[Dict[str, str]]:
     return experiences
 
 
-def dedupe_experiences(experiences: List[Dict[str, str]], threshold: float) -> List[Dict[str, str]]:
+def dedupe_experiences(experiences: List[Experience], threshold: float) -> List[Experience]:
     """Remove experiências duplicadas por título+empresa+datas ou descrição similar."""
-    unique = []
-    seen_keys: Set[str] = set()
+    unique: List[Experience] = []
+    seen_keys: Set[Tuple[str, str, str]] = set()
 
     for exp in experiences:
-        key = f"{exp['title'].lower()}|{exp['company'].lower()}|{exp['dates']}"
+        key = (exp.title.lower(), exp.company.lower(), exp.dates)
         if key in seen_keys:
             continue
         # checa similaridade de descrição com experiências já aceitas
         is_dup = False
         for u in unique:
-            if u["title"].lower() == exp["title"].lower() and u["company"].lower() == exp["company"].lower():
-                ratio = SequenceMatcher(None, exp["description"], u["description"]).ratio()
+            if u.title.lower() == key[0] and u.company.lower() == key[1]:
+                ratio = SequenceMatcher(None, exp.description, u.description).ratio()
                 if ratio >= threshold:
                     is_dup = True
                     break
@@ -526,7 +622,7 @@ def calculate_years_experience(input_data) -> float:
     Args:
         input_data: pode ser:
             - str: string de datas (ex: "January 2010 to December 2015")
-            - list[dict]: lista de experiências com campo 'dates'
+            - list[dict | Experience]: lista de experiências com campo 'dates'
     
     Retorna:
         float: anos totais de experiência (lida com sobreposições)
@@ -542,8 +638,8 @@ def calculate_years_experience(input_data) -> float:
     # Se for lista de experiências
     elif isinstance(input_data, list):
         for exp in input_data:
-            if isinstance(exp, dict):
-                dates_str = exp.get("dates", "").strip()
+            if isinstance(exp, (dict, Experience)):
+                dates_str = (exp.get("dates") or "").strip()
             else:
                 dates_str = str(exp).strip()
             
@@ -583,7 +679,76 @@ def calculate_years_experience(input_data) -> float:
 
 # ======================== PRÉ-PROCESSAMENTO PRINCIPAL ========================
 
-def preprocess_text(raw: str, min_similarity: float) -> Dict[str, object]:
+class StageTimer:
+    """
+    Cronômetro por etapa do pipeline (perf_counter_ns).
+    Opcionalmente mede alocações via tracemalloc (bytes alocados líquidos e pico).
+    Desabilitado, não custa nada além de uma checagem por etapa.
+    """
+
+    def __init__(self, enabled: bool = False, trace_alloc: bool = False):
+        self.enabled = enabled
+        self.trace_alloc = enabled and trace_alloc
+        self.timings_ms: Dict[str, float] = {}
+        self.alloc_kb: Dict[str, float] = {}
+        self.peak_kb: Dict[str, float] = {}
+        self._stage: Optional[str] = None
+        self._t0 = 0
+        self._mem0 = 0
+        self._started_tracing = False
+
+    def __enter__(self) -> "StageTimer":
+        if self.trace_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def start(self, stage: str) -> None:
+        if not self.enabled:
+            return
+        self.stop()
+        self._stage = stage
+        if self.trace_alloc:
+            tracemalloc.reset_peak()
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+        self._t0 = time.perf_counter_ns()
+
+    def stop(self) -> None:
+        if not self.enabled or self._stage is None:
+            return
+        elapsed = time.perf_counter_ns() - self._t0
+        self.timings_ms[self._stage] = round(elapsed / 1e6, 3)
+        if self.trace_alloc:
+            cur, peak = tracemalloc.get_traced_memory()
+            self.alloc_kb[self._stage] = round((cur - self._mem0) / 1024, 1)
+            self.peak_kb[self._stage] = round((peak - self._mem0) / 1024, 1)
+        self._stage = None
+
+    def as_stats(self) -> Dict[str, object]:
+        if not self.enabled:
+            return {}
+        out: Dict[str, object] = {
+            "timings_ms": dict(self.timings_ms),
+            "total_ms": round(sum(self.timings_ms.values()), 3),
+        }
+        if self.trace_alloc:
+            out["alloc_kb"] = dict(self.alloc_kb)
+            out["peak_kb"] = dict(self.peak_kb)
+        return out
+
+
+def preprocess_text(
+    raw: str,
+    min_similarity: float,
+    profile: bool = False,
+    trace_alloc: bool = False,
+) -> PreprocessResult:
     """
     Pipeline completo de pré-processamento:
     - Normaliza texto
@@ -592,48 +757,123 @@ def preprocess_text(raw: str, min_similarity: float) -> Dict[str, object]:
     - Extrai e deduplica skills
     - Extrai e deduplica experiências
     - Calcula anos totais de experiência
+
+    Retorna PreprocessResult (registros com __slots__); use .to_dict() ou
+    .to_document() na fronteira com o MongoDB.
+
+    Com profile=True, stats ganha "timings_ms" por etapa e "total_ms";
+    com trace_alloc=True também "alloc_kb"/"peak_kb" (tracemalloc, bem mais lento).
     """
     stemmer = PorterStemmer() if PorterStemmer else None
 
-    # 1. Normalização
-    norm = normalize_text(raw)
-    no_dup_lines = dedupe_consecutive_lines(norm, stemmer)
-
-    # 2. Deduplicação de parágrafos
-    paragraphs = segment_paragraphs(no_dup_lines)
-    de = dedupe_paragraphs_minhash(paragraphs, threshold=min_similarity)
-    clean_text = "\n\n".join(de["kept"])
-
-    # 3. Extração de skills
-    skills = extract_skills(clean_text)
-
-    # 4. Extração de experiências
-    experiences = extract_experiences(clean_text)
-    experiences_deduped = dedupe_experiences(experiences, threshold=0.90)
-
-    # 5. Cálculo de anos de experiência (passa lista completa para lidar com sobreposições)
-    total_years = calculate_years_experience(experiences_deduped)
-
-    stats = {
-        "paragraphs_input": len(paragraphs),
-        "paragraphs_kept": len(de["kept"]),
-        "paragraphs_removed_exact": len(de["removed_exact"]),
-        "paragraphs_removed_near": len(de["removed_near"]),
-        "skills_unique": len(skills),
-        "experiences_total": len(experiences),
-        "experiences_deduped": len(experiences_deduped),
-        "years_experience": total_years,
-    }
+    with StageTimer(profile, trace_alloc) as timer:
+        # 1. Normalização
+        timer.start("normalize")
+        norm = normalize_text(raw)
+        no_dup_lines = dedupe_consecutive_lines(norm, stemmer)
+
+        # 2. Deduplicação de parágrafos
+        timer.start("dedupe_paragraphs")
+        paragraphs = segment_paragraphs(no_dup_lines)
+        de = dedupe_paragraphs_minhash(paragraphs, threshold=min_similarity)
+        clean_text = "\n\n".join(de["kept"])
+
+        # 3. Extração de skills
+        timer.start("extract_skills")
+        skills = extract_skills(clean_text)
+
+        # 4. Extração de experiências
+        timer.start("extract_experiences")
+        experiences = extract_experiences(clean_text)
+        experiences_deduped = dedupe_experiences(experiences, threshold=0.90)
+
+        # 5. Cálculo de anos de experiência (passa lista completa para lidar com sobreposições)
+        timer.start("years_experience")
+        total_years = calculate_years_experience(experiences_deduped)
+        timer.stop()
+
+    stats = PreprocessStats(
+        paragraphs_input=len(paragraphs),
+        paragraphs_kept=len(de["kept"]),
+        paragraphs_removed_exact=len(de["removed_exact"]),
+        paragraphs_removed_near=len(de["removed_near"]),
+        skills_unique=len(skills),
+        experiences_total=len(experiences),
+        experiences_deduped=len(experiences_deduped),
+        years_experience=total_years,
+        **timer.as_stats(),
+    )
+
+    return PreprocessResult(
+        text=clean_text,
+        skills=skills,
+        experiences=experiences_deduped,
+        years_experience=total_years,
+        stats=stats,
+    )
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    """Percentil por nearest-rank sobre lista já ordenada."""
+    if not sorted_vals:
+        return 0.0
+    idx = max(0, min(len(sorted_vals) - 1, math.ceil(q * len(sorted_vals)) - 1))
+    return sorted_vals[idx]
+
 
+def summarize_stage_timings(
+    records: List[Tuple[object, PreprocessStats]], top_n: int = 10
+) -> Dict[str, object]:
+    """
+    Agrega stats de profiling de uma execução.
+
+    Args:
+        records: lista de (_id, stats) de preprocess_text(profile=True)
+        top_n: quantos documentos mais lentos listar
+
+    Retorna dict com mean/p95/max por etapa (ms) e os documentos mais lentos.
+    """
+    per_stage: Dict[str, List[float]] = {}
+    totals: List[Tuple[float, object]] = []
+    for doc_id, st in records:
+        for stage, ms in (st.timings_ms or {}).items():
+            per_stage.setdefault(stage, []).append(float(ms))
+        totals.append((float(st.total_ms or 0.0), doc_id))
+
+    stages: Dict[str, Dict[str, float]] = {}
+    for stage, vals in per_stage.items():
+        vals.sort()
+        stages[stage] = {
+            "mean": round(sum(vals) / len(vals), 3),
+            "p95": round(_percentile(vals, 0.95), 3),
+            "max": round(vals[-1], 3),
+            "sum": round(sum(vals), 3),
+        }
+
+    totals.sort(key=lambda x: x[0], reverse=True)
     return {
-        "text": clean_text,
-        "skills": skills,
-        "experiences": experiences_deduped,
-        "years_experience": total_years,
-        "stats": stats,
+        "documents": len(records),
+        "stages": stages,
+        "slowest": [{"_id": str(doc_id), "total_ms": ms} for ms, doc_id in totals[:top_n]],
     }
 
 
+def log_stage_summary(summary: Dict[str, object]) -> None:
+    """Loga o resumo de profiling ordenado pela etapa mais custosa."""
+    stages: Dict[str, Dict[str, float]] = summary.get("stages") or {}  # type: ignore[assignment]
+    if not stages:
+        return
+    grand = sum(v["sum"] for v in stages.values()) or 1.0
+    logging.info(f"Profiling por etapa ({summary['documents']} docs):")
+    for stage, v in sorted(stages.items(), key=lambda kv: kv[1]["sum"], reverse=True):
+        logging.info(
+            f"  {stage:<20} mean={v['mean']:.2f}ms p95={v['p95']:.2f}ms "
+            f"max={v['max']:.2f}ms ({v['sum'] / grand * 100:.1f}% do total)"
+        )
+    for item in summary.get("slowest") or []:  # type: ignore[union-attr]
+        logging.info(f"  lento: _id={item['_id']} total={item['total_ms']:.2f}ms")
+
+
 # ======================== MAIN ========================
 
 def load_env() -> None:
@@ -656,6 +896,9 @@ def main() -> None:
     parser.add_argument("--query", default=os.getenv("PREPROC_QUERY", "{}"), help="Filtro JSON para subset.")
     parser.add_argument("--limit", type=int, default=int(os.getenv("PREPROC_LIMIT", "0")), help="Limite de documentos (0 = todos).")
     parser.add_argument("--batch-size", type=int, default=int(os.getenv("PREPROC_BATCH", "200")), help="Lote de upserts.")
+    parser.add_argument("--profile", action="store_true", help="Mede tempo por etapa e loga resumo (mean/p95/max) ao final.")
+    parser.add_argument("--trace-alloc", action="store_true", help="Com --profile, mede alocações por etapa (tracemalloc, mais lento).")
+    parser.add_argument("--profile-out", default=None, help="Arquivo JSON para salvar o resumo de profiling.")
     args = parser.parse_args()
 
     if MongoClient is None:
@@ -691,6 +934,7 @@ def main() -> None:
     
     processed = 0
     batch: List[UpdateOne] = []
+    profile_records: List[Tuple[object, PreprocessStats]] = []
     now = datetime.now(timezone.utc).isoformat()
 
     try:
@@ -699,16 +943,20 @@ def main() -> None:
             if not text:
                 continue
 
-            pp = preprocess_text(text, min_similarity=args.min_similarity)
+            pp = preprocess_text(
+                text,
+                min_similarity=args.min_similarity,
+                profile=args.profile,
+                trace_alloc=args.trace_alloc,
+            )
+            if args.profile:
+                profile_records.append((doc["_id"], pp.stats))
 
             out_doc: Dict[str, object] = {
                 "_id": doc["_id"],
                 "filename": doc.get("filename"),
                 "category": doc.get("category"),
-                "resume_text_clean": pp["text"],
-                "skills": pp["skills"],
-                "experiences": pp["experiences"],
-                "years_experience": pp["years_experience"],
+                **pp.to_document(),
                 "metadata": {
                     "pages": (doc.get("metadata") or {}).get("pages"),
                     "extracted_at": (doc.get("metadata") or {}).get("extracted_at"),
@@ -735,6 +983,13 @@ def main() -> None:
     total_dst = dst.count_documents({})
     logging.info(f"Concluído. Processados={processed} | Total na coleção destino={total_dst}")
 
+    if args.profile and profile_records:
+        summary = summarize_stage_timings(profile_records)
+        log_stage_summary(summary)
+        if args.profile_out:
+            Path(args.profile_out).write_text(_json.dumps(summary, indent=2), encoding="utf-8")
+            logging.info(f"Resumo de profiling salvo em {args.profile_out}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Verifica o tempo de import dos pontos de entrada (python -X importtime).
+
+Roda cada módulo num subprocesso limpo, soma o tempo cumulativo do import e
+falha (exit 1) se passar do orçamento ou se puxar bibliotecas pesadas que só
+deveriam carregar no primeiro uso (spaCy, torch, transformers, ...).
+
+Uso:
+    python -m app.import_budget
+    python -m app.import_budget app.main app.scoring.use_case --budget-ms 800
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = ["app.main", "app.scoring.use_case", "app.scoring.hybrid_scorer"]
+DEFAULT_BUDGET_MS = 1000.0
+
+# Não devem ser importados só por importar os pontos de entrada
+HEAVY_MODULES = ["spacy", "torch", "transformers", "sentence_transformers", "sklearn"]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Retorna (módulo, self_us, cumulative_us, nível) para cada linha de -X importtime."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, indent, name = m.groups()
+        rows.append((name, int(self_us), int(cum_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def measure(module: str) -> Dict[str, object]:
+    """Importa `module` num subprocesso e mede o tempo cumulativo."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    target_us = next((cum for name, _, cum, level in rows if name == module and level == 0), None)
+    if target_us is None:
+        # módulo já importado como dependência de outro top-level: soma os top-level
+        target_us = sum(cum for _, _, cum, level in rows if level == 0)
+    imported = {name for name, _, _, _ in rows}
+    heavy = sorted(h for h in HEAVY_MODULES if h in imported)
+    slowest = sorted(rows, key=lambda r: r[1], reverse=True)[:10]
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode != 0 and proc.stderr.strip() else None,
+        "cumulative_ms": target_us / 1000.0,
+        "heavy_imported": heavy,
+        "slowest_self": [(name, self_us / 1000.0) for name, self_us, _, _ in slowest],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de import dos pontos de entrada.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Módulos a verificar.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Orçamento por módulo (ms).")
+    parser.add_argument("--allow-heavy", action="store_true", help="Não falha se bibliotecas pesadas forem importadas.")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Mostra os imports mais lentos (self time).")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        res = measure(module)
+        if not res["ok"]:
+            print(f"❌ {module}: import falhou ({res['error']})")
+            failed = True
+            continue
+
+        over = res["cumulative_ms"] > args.budget_ms
+        heavy = res["heavy_imported"] and not args.allow_heavy
+        status = "❌" if (over or heavy) else "✅"
+        print(f"{status} {module}: {res['cumulative_ms']:.0f} ms (orçamento {args.budget_ms:.0f} ms)")
+        if res["heavy_imported"]:
+            print(f"   ⚠️  importa bibliotecas pesadas: {', '.join(res['heavy_imported'])}")
+        if args.verbose or over:
+            for name, ms in res["slowest_self"]:
+                print(f"     {ms:8.1f} ms  {name}")
+        failed = failed or over or bool(heavy)
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
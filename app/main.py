@@ -3,25 +3,33 @@ import argparse
 from datetime import datetime
 from bson import ObjectId
 from app.db.mongo import get_db
-from app.scoring.config import RUBRIC_VERSION
+from app.scoring.config import Agent
+from app.scoring.rubric import get_rubric
+from app.scoring.engine import active_subscores
 from app.scoring.use_case import (
     evaluate_resume_from_doc,
+    evaluate_features_batch,
+    build_features_batch,
     extract_years_total,  # usado para heurística de experiência no backfill
 )
-from app.scoring.hybrid_scorer import HybridScorer
+from app.scoring.hybrid_scorer import get_hybrid_scorer
+from app.nlp.analysis_cache import analysis_cache
+from app.scoring.feature_store import get_feature_store
 
-# Inicializar scorer híbrido (ML + Rule-Based)
-_hybrid_scorer = None
-
-def get_hybrid_scorer():
-    """Singleton para scorer híbrido"""
-    global _hybrid_scorer
-    if _hybrid_scorer is None:
-        _hybrid_scorer = HybridScorer()
-    return _hybrid_scorer
+def _iter_chunks(iterable, size):
+    """Agrupa um cursor/iterável em listas de até `size` itens."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 def cmd_evaluate_one(args):
     db = get_db()
+    rubric_version = get_rubric().version
     doc = db["dados_processados"].find_one({"_id": ObjectId(args.id)})
     if not doc:
         raise SystemExit("Documento não encontrado em resumAI.dados_processados.")
@@ -31,7 +39,7 @@ def cmd_evaluate_one(args):
     
     if use_hybrid:
         scorer = get_hybrid_scorer()
-        res = scorer.score(doc)
+        res = scorer.score(doc, use_store=True)
         
         # Adaptar formato para compatibilidade
         agent = "experienced" if res['features'].get('is_experienced') else "noexp"
@@ -39,7 +47,7 @@ def cmd_evaluate_one(args):
             "agent": agent,
             "features": res['features'],
             "scores": {
-                "version": RUBRIC_VERSION,
+                "version": rubric_version,
                 "by_block": res['rb_subscores'],
                 "final": res['score'],
                 "label": res['label'],
@@ -68,7 +76,7 @@ def cmd_evaluate_one(args):
         "agent": eval_result["agent"],
         "input.target_role": None,
         "input.job_id": None,
-        "scores.version": RUBRIC_VERSION
+        "scores.version": rubric_version
     })
     if exists and not args.force:
         print(f"Já existe avaliação (cache). final={exists['scores']['final']} label={exists['scores']['label']}")
@@ -108,6 +116,7 @@ def cmd_evaluate_one(args):
 
 def cmd_backfill(args):
     db = get_db()
+    rubric_version = get_rubric().version
     cur = db["dados_processados"].find(
         {"resume_text_clean": {"$exists": True, "$ne": ""}},
         projection={"resume_text_clean": 1, "skills": 1, "years_experience": 1, "experiences": 1}
@@ -116,77 +125,184 @@ def cmd_backfill(args):
     inserted = 0
     use_hybrid = args.use_hybrid and not args.rule_based_only
     scorer = get_hybrid_scorer() if use_hybrid else None
+    store = None if args.no_feature_store else get_feature_store()
     
-    for doc in cur:
+    for chunk in _iter_chunks(cur, args.batch_size):
+        # spaCy em lote (nlp.pipe) para o bloco inteiro
         if use_hybrid:
-            # Sistema híbrido
-            res = scorer.score(doc)
-            agent = "experienced" if res['features'].get('is_experienced') else "noexp"
-            eval_result = {
-                "agent": agent,
-                "features": res['features'],
-                "scores": {
-                    "version": RUBRIC_VERSION,
-                    "by_block": res['rb_subscores'],
-                    "final": res['score'],
-                    "label": res['label'],
-                },
-                "explain": {
-                    "method": "hybrid",
-                    "components": res['components'],
-                    "ml_metadata": res['ml_metadata'],
-                    "description": res['explanation']
-                }
-            }
+            flags = None
         else:
-            # Sistema rule-based tradicional
-            text = (doc.get("resume_text_clean") or "")
-            has_exp = extract_years_total(text) >= 1.0 if args.agent == "auto" else (args.agent == "experienced")
-            rb_result = evaluate_resume_from_doc(doc, has_experience=has_exp)
-            eval_result = {
-                "agent": rb_result["agent"],
-                "features": rb_result["features"],
-                "scores": rb_result["scores"],
-                "explain": rb_result["explain"]
-            }
+            flags = [
+                extract_years_total(doc.get("resume_text_clean") or "") >= 1.0
+                if args.agent == "auto" else (args.agent == "experienced")
+                for doc in chunk
+            ]
+        feats_list = build_features_batch(chunk, flags, batch_size=args.batch_size, n_process=args.n_process,
+                                          store=store)
+        # Rule-based: rubric vetorizado para o bloco inteiro
+        rb_results = None if use_hybrid else evaluate_features_batch(feats_list)
+        # Híbrido: ML e rule-based sobre as mesmas features do bloco
+        hybrid_results = scorer.score_batch(chunk, features_list=feats_list) if use_hybrid else None
 
-        exists = db["evaluations"].find_one({
-            "source_doc_id": doc["_id"],
-            "agent": eval_result["agent"],
-            "input.target_role": None,
-            "input.job_id": None,
-            "scores.version": RUBRIC_VERSION
-        })
-        if exists and not args.force:
-            continue
+        for i, (doc, feats) in enumerate(zip(chunk, feats_list)):
+            if use_hybrid:
+                # Sistema híbrido
+                res = hybrid_results[i]
+                agent = "experienced" if res['features'].get('is_experienced') else "noexp"
+                eval_result = {
+                    "agent": agent,
+                    "features": res['features'],
+                    "scores": {
+                        "version": rubric_version,
+                        "by_block": res['rb_subscores'],
+                        "final": res['score'],
+                        "label": res['label'],
+                    },
+                    "explain": {
+                        "method": "hybrid",
+                        "components": res['components'],
+                        "ml_metadata": res['ml_metadata'],
+                        "description": res['explanation']
+                    }
+                }
+            else:
+                # Sistema rule-based tradicional
+                rb_result = rb_results[i]
+                eval_result = {
+                    "agent": rb_result["agent"],
+                    "features": rb_result["features"],
+                    "scores": rb_result["scores"],
+                    "explain": rb_result["explain"]
+                }
 
-        eval_doc = {
-            "created_at": datetime.utcnow(),
-            "source_doc_id": doc["_id"],
-            "agent": eval_result["agent"],
-            "input": {
-                "has_experience": eval_result['features'].get('is_experienced', False),
-                "target_role": None,
-                "job_id": None,
-                "scoring_method": "hybrid" if use_hybrid else "rule_based"
-            },
-            "extractions_snapshot": {
-                "skills": eval_result["features"].get("skills", []),
-                "tokens": eval_result["features"].get("tokens", 0),
-                "years_total": eval_result["features"].get("years_total", 0),
-                "sections": eval_result["features"].get("sections_present", 0),
-            },
-            "scores": eval_result["scores"],
-            "explain": eval_result["explain"],
-        }
-        db["evaluations"].insert_one(eval_doc)
-        inserted += 1
+            exists = db["evaluations"].find_one({
+                "source_doc_id": doc["_id"],
+                "agent": eval_result["agent"],
+                "input.target_role": None,
+                "input.job_id": None,
+                "scores.version": rubric_version
+            })
+            if exists and not args.force:
+                continue
+
+            eval_doc = {
+                "created_at": datetime.utcnow(),
+                "source_doc_id": doc["_id"],
+                "agent": eval_result["agent"],
+                "input": {
+                    "has_experience": eval_result['features'].get('is_experienced', False),
+                    "target_role": None,
+                    "job_id": None,
+                    "scoring_method": "hybrid" if use_hybrid else "rule_based"
+                },
+                "extractions_snapshot": {
+                    "skills": eval_result["features"].get("skills", []),
+                    "tokens": eval_result["features"].get("tokens", 0),
+                    "years_total": eval_result["features"].get("years_total", 0),
+                    "sections": eval_result["features"].get("sections_present", 0),
+                },
+                "scores": eval_result["scores"],
+                "explain": eval_result["explain"],
+            }
+            db["evaluations"].insert_one(eval_doc)
+            inserted += 1
         
-        if inserted % 100 == 0:
-            print(f"Processados: {inserted}...")
+            if inserted % 100 == 0:
+                print(f"Processados: {inserted}...")
 
     method = "híbrido (ML + Rule-Based)" if use_hybrid else "rule-based"
     print(f"Backfill concluído usando {method}. Inseridos: {inserted}")
+    cache = analysis_cache.stats()
+    print(f"Cache de análise: {cache['hits']} hits ({cache['disk_hits']} do disco), {cache['misses']} misses")
+    if store is not None:
+        fs = store.stats()
+        print(f"Feature store ({fs['version']}): {fs['hits']} hits, {fs['misses']} extraídos")
+
+def _eval_key(ev):
+    inp = ev.get("input") or {}
+    return (ev.get("source_doc_id"), ev.get("agent"), inp.get("target_role"), inp.get("job_id"))
+
+def cmd_rescore(args):
+    """
+    Aplica o rubric ativo (config.py ou RUBRIC_FILE) às avaliações já gravadas,
+    usando scores.by_block: nada de NLP nem modelos, só o rubric vetorizado.
+    """
+    from app.scoring.batch_engine import rescore_batch
+
+    rubric = get_rubric()
+    rubric_version = rubric.version
+    if args.from_version == rubric_version:
+        raise SystemExit(f"--from-version igual à versão atual ({rubric_version}). "
+                         "Incremente RUBRIC_VERSION (ou a versão em RUBRIC_FILE).")
+
+    db = get_db()
+    coll = db["evaluations"]
+    query = {
+        "scores.version": args.from_version or {"$ne": rubric_version},
+        # Híbrido guarda o score ML+RB e subscores arredondados: precisa de backfill
+        "explain.method": {"$ne": "hybrid"},
+    }
+    cur = coll.find(query, projection={"created_at": 0}).sort("_id", -1).batch_size(args.batch_size)
+    if args.limit:
+        cur = cur.limit(args.limit)
+
+    done = set()  # (doc, agent, vaga) já reavaliados nesta execução (fica a versão mais recente)
+    inserted = skipped = stale = 0
+    for chunk in _iter_chunks(cur, args.batch_size):
+        # Avaliações que já existem na versão atual
+        existing = set()
+        if not args.force:
+            existing = {
+                _eval_key(ev) for ev in coll.find(
+                    {"scores.version": rubric_version,
+                     "source_doc_id": {"$in": [ev.get("source_doc_id") for ev in chunk]}},
+                    projection={"source_doc_id": 1, "agent": 1, "input": 1},
+                )
+            }
+
+        todo = []
+        for ev in chunk:
+            key = _eval_key(ev)
+            if key in done or key in existing:
+                skipped += 1
+                continue
+            # Bloco com peso no rubric novo que não foi calculado na avaliação antiga
+            evaluated = ev["scores"].get("evaluated")
+            agent = Agent.EXPERIENCED if ev.get("agent") == Agent.EXPERIENCED.value else Agent.NOEXP
+            if evaluated is not None and active_subscores(agent, rubric=rubric) - set(evaluated):
+                stale += 1
+                continue
+            done.add(key)
+            todo.append(ev)
+        if not todo:
+            continue
+
+        res = rescore_batch([ev["scores"].get("by_block") or {} for ev in todo], [ev.get("agent") for ev in todo],
+                            rubric=rubric)
+        new_docs = []
+        for i, ev in enumerate(todo):
+            scores = {
+                **ev["scores"],
+                "version": res["version"],
+                "final": float(res["final"][i]),
+                "label": res["label"][i],
+            }
+            new_docs.append({
+                **{k: v for k, v in ev.items() if k != "_id"},
+                "created_at": datetime.utcnow(),
+                "scores": scores,
+                "explain": {**(ev.get("explain") or {}), "top_up": res["top_up"][i], "top_down": res["top_down"][i]},
+                "rescored_from": ev["_id"],
+            })
+
+        if not args.dry_run:
+            coll.insert_many(new_docs, ordered=False)
+        inserted += len(new_docs)
+        print(f"Reavaliados: {inserted}...")
+
+    action = "Simulação" if args.dry_run else "Rescore"
+    print(f"{action} concluído ({rubric_version}). Inseridos: {inserted} | já existentes: {skipped} | "
+          f"precisam de backfill: {stale}")
 
 def build_parser():
     ap = argparse.ArgumentParser(prog="resumAI", description="Runner de scoring/labels.")
@@ -207,12 +323,29 @@ def build_parser():
     p2.add_argument("--agent", choices=["auto","experienced","noexp"], default="auto",
                     help="Apenas para rule-based. Ignorado se --use-hybrid")
     p2.add_argument("--force", action="store_true")
+    p2.add_argument("--batch-size", type=int, default=64,
+                    help="Documentos por lote do spaCy (nlp.pipe)")
+    p2.add_argument("--n-process", type=int, default=1,
+                    help="Processos do spaCy no lote (nlp.pipe n_process)")
+    p2.add_argument("--no-feature-store", action="store_true",
+                    help="Não lê nem grava features na coleção `features`")
     p2.add_argument("--use-hybrid", action="store_true", default=True,
                     help="Usa sistema híbrido (ML + Rule-Based). Padrão: True")
     p2.add_argument("--rule-based-only", action="store_true",
                     help="Usa apenas sistema rule-based tradicional")
     p2.set_defaults(func=cmd_backfill)
 
+    p3 = sp.add_parser("rescore", help="Recalcula final/label/explicação das avaliações para o rubric ativo")
+    p3.add_argument("--from-version", default=None,
+                    help="Versão de origem (padrão: qualquer versão diferente da atual)")
+    p3.add_argument("--limit", type=int, default=0, help="Máximo de avaliações lidas (0 = todas)")
+    p3.add_argument("--batch-size", type=int, default=2000,
+                    help="Avaliações por lote (rubric vetorizado + insert_many)")
+    p3.add_argument("--force", action="store_true",
+                    help="Regrava mesmo se já houver avaliação na versão atual")
+    p3.add_argument("--dry-run", action="store_true", help="Calcula sem gravar")
+    p3.set_defaults(func=cmd_rescore)
+
     return ap
 
 def main():
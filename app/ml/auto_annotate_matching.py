@@ -13,14 +13,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from sentence_transformers import SentenceTransformer, util
 
+from app.nlp.skill_matcher import canonicalize_skills
+
 
 def calculate_skill_overlap(resume_skills: List[str], job_skills: List[str]) -> float:
-    """Calcula % de overlap de skills"""
+    """Calcula % de overlap de skills (nomes canonicalizados: Node.js == nodejs)"""
     if not job_skills:
         return 0.0
     
-    resume_set = set([s.lower() for s in resume_skills])
-    job_set = set([s.lower() for s in job_skills])
+    resume_set = set(canonicalize_skills(resume_skills))
+    job_set = set(canonicalize_skills(job_skills))
     
     matches = len(resume_set.intersection(job_set))
     return matches / len(job_set)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Artefato compacto (.npz) do modelo não-supervisionado e preditor só com NumPy.
+
+O .pkl de UnsupervisedResumeScorer guarda cinco objetos sklearn via joblib: a
+carga é lenta, depende da versão do sklearn e a inferência passa pelo código
+genérico dele. O export reduz o modelo a arrays:
+
+    affine_W, affine_b    StandardScaler + PCA num único x @ W + b
+    centroids             centróides do K-Means
+    tree_*                árvores do IsolationForest como árvores binárias completas
+                          (a descida é um laço de max_depth passos, sem ponteiros)
+    cluster_quality/size  o que o score final precisa de cada cluster
+
+FusedScorer carrega o .npz com mmap (cada array é mapeado direto do arquivo,
+sem cópia) e não importa sklearn. Os scores batem com o modelo sklearn até o
+arredondamento de ponto flutuante da transformação fundida.
+
+Uso:
+    python -m app.ml.fused_scorer models/unsupervised_scorer.pkl --check 1000
+    # gera models/unsupervised_scorer.npz (usado pelo HybridScorer se for mais novo que o .pkl)
+"""
+import struct
+import zipfile
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+from app.ml.unsupervised_scoring import (
+    ScoreBatch, UnsupervisedResumeScorer, build_score_batch, nearest_centroid,
+)
+
+FORMAT_VERSION = "fused-v1"
+
+# Linhas por bloco na descida das árvores (memória ~ linhas × árvores)
+_TREE_CHUNK = 1024
+
+
+def _average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Comprimento médio de caminho de uma busca sem sucesso numa BST (igual ao sklearn)."""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    out = np.zeros_like(n_samples)
+    mask_2 = n_samples == 2
+    mask_n = n_samples > 2
+    out[mask_2] = 1.0
+    n = n_samples[mask_n]
+    out[mask_n] = 2.0 * (np.log(n - 1.0) + np.euler_gamma) - 2.0 * (n - 1.0) / n
+    return out
+
+
+def _flatten_forest(forest, n_features: int) -> Dict[str, np.ndarray]:
+    """
+    Árvores do IsolationForest como árvores binárias completas de profundidade D.
+
+    Folhas mais rasas que D viram nós com threshold +inf (sempre à esquerda) até
+    a profundidade D, com o mesmo valor nas folhas de baixo. Assim a descida é
+    aritmética pura (nó = 2·nó + 1 + foi_para_direita), sem arrays de filhos.
+    """
+    depth_max = 0
+    for tree in forest.estimators_:
+        depth_max = max(depth_max, int(tree.tree_.max_depth))
+    n_trees = len(forest.estimators_)
+    n_internal = 2 ** depth_max - 1
+
+    feature = np.zeros((n_trees, n_internal), dtype=np.int32)
+    threshold = np.full((n_trees, n_internal), np.inf, dtype=np.float64)
+    leaf_value = np.zeros((n_trees, 2 ** depth_max), dtype=np.float64)
+
+    for k, (tree, tree_features) in enumerate(zip(forest.estimators_, forest.estimators_features_)):
+        t = tree.tree_
+        # Colunas da árvore -> colunas da matriz (com subamostragem de features)
+        columns = np.asarray(tree_features) if len(tree_features) != n_features else np.arange(n_features)
+        # nós no caminho (depth + 1) + c(n amostras na folha) - 1, como em score_samples
+        path_value = _average_path_length(t.n_node_samples)
+
+        stack = [(0, 0, 0)]  # (nó sklearn, posição na árvore completa, profundidade)
+        while stack:
+            node, pos, depth = stack.pop()
+            is_leaf = t.children_left[node] == -1
+            if pos >= n_internal:
+                leaf_value[k, pos - n_internal] = depth + path_value[node]
+            elif is_leaf:
+                # folha rasa: threshold +inf já leva à esquerda; as duas metades levam o valor
+                stack.append((node, 2 * pos + 1, depth))
+                stack.append((node, 2 * pos + 2, depth))
+            else:
+                feature[k, pos] = columns[t.feature[node]]
+                threshold[k, pos] = t.threshold[node]
+                stack.append((t.children_left[node], 2 * pos + 1, depth + 1))
+                stack.append((t.children_right[node], 2 * pos + 2, depth + 1))
+
+    return {
+        "tree_feature": feature,
+        "tree_threshold": threshold,
+        "tree_leaf_value": leaf_value,
+        "tree_denominator": np.asarray(
+            n_trees * _average_path_length(np.asarray([forest.max_samples_]))[0], dtype=np.float64),
+    }
+
+
+def export_fused(scorer: UnsupervisedResumeScorer, path: str) -> str:
+    """
+    Exporta um UnsupervisedResumeScorer treinado para o .npz fundido.
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    import sklearn
+
+    if not scorer.fitted:
+        raise ValueError("Modelo não treinado! Chame .fit() primeiro.")
+
+    scaler, pca = scorer.scaler, scorer.pca
+    n_features = int(scaler.n_features_in_)
+    mean = scaler.mean_ if getattr(scaler, "with_mean", True) and scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if getattr(scaler, "with_std", True) and scaler.scale_ is not None else np.ones(n_features)
+
+    # PCA(scaler(x)) = ((x - mean) / scale - pca.mean_) @ components_.T  [/ sqrt(var) com whiten]
+    components = pca.components_
+    W = (components / scale).T
+    b = -(mean / scale) @ components.T - pca.mean_ @ components.T
+    if getattr(pca, "whiten", False):
+        std = np.sqrt(pca.explained_variance_)
+        W = W / std
+        b = b / std
+
+    arrays = {
+        "format_version": np.asarray(FORMAT_VERSION),
+        "sklearn_version": np.asarray(sklearn.__version__),
+        "feature_names": np.asarray(list(scorer.feature_names or [])),
+        "affine_W": np.ascontiguousarray(W, dtype=np.float64),
+        "affine_b": np.asarray(b, dtype=np.float64),
+        "centroids": np.ascontiguousarray(scorer.kmeans.cluster_centers_, dtype=np.float64),
+        "cluster_quality": np.asarray(
+            [scorer.cluster_quality_scores[c] for c in range(scorer.n_clusters)], dtype=np.float64),
+        "cluster_size": np.asarray([p["size"] for p in scorer.cluster_profiles], dtype=np.int64),
+        **_flatten_forest(scorer.isolation_forest, n_features),
+    }
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    # np.savez sem compressão: os membros ficam contíguos no zip e podem ser mapeados
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    print(f"💾 Modelo fundido salvo em: {path} ({Path(path).stat().st_size / 1024:.0f} KB)")
+    return str(path)
+
+
+def _mmap_npz(path: str) -> Dict[str, np.ndarray]:
+    """Arrays de um .npz sem compressão mapeados direto do arquivo (np.load não faz mmap de .npz)."""
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                # .npz comprimido: carrega tudo em memória
+                with np.load(path) as data:
+                    return {name: data[name] for name in data.files}
+            f.seek(info.header_offset)
+            name_len, extra_len = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"{path}: array com objetos Python ({info.filename})")
+
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            count = int(np.prod(shape)) if shape else 1
+            if count * dtype.itemsize < 4096:
+                # pequenos (escalares, metadados): lidos direto
+                data = np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype)
+                arrays[name] = data.reshape(shape, order="F" if fortran else "C")
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                         order="F" if fortran else "C")
+    return arrays
+
+
+class FusedScorer:
+    """Preditor do artefato fundido: mesma interface de inferência de UnsupervisedResumeScorer."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], source: str = ""):
+        version = str(arrays["format_version"][()])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Formato de modelo fundido não suportado: {version} (esperado {FORMAT_VERSION})")
+        self.source = source
+        self.feature_names = [str(n) for n in arrays["feature_names"]]
+        self.W = arrays["affine_W"]
+        self.b = arrays["affine_b"]
+        self.centroids = arrays["centroids"]
+        self.quality_by_cluster = np.asarray(arrays["cluster_quality"])
+        self.cluster_sizes = [int(s) for s in arrays["cluster_size"]]
+        self.n_clusters = len(self.cluster_sizes)
+        self.fitted = True
+
+        self._feature = np.asarray(arrays["tree_feature"])
+        self._threshold = np.asarray(arrays["tree_threshold"])
+        self._leaf_value = np.asarray(arrays["tree_leaf_value"])
+        self._denominator = float(arrays["tree_denominator"][()])
+
+    @classmethod
+    def load(cls, path: str) -> "FusedScorer":
+        """Carrega o .npz com mmap (sem sklearn)."""
+        scorer = cls(_mmap_npz(path), source=str(path))
+        print(f"📦 Modelo fundido carregado de: {path}")
+        return scorer
+
+    def _score_samples(self, P: np.ndarray) -> np.ndarray:
+        """IsolationForest.score_samples sobre a matriz já projetada."""
+        n_trees, n_internal = self._feature.shape
+        depth = int(np.log2(n_internal + 1))
+        feature = self._feature.ravel()
+        threshold = self._threshold.ravel()
+        leaf_value = self._leaf_value.ravel()
+        tree_base = np.arange(n_trees, dtype=np.int64) * n_internal
+        leaf_base = np.arange(n_trees, dtype=np.int64) * (n_internal + 1) - n_internal
+
+        # As árvores do sklearn comparam em float32
+        P32 = P.astype(np.float32)
+        n_cols = P32.shape[1]
+        out = np.empty(len(P32), dtype=np.float64)
+        for start in range(0, len(P32), _TREE_CHUNK):
+            block = P32[start:start + _TREE_CHUNK]
+            values = block.ravel()
+            row_base = (np.arange(len(block), dtype=np.int64) * n_cols)[:, None]
+            nodes = np.zeros((len(block), n_trees), dtype=np.int64)  # posição em cada árvore
+            for _ in range(depth):
+                g = nodes + tree_base
+                go_right = values[row_base + feature[g]] > threshold[g]
+                nodes = 2 * nodes + 1 + go_right
+            depths = leaf_value[nodes + leaf_base].sum(axis=1)
+            if self._denominator != 0:
+                depths = depths / self._denominator
+            else:
+                depths = np.ones_like(depths)
+            out[start:start + len(block)] = -(2.0 ** -depths)
+        return out
+
+    def predict_scores(self, X: np.ndarray) -> ScoreBatch:
+        """Scores de uma matriz (N, n_features) numa passada, como UnsupervisedResumeScorer.predict_scores."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        P = X @ self.W + self.b
+        distances = np.sqrt(((P[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2))
+        clusters, distance_to_assigned = nearest_centroid(distances)
+        return build_score_batch(clusters, distance_to_assigned, self._score_samples(P),
+                                 self.quality_by_cluster, self.cluster_sizes)
+
+    def predict_score(self, features: np.ndarray) -> Tuple[float, Dict]:
+        if len(features.shape) == 1:
+            features = features.reshape(1, -1)
+        batch = self.predict_scores(features[:1])
+        return float(batch.scores[0]), batch.metadata(0)
+
+
+def load_unsupervised_scorer(path: str):
+    """
+    Modelo para inferência: .npz fundido (sem sklearn) ou .pkl (joblib).
+
+    Para um .pkl, usa o .npz de mesmo nome ao lado se ele for mais novo
+    (exportado depois do último treino).
+    """
+    model_path = Path(path)
+    fused_path = model_path if model_path.suffix == ".npz" else model_path.with_suffix(".npz")
+    if fused_path.exists() and (
+        fused_path == model_path
+        or not model_path.exists()
+        or fused_path.stat().st_mtime >= model_path.stat().st_mtime
+    ):
+        return FusedScorer.load(str(fused_path))
+    return UnsupervisedResumeScorer.load(str(model_path))
+
+
+def _check(scorer: UnsupervisedResumeScorer, fused: FusedScorer, n: int, seed: int = 42) -> None:
+    """Compara os dois preditores em linhas sintéticas em torno da média do treino."""
+    rng = np.random.default_rng(seed)
+    X = scorer.scaler.mean_ + rng.standard_normal((n, len(scorer.scaler.mean_))) * scorer.scaler.scale_
+    a, b = scorer.predict_scores(X), fused.predict_scores(X)
+    print(f"🔎 Verificação com {n} linhas:")
+    print(f"   Clusters iguais: {(a.clusters == b.clusters).mean() * 100:.2f}%")
+    print(f"   Maior diferença de score: {np.abs(a.scores - b.scores).max():.2e}")
+    print(f"   Maior diferença de anomalia: {np.abs(a.anomaly - b.anomaly).max():.2e}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Exporta o modelo não-supervisionado para o .npz fundido")
+    parser.add_argument("model", nargs="?", default="models/unsupervised_scorer.pkl", help="Modelo .pkl treinado")
+    parser.add_argument("-o", "--output", help="Arquivo .npz de saída (padrão: ao lado do .pkl)")
+    parser.add_argument("--check", type=int, default=0, help="Compara os dois preditores em N linhas sintéticas")
+
+    args = parser.parse_args()
+
+    scorer = UnsupervisedResumeScorer.load(args.model)
+    output = export_fused(scorer, args.output or str(Path(args.model).with_suffix(".npz")))
+
+    t0 = time.perf_counter()
+    fused = FusedScorer.load(output)
+    print(f"⏱️  Carga do modelo fundido: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    if args.check:
+        _check(scorer, fused, args.check)
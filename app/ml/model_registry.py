@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Registro central de modelos carregados sob demanda.
+
+Cada modelo é registrado com um loader (função sem argumentos) e carregado uma
+única vez por processo, mesmo com várias threads pedindo ao mesmo tempo
+(single-flight: um lock por modelo, quem chega depois espera o primeiro terminar).
+Falhas também ficam registradas, para não recarregar a cada requisição, mas só
+por MODEL_RETRY_SECONDS (padrão 60): depois disso a próxima chamada tenta de novo
+(ex.: modelo treinado ou download concluído depois do boot).
+
+Uso:
+    from app.ml.model_registry import registry
+
+    registry.register("spacy_pt", _load_spacy)
+    nlp = registry.get("spacy_pt")
+    registry.stats()  # tempo de carga e memória por modelo
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class ModelLoadError(RuntimeError):
+    """Falha (já registrada) ao carregar um modelo."""
+
+
+# Segundos até uma falha de carga ser tentada de novo
+RETRY_SECONDS = float(os.getenv("MODEL_RETRY_SECONDS", "60"))
+
+
+def _rss_bytes() -> int:
+    """Memória residente atual do processo (0 se indisponível)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss é o pico (KB no Linux, bytes no macOS): aproximação
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+
+class _Entry:
+    __slots__ = ("loader", "lock", "value", "loaded", "error", "retry_at", "load_seconds", "rss_delta_bytes",
+                 "loaded_at")
+
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.value = None
+        self.loaded = False
+        self.error: Optional[BaseException] = None
+        self.retry_at = 0.0  # time.monotonic() a partir do qual a falha é tentada de novo
+        self.load_seconds = 0.0
+        self.rss_delta_bytes = 0
+        self.loaded_at: Optional[float] = None
+
+
+class ModelRegistry:
+    """Registro thread-safe de modelos com carga lazy e única."""
+
+    def __init__(self, retry_seconds: float = RETRY_SECONDS):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.retry_seconds = retry_seconds
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """Registra (ou mantém) o loader de um modelo. Idempotente."""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(loader)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return bool(entry and entry.loaded)
+
+    def has_failed(self, name: str) -> bool:
+        """
+        O loader falhou e a falha ainda vale (get() levanta ModelLoadError sem tentar
+        de novo). Vencido o prazo de retry volta a False, como um modelo não carregado.
+        """
+        entry = self._entries.get(name)
+        return bool(entry and entry.error is not None and time.monotonic() < entry.retry_at)
+
+    def get(self, name: str) -> Any:
+        """
+        Retorna o modelo, carregando-o na primeira chamada.
+
+        Raises:
+            KeyError: modelo não registrado
+            ModelLoadError: o loader falhou (nesta chamada ou numa anterior, dentro
+                do prazo de retry)
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Modelo não registrado: {name}")
+        if entry.loaded:
+            return entry.value
+
+        with entry.lock:
+            if entry.loaded:
+                return entry.value
+            if entry.error is not None and time.monotonic() < entry.retry_at:
+                raise ModelLoadError(f"{name}: {entry.error}") from entry.error
+
+            rss0 = _rss_bytes()
+            t0 = time.perf_counter()
+            try:
+                value = entry.loader()
+            except Exception as e:
+                entry.error = e
+                entry.retry_at = time.monotonic() + self.retry_seconds
+                entry.load_seconds = time.perf_counter() - t0
+                raise ModelLoadError(f"{name}: {e}") from e
+
+            entry.load_seconds = time.perf_counter() - t0
+            entry.rss_delta_bytes = max(0, _rss_bytes() - rss0)
+            entry.loaded_at = time.time()
+            entry.value = value
+            entry.loaded = True
+            entry.error = None
+            return value
+
+    def get_or_register(self, name: str, loader: Callable[[], Any]) -> Any:
+        self.register(name, loader)
+        return self.get(name)
+
+    def unload(self, name: str) -> None:
+        """Descarta a instância (e erro) para que a próxima chamada recarregue."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return
+        with entry.lock:
+            entry.value = None
+            entry.loaded = False
+            entry.error = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Tempo de carga e memória (delta de RSS durante a carga) por modelo."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, entry in list(self._entries.items()):
+            out[name] = {
+                "loaded": entry.loaded,
+                "load_seconds": round(entry.load_seconds, 3),
+                "rss_delta_mb": round(entry.rss_delta_bytes / (1024 * 1024), 1),
+                "loaded_at": entry.loaded_at,
+                "error": str(entry.error) if entry.error else None,
+            }
+        return out
+
+
+# Instância única do processo
+registry = ModelRegistry()
@@ -90,6 +90,11 @@ class ResumeClassifier:
         """
         # Obter predição ML
         ml_pred, ml_prob_noexp, ml_prob_exp = self._predict_ml(text, return_probs=True)
+        return self._decide(ml_pred, ml_prob_noexp, ml_prob_exp, years_experience, return_probs, return_details)
+    
+    def _decide(self, ml_pred: int, ml_prob_noexp: float, ml_prob_exp: float, years_experience: float = None,
+                return_probs: bool = False, return_details: bool = False):
+        """Combina a saída do modelo com as regras de anos (ver predict)."""
         ml_confidence = max(ml_prob_noexp, ml_prob_exp)
         
         # Se não está usando modo híbrido ou não tem years_experience, usar só ML
@@ -192,6 +197,45 @@ class ResumeClassifier:
         else:
             return result["prediction"]
     
+    def _predict_ml_batch(self, texts: list, batch_size: int = 16) -> list:
+        """(pred, prob_noexp, prob_exp) por texto, com o modelo rodando em lotes."""
+        outputs_all = []
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i+batch_size]
+            inputs = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="pt"
+            )
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            
+            with torch.no_grad():
+                logits = self.model(**inputs).logits
+                probs = torch.softmax(logits, dim=-1).cpu().tolist()
+                preds = torch.argmax(logits, dim=-1).cpu().tolist()
+            outputs_all.extend((pred, p[0], p[1]) for pred, p in zip(preds, probs))
+        return outputs_all
+    
+    def predict_many(self, texts: list, years_list: list = None, batch_size: int = 16) -> list:
+        """
+        Versão em lote de predict(..., return_details=True).
+        
+        Args:
+            texts: Textos dos currículos
+            years_list: Anos de experiência de cada texto (None = só ML)
+            batch_size: Textos por forward do modelo
+        
+        Returns:
+            Lista de dicts de detalhes, na ordem de entrada
+        """
+        years_list = years_list if years_list is not None else [None] * len(texts)
+        return [
+            self._decide(pred, p_noexp, p_exp, years, return_details=True)
+            for (pred, p_noexp, p_exp), years in zip(self._predict_ml_batch(texts, batch_size), years_list)
+        ]
+    
     def predict_batch(self, texts: list, batch_size: int = 16):
         """
         Prediz em lote.
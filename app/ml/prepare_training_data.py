@@ -19,7 +19,8 @@ def prepare_training_data(
     test_size: float = 0.2,
     val_size: float = 0.1,
     balance: bool = True,
-    max_samples_per_class: int = None
+    max_samples_per_class: int = None,
+    parquet_dir: str = None
 ):
     """
     Prepara dados de treinamento do MongoDB.
@@ -31,39 +32,52 @@ def prepare_training_data(
         val_size: % para validação
         balance: Se True, balanceia classes
         max_samples_per_class: Limite por classe (None = sem limite)
+        parquet_dir: Lê do export Parquet (app.db.exportar_parquet) em vez do MongoDB
     """
     load_dotenv()
     
-    MONGO_URI = os.getenv("MONGO_URI")
-    MONGO_DB = os.getenv("MONGO_DB", "resumAI")
-    MONGO_COLLECTION = os.getenv("MONGO_COLLECTION", "dados_processados")
-    
-    client = MongoClient(MONGO_URI)
-    db = client[MONGO_DB]
-    collection = db[MONGO_COLLECTION]
-    
     # Criar diretório de saída
     os.makedirs(output_dir, exist_ok=True)
     
-    print("📊 Coletando dados do MongoDB...")
-    
-    # Query: documentos com texto limpo e experiências
-    query = {
-        "resume_text_clean": {"$exists": True, "$ne": ""},
-        "experiences": {"$exists": True}
-    }
-    
-    cursor = collection.find(query, {
-        "_id": 1,
-        "resume_text_clean": 1,
-        "skills": 1,
-        "experiences": 1,
-        "years_experience": 1,
-        "category": 1,
-        "filename": 1
-    })
-    
-    total = collection.count_documents(query)
+    if parquet_dir:
+        from app.db.exportar_parquet import iter_rows, read_dataset
+
+        print(f"📊 Coletando dados do Parquet local ({parquet_dir})...")
+        client = None
+        table = read_dataset(parquet_dir, "dados_processados", columns=[
+            "_id", "resume_text_clean", "skills", "num_experiences",
+            "years_experience", "category", "filename"
+        ])
+        cursor = iter_rows(table)
+        total = table.num_rows
+    else:
+        MONGO_URI = os.getenv("MONGO_URI")
+        MONGO_DB = os.getenv("MONGO_DB", "resumAI")
+        MONGO_COLLECTION = os.getenv("MONGO_COLLECTION", "dados_processados")
+        
+        client = MongoClient(MONGO_URI)
+        db = client[MONGO_DB]
+        collection = db[MONGO_COLLECTION]
+        
+        print("📊 Coletando dados do MongoDB...")
+        
+        # Query: documentos com texto limpo e experiências
+        query = {
+            "resume_text_clean": {"$exists": True, "$ne": ""},
+            "experiences": {"$exists": True}
+        }
+        
+        cursor = collection.find(query, {
+            "_id": 1,
+            "resume_text_clean": 1,
+            "skills": 1,
+            "experiences": 1,
+            "years_experience": 1,
+            "category": 1,
+            "filename": 1
+        })
+        
+        total = collection.count_documents(query)
     
     # Classificar em experienced (1) ou not experienced (0)
     data_experienced = []
@@ -71,7 +85,7 @@ def prepare_training_data(
     
     for doc in tqdm(cursor, total=total, desc="Processando"):
         years = doc.get("years_experience", 0.0)
-        text = doc.get("resume_text_clean", "").strip()
+        text = (doc.get("resume_text_clean") or "").strip()
         
         if not text or len(text) < 100:  # Filtrar textos muito curtos
             continue
@@ -82,7 +96,7 @@ def prepare_training_data(
             "skills": doc.get("skills", []),
             "years_experience": years,
             "category": doc.get("category", "UNKNOWN"),
-            "num_experiences": len(doc.get("experiences", [])),
+            "num_experiences": doc.get("num_experiences", len(doc.get("experiences") or [])),
             "filename": doc.get("filename", "")
         }
         
@@ -118,7 +132,8 @@ def prepare_training_data(
         print("\n⚠️  Nenhuma amostra encontrada a partir da coleção/consulta informada.")
         print("   Verifique as variáveis .env (MONGO_URI, MONGO_DB, MONGO_COLLECTION)")
         print("   e os campos esperados: 'resume_text_clean', 'years_experience', 'experiences'.")
-        client.close()
+        if client is not None:
+            client.close()
         return {
             "created_at": datetime.utcnow().isoformat(),
             "min_years_experienced": min_years_experienced,
@@ -183,7 +198,8 @@ def prepare_training_data(
         json.dump(metadata, f, ensure_ascii=False, indent=2)
     print(f"   ✅ Metadados: {metadata_path}")
     
-    client.close()
+    if client is not None:
+        client.close()
     
     print(f"\n🎉 Preparação concluída! Dados salvos em: {output_dir}")
     return metadata
@@ -199,6 +215,7 @@ if __name__ == "__main__":
     parser.add_argument("--val-size", type=float, default=0.1, help="% para validação")
     parser.add_argument("--no-balance", action="store_true", help="Não balancear classes")
     parser.add_argument("--max-per-class", type=int, default=None, help="Máximo de amostras por classe")
+    parser.add_argument("--parquet-dir", default=None, help="Lê do export Parquet local em vez do MongoDB")
     
     args = parser.parse_args()
     
@@ -208,5 +225,6 @@ if __name__ == "__main__":
         test_size=args.test_size,
         val_size=args.val_size,
         balance=not args.no_balance,
-        max_samples_per_class=args.max_per_class
+        max_samples_per_class=args.max_per_class,
+        parquet_dir=args.parquet_dir
     )
@@ -4,38 +4,47 @@
 Cálculo de similaridade semântica usando modelo fine-tuned.
 Modelo treinado especificamente para matching currículo-vaga com MAE 0.04 e Pearson 0.86.
 """
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
-import torch
 from pathlib import Path
 
+from app.ml.model_registry import registry, ModelLoadError
+
 # Modelo fine-tuned para matching
-_EMBEDDING_MODEL = None
 _MODEL_PATH = "models/semantic_matcher_finetuned"
 
+def _load_embedding_model():
+    # Import tardio: torch/sentence_transformers só quando o modelo é realmente usado
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    try:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model_path = Path(_MODEL_PATH)
+        
+        if model_path.exists():
+            # Usar modelo fine-tuned
+            model = SentenceTransformer(_MODEL_PATH, device=device)
+            print(f"✅ Modelo fine-tuned carregado de {_MODEL_PATH} em {device}")
+        else:
+            # Fallback para modelo base
+            model = SentenceTransformer(
+                'paraphrase-multilingual-mpnet-base-v2',
+                device=device
+            )
+            print(f"⚠️  Modelo fine-tuned não encontrado, usando base em {device}")
+    except Exception as e:
+        print(f"❌ Erro ao carregar modelo: {e}")
+        raise
+    return model
+
+registry.register("embedding", _load_embedding_model)
+
 def get_embedding_model():
-    """Retorna modelo singleton fine-tuned."""
-    global _EMBEDDING_MODEL
-    if _EMBEDDING_MODEL is None:
-        try:
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            model_path = Path(_MODEL_PATH)
-            
-            if model_path.exists():
-                # Usar modelo fine-tuned
-                _EMBEDDING_MODEL = SentenceTransformer(_MODEL_PATH, device=device)
-                print(f"✅ Modelo fine-tuned carregado de {_MODEL_PATH} em {device}")
-            else:
-                # Fallback para modelo base
-                _EMBEDDING_MODEL = SentenceTransformer(
-                    'paraphrase-multilingual-mpnet-base-v2',
-                    device=device
-                )
-                print(f"⚠️  Modelo fine-tuned não encontrado, usando base em {device}")
-        except Exception as e:
-            print(f"❌ Erro ao carregar modelo: {e}")
-            _EMBEDDING_MODEL = None
-    return _EMBEDDING_MODEL
+    """Retorna instância única do modelo fine-tuned (None se falhou ao carregar)."""
+    try:
+        return registry.get("embedding")
+    except ModelLoadError:
+        return None
 
 
 def compute_semantic_similarity(resume_text: str, job_description: str = None) -> float:
@@ -62,6 +71,8 @@ def compute_semantic_similarity(resume_text: str, job_description: str = None) -
         print("❌ Semantic: modelo não carregado")
         return 0.0
     
+    from sentence_transformers import util
+
     try:
         # Truncar textos
         resume_text = resume_text[:2000]
@@ -87,6 +98,43 @@ def compute_semantic_similarity(resume_text: str, job_description: str = None) -
         return 0.0
 
 
+def compute_semantic_similarity_batch(resume_texts: list, job_descriptions: list, batch_size: int = 32) -> list:
+    """
+    Versão em lote de compute_semantic_similarity: um encode para todos os
+    currículos e um para as vagas distintas.
+    
+    Returns:
+        Lista de scores 0.0-1.0 na ordem de entrada (0.0 sem vaga/texto)
+    """
+    results = [0.0] * len(resume_texts)
+    idx = [i for i, (r, j) in enumerate(zip(resume_texts, job_descriptions)) if r and j]
+    if not idx:
+        return results
+    
+    model = get_embedding_model()
+    if model is None:
+        print("❌ Semantic: modelo não carregado")
+        return results
+    
+    from sentence_transformers import util
+
+    try:
+        jobs = list(dict.fromkeys(job_descriptions[i][:1000] for i in idx))
+        job_pos = {job: k for k, job in enumerate(jobs)}
+        resume_emb = model.encode([resume_texts[i][:2000] for i in idx], batch_size=batch_size,
+                                  convert_to_tensor=True)
+        job_emb = model.encode(jobs, batch_size=batch_size, convert_to_tensor=True)
+        sims = util.cos_sim(resume_emb, job_emb).cpu().numpy()
+        
+        for row, i in enumerate(idx):
+            similarity = float(sims[row, job_pos[job_descriptions[i][:1000]]])
+            results[i] = float(np.clip((similarity + 1.0) / 2.0, 0.0, 1.0))
+        print(f"✅ Semantic calculado em lote: {len(idx)} currículos, {len(jobs)} vaga(s)")
+    except Exception as e:
+        print(f"⚠️  Erro ao calcular similaridade em lote: {e}")
+    return results
+
+
 def compute_resume_quality_embedding(resume_text: str) -> float:
     """
     Calcula score de qualidade baseado na densidade semântica do currículo.
@@ -104,6 +152,8 @@ def compute_resume_quality_embedding(resume_text: str) -> float:
     if model is None:
         return 0.5
     
+    from sentence_transformers import util
+
     try:
         # Dividir em chunks
         chunks = [resume_text[i:i+500] for i in range(0, min(len(resume_text), 5000), 500)]
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Treino do modelo não-supervisionado sobre toda a coleção, fora da memória.
+
+UnsupervisedResumeScorer.fit precisa da matriz inteira em RAM e usa K-Means
+completo (n_init=10) e silhouette exato (O(n²)). Para milhões de currículos:
+
+    1. os documentos vêm do MongoDB em streaming (só os campos das features);
+    2. extract_features_array roda em paralelo (processos) por blocos;
+    3. as linhas vão para um .npy aberto com mmap (cache reaproveitado nos
+       próximos treinos enquanto o extrator (feature_fingerprint) e o número
+       de documentos não mudarem; currículos reprocessados no lugar não mudam
+       a contagem: use --rebuild-cache depois de reprocessar a coleção);
+    4. fit_streaming lê o .npy em blocos (IncrementalPCA, MiniBatchKMeans,
+       silhouette e IsolationForest em amostras).
+
+Uso:
+    python -m app.ml.train_unsupervised
+    python -m app.ml.train_unsupervised --workers 8 --export-fused
+    python -m app.ml.train_unsupervised --rebuild-cache --limit 200000
+"""
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from app.ml.unsupervised_scoring import (
+    FEATURE_NAMES, UnsupervisedResumeScorer, extract_features_matrix, feature_fingerprint,
+)
+
+DEFAULT_CACHE = "data/cache/unsupervised_features.npy"
+DEFAULT_MODEL = "models/unsupervised_scorer.pkl"
+
+# Só o que extract_features_array lê
+PROJECTION = {
+    "_id": 0,
+    "skills": 1,
+    "years_experience": 1,
+    "experiences.description": 1,
+    "resume_text_clean": 1,
+    "metadata.email": 1,
+    "metadata.phone": 1,
+    "metadata.linkedin": 1,
+}
+
+
+def _doc_batches(collection, batch_docs: int, limit: int) -> Iterator[List[dict]]:
+    cursor = collection.find({}, PROJECTION, no_cursor_timeout=True).batch_size(batch_docs)
+    if limit:
+        cursor = cursor.limit(limit)
+    try:
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) == batch_docs:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        cursor.close()
+
+
+def _extract_parallel(batches: Iterator[List[dict]], workers: int) -> Iterator[np.ndarray]:
+    """Matrizes de features na ordem dos lotes, com no máximo 2*workers lotes em voo."""
+    if workers <= 1:
+        for batch in batches:
+            yield extract_features_matrix(batch)
+        return
+
+    from multiprocessing import Pool
+
+    with Pool(workers) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(extract_features_matrix, (batch,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def _meta_path(cache_path: str) -> Path:
+    return Path(cache_path).with_suffix(".json")
+
+
+def load_feature_cache(cache_path: str, expected_rows: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    Abre o cache de features com mmap se ele for compatível
+
+    Returns:
+        np.memmap (n_docs, len(FEATURE_NAMES)) ou None (cache ausente ou desatualizado)
+    """
+    meta_file = _meta_path(cache_path)
+    if not Path(cache_path).exists() or not meta_file.exists():
+        return None
+    meta = json.loads(meta_file.read_text(encoding="utf-8"))
+    if meta.get("feature_names") != FEATURE_NAMES:
+        print(f"⚠️  Cache com outras features, recriando: {cache_path}")
+        return None
+    if meta.get("extractor") != feature_fingerprint():
+        print(f"⚠️  Cache gerado por outra versão do extrator de features, recriando: {cache_path}")
+        return None
+    if expected_rows is not None and meta.get("rows") != expected_rows:
+        print(f"⚠️  Cache com {meta.get('rows')} linhas, coleção com {expected_rows}; recriando")
+        return None
+    return np.load(cache_path, mmap_mode="r")
+
+
+def build_feature_cache(collection, cache_path: str, workers: int = 1, batch_docs: int = 500,
+                        limit: int = 0) -> np.ndarray:
+    """
+    Extrai as features de toda a coleção direto para um .npy em disco
+
+    Args:
+        collection: Coleção do MongoDB (dados_processados)
+        cache_path: Arquivo .npy de saída (um .json ao lado guarda os metadados)
+        workers: Processos de extração (1 = no processo atual)
+        batch_docs: Documentos por lote enviado a cada processo
+        limit: Máximo de documentos (0 = todos)
+
+    Returns:
+        np.memmap somente leitura com as features
+    """
+    total = collection.count_documents({})
+    if limit:
+        total = min(total, limit)
+    if total == 0:
+        raise ValueError("Nenhum currículo em dados_processados para treinar")
+    print(f"📥 Extraindo features de {total} currículos ({workers} processos)...")
+
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path + ".tmp.npy"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64,
+                                    shape=(total, len(FEATURE_NAMES)))
+    rows = 0
+    t0 = time.perf_counter()
+    # O limite evita estourar a pré-alocação se chegarem documentos durante a leitura
+    for X in _extract_parallel(_doc_batches(collection, batch_docs, total), workers):
+        out[rows:rows + len(X)] = X
+        rows += len(X)
+        if rows % (batch_docs * 100) < len(X):
+            rate = rows / max(time.perf_counter() - t0, 1e-9)
+            print(f"   {rows}/{total} ({rate:.0f} docs/s)")
+    out.flush()
+
+    if rows < total:
+        # Documentos removidos durante a leitura: copia para um arquivo do tamanho certo
+        exact = np.lib.format.open_memmap(tmp_path + ".exact.npy", mode="w+", dtype=np.float64,
+                                          shape=(rows, len(FEATURE_NAMES)))
+        for start in range(0, rows, 100000):
+            exact[start:start + 100000] = out[start:start + 100000]
+        exact.flush()
+        del out, exact
+        os.replace(tmp_path + ".exact.npy", tmp_path)
+    else:
+        del out
+    os.replace(tmp_path, cache_path)
+
+    _meta_path(cache_path).write_text(json.dumps({
+        "feature_names": FEATURE_NAMES,
+        "extractor": feature_fingerprint(),
+        "rows": rows,
+        "limit": limit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }, indent=2), encoding="utf-8")
+    print(f"✅ {rows} linhas em {cache_path} ({time.perf_counter() - t0:.1f}s)")
+
+    return np.load(cache_path, mmap_mode="r")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Treina o modelo não-supervisionado em streaming")
+    parser.add_argument("--output", default=DEFAULT_MODEL, help="Modelo .pkl de saída")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="Cache .npy das features")
+    parser.add_argument("--rebuild-cache", action="store_true", help="Extrai as features de novo")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos de extração")
+    parser.add_argument("--batch-docs", type=int, default=500, help="Documentos por lote de extração")
+    parser.add_argument("--limit", type=int, default=0, help="Máximo de documentos (0 = todos)")
+    parser.add_argument("--n-clusters", type=int, default=5)
+    parser.add_argument("--n-components", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Linhas por bloco no treino")
+    parser.add_argument("--epochs", type=int, default=2, help="Passadas do MiniBatchKMeans")
+    parser.add_argument("--sample-size", type=int, default=100000,
+                        help="Amostra para iniciar o K-Means e treinar o IsolationForest")
+    parser.add_argument("--silhouette-sample", type=int, default=10000, help="Linhas usadas no silhouette")
+    parser.add_argument("--export-fused", action="store_true", help="Gera também o .npz fundido")
+
+    args = parser.parse_args()
+
+    from app.db.mongo import get_db
+
+    collection = get_db()["dados_processados"]
+    expected = collection.count_documents({})
+    if args.limit:
+        expected = min(expected, args.limit)
+
+    X = None if args.rebuild_cache else load_feature_cache(args.cache, expected)
+    if X is None:
+        X = build_feature_cache(collection, args.cache, workers=args.workers,
+                                batch_docs=args.batch_docs, limit=args.limit)
+    else:
+        print(f"♻️  Usando cache de features: {args.cache} ({len(X)} linhas)")
+
+    scorer = UnsupervisedResumeScorer(n_clusters=args.n_clusters, n_components=args.n_components)
+    t0 = time.perf_counter()
+    scorer.fit_streaming(X, FEATURE_NAMES, chunk_size=args.chunk_size, epochs=args.epochs,
+                         sample_size=args.sample_size, silhouette_sample=args.silhouette_sample)
+    print(f"⏱️  Treino: {time.perf_counter() - t0:.1f}s")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    scorer.save(args.output)
+
+    if args.export_fused:
+        from app.ml.fused_scorer import export_fused
+
+        export_fused(scorer, str(Path(args.output).with_suffix(".npz")))
@@ -4,16 +4,18 @@ Sistema de Scoring Não-Supervisionado
 Usa clustering e análise de componentes principais para avaliar currículos
 sem necessidade de anotações humanas.
 """
+import hashlib
+import inspect
+import json
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans, DBSCAN
-from sklearn.ensemble import IsolationForest
-from sklearn.metrics import silhouette_score
-import joblib
 from pathlib import Path
 from typing import Dict, List, Tuple
 import warnings
+
+from app.nlp import certifications
+from app.nlp.certifications import count_cert_keywords
+from app.nlp.text_view import TextView
+
 warnings.filterwarnings('ignore')
 
 
@@ -41,6 +43,12 @@ class UnsupervisedResumeScorer:
         self.n_clusters = n_clusters
         self.n_components = n_components
         
+        # Import tardio: sklearn só é necessário ao construir/treinar/carregar o modelo
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.decomposition import PCA
+        from sklearn.cluster import KMeans
+        from sklearn.ensemble import IsolationForest
+        
         # Modelos
         self.scaler = StandardScaler()
         self.pca = PCA(n_components=n_components)
@@ -61,6 +69,8 @@ class UnsupervisedResumeScorer:
             features: Array (n_samples, n_features)
             feature_names: Lista de nomes das features
         """
+        from sklearn.metrics import silhouette_score
+        
         print(f"🔄 Treinando modelo não-supervisionado...")
         print(f"   Dataset: {features.shape[0]} currículos, {features.shape[1]} features")
         
@@ -99,6 +109,124 @@ class UnsupervisedResumeScorer:
         
         return self
     
+    def fit_streaming(self, features: np.ndarray, feature_names: List[str], chunk_size: int = 50000,
+                      epochs: int = 2, sample_size: int = 100000, silhouette_sample: int = 10000,
+                      random_state: int = 42):
+        """
+        Treina o modelo sem carregar a matriz inteira (ex.: .npy com mmap)
+        
+        Mesmas etapas de fit(), em blocos de `chunk_size` linhas:
+        - StandardScaler.partial_fit e IncrementalPCA.partial_fit (uma passada cada)
+        - MiniBatchKMeans iniciado numa amostra e refinado com partial_fit (`epochs` passadas)
+        - IsolationForest numa amostra (cada árvore usa só 256 linhas)
+        - Silhouette numa amostra de `silhouette_sample` linhas (o exato é O(n²))
+        - Perfis dos clusters por somas acumuladas
+        
+        Args:
+            features: Array (n_samples, n_features), de preferência np.memmap
+            feature_names: Lista de nomes das features
+            chunk_size: Linhas por bloco lido
+            epochs: Passadas do MiniBatchKMeans sobre os dados
+            sample_size: Linhas da amostra usada na inicialização do K-Means e no IsolationForest
+            silhouette_sample: Linhas usadas no silhouette
+        """
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import IncrementalPCA
+        from sklearn.metrics import silhouette_score
+        
+        n_samples, n_features = features.shape
+        print(f"🔄 Treinando modelo não-supervisionado (streaming)...")
+        print(f"   Dataset: {n_samples} currículos, {n_features} features, blocos de {chunk_size}")
+        
+        self.feature_names = feature_names
+        # Último bloco curto é juntado ao anterior (IncrementalPCA precisa de >= n_components linhas)
+        bounds = list(range(0, n_samples, chunk_size))
+        if len(bounds) > 1 and n_samples - bounds[-1] < self.n_components:
+            bounds.pop()
+        bounds = list(zip(bounds, bounds[1:] + [n_samples]))
+        
+        def chunks():
+            for start, stop in bounds:
+                yield np.asarray(features[start:stop], dtype=np.float64)
+        
+        def projected(X):
+            return self.pca.transform(self.scaler.transform(X))
+        
+        rng = np.random.default_rng(random_state)
+        sample_idx = np.sort(rng.choice(n_samples, size=min(sample_size, n_samples), replace=False))
+        
+        # 1. Normalização
+        print(f"   [1/5] Normalizando features...")
+        for X in chunks():
+            self.scaler.partial_fit(X)
+        
+        # 2. PCA - Redução de dimensionalidade
+        print(f"   [2/5] Aplicando IncrementalPCA ({self.n_components} componentes)...")
+        self.pca = IncrementalPCA(n_components=self.n_components)
+        for X in chunks():
+            self.pca.partial_fit(self.scaler.transform(X))
+        variance_explained = self.pca.explained_variance_ratio_.sum()
+        print(f"         Variância explicada: {variance_explained*100:.1f}%")
+        
+        # 3. Clustering
+        print(f"   [3/5] Clustering com MiniBatchKMeans ({self.n_clusters} clusters, {epochs} passadas)...")
+        sample_pca = projected(np.asarray(features[sample_idx], dtype=np.float64))
+        self.kmeans = MiniBatchKMeans(n_clusters=self.n_clusters, random_state=random_state, n_init=3,
+                                      batch_size=min(chunk_size, 4096))
+        self.kmeans.fit(sample_pca)
+        for _ in range(epochs):
+            for X in chunks():
+                self.kmeans.partial_fit(projected(X))
+        sample_labels = self.kmeans.predict(sample_pca)
+        if len(set(sample_labels.tolist())) > 1:
+            silhouette = silhouette_score(sample_pca, sample_labels,
+                                          sample_size=min(silhouette_sample, len(sample_pca)),
+                                          random_state=random_state)
+            print(f"         Silhouette Score (amostra): {silhouette:.3f}")
+        
+        # 4. Anomaly Detection
+        print(f"   [4/5] Treinando Isolation Forest (amostra de {len(sample_pca)})...")
+        self.isolation_forest.fit(sample_pca)
+        
+        # 5. Analisar perfis dos clusters
+        print(f"   [5/5] Analisando perfis dos clusters...")
+        counts = np.zeros(self.n_clusters)
+        sums = np.zeros((self.n_clusters, n_features))
+        sq_sums = np.zeros((self.n_clusters, n_features))
+        for X in chunks():
+            labels = self.kmeans.predict(projected(X))
+            counts += np.bincount(labels, minlength=self.n_clusters)
+            np.add.at(sums, labels, X)
+            np.add.at(sq_sums, labels, X * X)
+        self.cluster_profiles = self._profiles_from_sums(counts, sums, sq_sums)
+        self.cluster_quality_scores = self._rank_clusters_by_quality(self.cluster_profiles)
+        
+        self.fitted = True
+        print(f"✅ Modelo treinado com sucesso!\n")
+        
+        self._print_cluster_summary()
+        
+        return self
+    
+    def _profiles_from_sums(self, counts: np.ndarray, sums: np.ndarray, sq_sums: np.ndarray) -> List[Dict]:
+        """Perfis dos clusters (como _analyze_cluster_profiles) a partir de contagens e somas por cluster"""
+        total = counts.sum()
+        profiles = []
+        
+        for cluster_id in range(self.n_clusters):
+            n = counts[cluster_id]
+            mean = sums[cluster_id] / n if n else np.zeros(sums.shape[1])
+            var = np.maximum(sq_sums[cluster_id] / n - mean * mean, 0) if n else np.zeros(sums.shape[1])
+            profiles.append({
+                'cluster_id': cluster_id,
+                'size': int(n),
+                'percentage': float(n / total * 100) if total else 0.0,
+                'mean_features': {name: float(mean[i]) for i, name in enumerate(self.feature_names)},
+                'std_features': {name: float(np.sqrt(var[i])) for i, name in enumerate(self.feature_names)}
+            })
+        
+        return profiles
+    
     def _analyze_cluster_profiles(self, features: np.ndarray, labels: np.ndarray) -> List[Dict]:
         """Analisa o perfil médio de cada cluster"""
         profiles = []
@@ -223,84 +351,54 @@ class UnsupervisedResumeScorer:
             score: Float 0-100
             metadata: Dict com informações adicionais
         """
-        if not self.fitted:
-            raise ValueError("Modelo não treinado! Chame .fit() primeiro.")
-        
         # Garantir shape correto
         if len(features.shape) == 1:
             features = features.reshape(1, -1)
         
-        # 1. Normalizar
-        X_scaled = self.scaler.transform(features)
+        batch = self.predict_scores(features[:1])
+        return float(batch.scores[0]), batch.metadata(0)
+    
+    def predict_scores(self, X: np.ndarray) -> "ScoreBatch":
+        """
+        Prediz scores para uma matriz de currículos numa passada vetorizada
+        
+        Cada etapa (scaler, PCA, distâncias ao K-Means, IsolationForest) roda uma
+        vez para a matriz inteira; o cluster é o centróide mais próximo (o mesmo
+        de kmeans.predict). Os dicts de metadata só são montados sob demanda.
+        
+        Args:
+            X: Matriz (N, n_features)
+        
+        Returns:
+            ScoreBatch com arrays de scores, clusters, distâncias e anomalia
+        """
+        if not self.fitted:
+            raise ValueError("Modelo não treinado! Chame .fit() primeiro.")
         
-        # 2. PCA
-        X_pca = self.pca.transform(X_scaled)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
         
-        # 3. Predizer cluster
-        cluster_id = self.kmeans.predict(X_pca)[0]
+        # 1-2. Normalizar + PCA
+        X_pca = self.pca.transform(self.scaler.transform(X))
         
-        # 4. Calcular distâncias
-        distances = self.kmeans.transform(X_pca)[0]
-        distance_to_assigned = distances[cluster_id]
-        min_distance = distances.min()
+        # 3-4. Distâncias a todos os centróides; cluster = o mais próximo
+        clusters, distance_to_assigned = nearest_centroid(self.kmeans.transform(X_pca))
         
         # 5. Anomaly score
-        anomaly_score = self.isolation_forest.score_samples(X_pca)[0]
-        # Normalizar: -0.5 (normal) a 0.5 (anômalo) → 0 a 1
-        anomaly_normalized = (anomaly_score + 0.5)
-        
-        # 6. Calcular score final
-        # Componentes:
-        # - 50%: Qualidade do cluster atribuído
-        # - 30%: Quão próximo está do centróide (densidade)
-        # - 20%: Quão excepcional é (anomaly - valores altos = excepcional)
-        
-        cluster_quality = self.cluster_quality_scores[cluster_id]
-        
-        # Proximidade ao centróide (inverso da distância, normalizado)
-        # Distância típica ~2-5, então normalizamos
-        proximity_score = max(0, 1 - (distance_to_assigned / 5.0))
-        
-        # Score final (0-100)
-        base_score = cluster_quality * 100  # 0-100
-        proximity_bonus = proximity_score * 20  # até +20
-        anomaly_bonus = max(0, anomaly_normalized) * 10  # até +10 se excepcional
-        
-        final_score = base_score + proximity_bonus + anomaly_bonus
-        final_score = max(0, min(100, final_score))  # Clip 0-100
-        
-        # Label
-        if final_score >= 80:
-            label = "Excelente"
-        elif final_score >= 65:
-            label = "Bom"
-        elif final_score >= 50:
-            label = "Regular"
-        elif final_score >= 35:
-            label = "Fraco"
-        else:
-            label = "Muito Fraco"
-        
-        metadata = {
-            'cluster_id': int(cluster_id),
-            'cluster_quality': float(cluster_quality),
-            'cluster_size': self.cluster_profiles[cluster_id]['size'],
-            'distance_to_centroid': float(distance_to_assigned),
-            'proximity_score': float(proximity_score),
-            'anomaly_score': float(anomaly_normalized),
-            'is_outlier': bool(anomaly_normalized > 0.6),
-            'score_components': {
-                'base': float(base_score),
-                'proximity_bonus': float(proximity_bonus),
-                'anomaly_bonus': float(anomaly_bonus)
-            },
-            'label': label
-        }
+        samples_score = self.isolation_forest.score_samples(X_pca)
         
-        return float(final_score), metadata
+        # 6. Score final
+        quality_by_cluster = np.array(
+            [self.cluster_quality_scores[c] for c in range(self.n_clusters)], dtype=np.float64
+        )
+        sizes = [profile['size'] for profile in self.cluster_profiles]
+        return build_score_batch(clusters, distance_to_assigned, samples_score, quality_by_cluster, sizes)
     
     def save(self, path: str):
         """Salva modelo treinado"""
+        import joblib
+        
         model_data = {
             'scaler': self.scaler,
             'pca': self.pca,
@@ -320,6 +418,8 @@ class UnsupervisedResumeScorer:
     @classmethod
     def load(cls, path: str):
         """Carrega modelo treinado"""
+        import joblib
+        
         model_data = joblib.load(path)
         
         scorer = cls(
@@ -340,11 +440,120 @@ class UnsupervisedResumeScorer:
         return scorer
 
 
-def extract_features_array(doc: dict) -> np.ndarray:
+def score_label(score: float) -> str:
+    """Label qualitativo do score ML (0-100)."""
+    if score >= 80:
+        return "Excelente"
+    elif score >= 65:
+        return "Bom"
+    elif score >= 50:
+        return "Regular"
+    elif score >= 35:
+        return "Fraco"
+    return "Muito Fraco"
+
+
+def nearest_centroid(distances: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(cluster, distância ao centróide do cluster) a partir da matriz (N, k) de distâncias."""
+    clusters = distances.argmin(axis=1)
+    return clusters, distances[np.arange(len(clusters)), clusters]
+
+
+def build_score_batch(clusters: np.ndarray, distances: np.ndarray, samples_score: np.ndarray,
+                      quality_by_cluster: np.ndarray, cluster_sizes: List[int]) -> "ScoreBatch":
+    """
+    Score final a partir das saídas do modelo (usado pelo modelo sklearn e pelo fundido)
+    
+    Componentes:
+    - 50%: Qualidade do cluster atribuído
+    - 30%: Quão próximo está do centróide (densidade)
+    - 20%: Quão excepcional é (anomaly - valores altos = excepcional)
+    
+    Args:
+        clusters: Cluster de cada linha
+        distances: Distância de cada linha ao centróide do seu cluster
+        samples_score: IsolationForest.score_samples de cada linha
+        quality_by_cluster: Score de qualidade por cluster
+        cluster_sizes: Tamanho de cada cluster no treino
+    """
+    # Normalizar: -0.5 (normal) a 0.5 (anômalo) → 0 a 1
+    anomaly = samples_score + 0.5
+    cluster_quality = quality_by_cluster[clusters]
+    # Proximidade ao centróide (inverso da distância, normalizado)
+    # Distância típica ~2-5, então normalizamos
+    proximity = np.maximum(0, 1 - (distances / 5.0))
+    base = cluster_quality * 100  # 0-100
+    proximity_bonus = proximity * 20  # até +20
+    anomaly_bonus = np.maximum(0, anomaly) * 10  # até +10 se excepcional
+    scores = np.clip(base + proximity_bonus + anomaly_bonus, 0, 100)
+    return ScoreBatch(cluster_sizes, scores, clusters, distances, proximity, anomaly,
+                      cluster_quality, base, proximity_bonus, anomaly_bonus)
+
+
+class ScoreBatch:
+    """
+    Resultado de predict_scores: arrays alinhados com as linhas da matriz.
+    
+    metadata(i) monta o mesmo dict de predict_score para a linha i, só quando pedido.
+    """
+    
+    def __init__(self, cluster_sizes: List[int], scores: np.ndarray, clusters: np.ndarray,
+                 distances: np.ndarray, proximity: np.ndarray, anomaly: np.ndarray,
+                 cluster_quality: np.ndarray, base: np.ndarray, proximity_bonus: np.ndarray,
+                 anomaly_bonus: np.ndarray):
+        self._cluster_sizes = cluster_sizes
+        self.scores = scores
+        self.clusters = clusters
+        self.distances = distances
+        self.proximity = proximity
+        self.anomaly = anomaly
+        self.cluster_quality = cluster_quality
+        self._components = (base, proximity_bonus, anomaly_bonus)
+    
+    def __len__(self) -> int:
+        return len(self.scores)
+    
+    @property
+    def is_outlier(self) -> np.ndarray:
+        return self.anomaly > 0.6
+    
+    def labels(self) -> List[str]:
+        return [score_label(s) for s in self.scores.tolist()]
+    
+    def metadata(self, i: int) -> Dict:
+        base, proximity_bonus, anomaly_bonus = self._components
+        cluster_id = int(self.clusters[i])
+        return {
+            'cluster_id': cluster_id,
+            'cluster_quality': float(self.cluster_quality[i]),
+            'cluster_size': int(self._cluster_sizes[cluster_id]),
+            'distance_to_centroid': float(self.distances[i]),
+            'proximity_score': float(self.proximity[i]),
+            'anomaly_score': float(self.anomaly[i]),
+            'is_outlier': bool(self.anomaly[i] > 0.6),
+            'score_components': {
+                'base': float(base[i]),
+                'proximity_bonus': float(proximity_bonus[i]),
+                'anomaly_bonus': float(anomaly_bonus[i])
+            },
+            'label': score_label(float(self.scores[i]))
+        }
+    
+    def __iter__(self):
+        """(score, metadata) por linha, como predict_score."""
+        for i in range(len(self)):
+            yield float(self.scores[i]), self.metadata(i)
+
+
+def extract_features_array(doc: dict, view: TextView = None) -> np.ndarray:
     """
     Extrai features numéricas de um documento DIRETAMENTE
     Não usa evaluate_resume_from_doc para evitar overhead
     
+    Args:
+        doc: Documento do currículo
+        view: TextView de resume_text_clean já montado (ex.: o do rule-based)
+    
     Returns:
         Array com features na ordem:
         [skills_count, years_experience, projects_count, cert_count,
@@ -363,11 +572,11 @@ def extract_features_array(doc: dict) -> np.ndarray:
     projects_count = sum(1 for exp in experiences if exp.get('description', '').lower().find('projeto') >= 0)
     
     # Certificações (estimativa)
-    # Procurar por keywords de certificação no texto
+    # Procurar por keywords de certificação no texto (regras KEYWORD de CERT_TABLE, cap em 5)
     text = doc.get('resume_text_clean', '') or ''
-    cert_keywords = ['certificação', 'certificado', 'certified', 'certificate', 'aws', 'azure', 'google cloud']
-    cert_count = sum(1 for keyword in cert_keywords if keyword.lower() in text.lower())
-    cert_count = min(cert_count, 5)  # Cap em 5
+    if view is None or view.original != text:
+        view = TextView(text)
+    cert_count = count_cert_keywords(view)
     
     # Métricas/Impactos (números + palavras de impacto)
     import re
@@ -378,11 +587,11 @@ def extract_features_array(doc: dict) -> np.ndarray:
     ]
     metrics_count = 0
     for pattern in metrics_patterns:
-        metrics_count += len(re.findall(pattern, text.lower()))
+        metrics_count += len(re.findall(pattern, view.lower))
     metrics_count = min(metrics_count, 15)  # Cap em 15
     
     # Tokens (tamanho do documento)
-    tokens = len(text.split()) if text else 0
+    tokens = len(view.tokens)
     
     # Contatos
     metadata = doc.get('metadata', {})
@@ -422,8 +631,34 @@ def extract_features_array(doc: dict) -> np.ndarray:
     ])
 
 
+def extract_features_matrix(docs: List[dict], views: List[TextView] = None) -> np.ndarray:
+    """extract_features_array para vários documentos: matriz (n_docs, len(FEATURE_NAMES))."""
+    views = views if views is not None else [None] * len(docs)
+    rows = [extract_features_array(doc, view) for doc, view in zip(docs, views)]
+    return np.vstack(rows) if rows else np.empty((0, len(FEATURE_NAMES)))
+
+
 FEATURE_NAMES = [
     'skills_count', 'years_experience', 'projects_count', 'cert_count',
     'metrics_count', 'tokens', 'has_email', 'has_phone', 'has_linkedin',
     'doc_quality', 'is_experienced'
 ]
+
+# Incrementar quando extract_features_array mudar de significado sem mudar FEATURE_NAMES
+FEATURE_VERSION = 2  # 2: cert_count pela CERT_TABLE e tokens pelo TextView
+
+
+def feature_fingerprint() -> str:
+    """
+    Hash do extrator de features: FEATURE_VERSION, FEATURE_NAMES, a CERT_TABLE e o
+    código de extract_features_array e do TextView. Caches de features (ex.: o .npy
+    de train_unsupervised) guardam esse valor e são descartados quando ele muda.
+    """
+    parts = [FEATURE_VERSION, FEATURE_NAMES, certifications.CERT_TABLE, certifications.MAX_KEYWORDS]
+    for obj in (extract_features_array, TextView):
+        try:
+            parts.append(inspect.getsource(obj))
+        except (OSError, TypeError):
+            parts.append(obj.__qualname__)  # sem fonte (ex.: .pyc apenas): fica a versão
+    payload = json.dumps(parts, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Cache de resultados de análise NLP endereçado por conteúdo.
+
+A chave é o SHA-256 do texto + um namespace com a versão do analisador, a
+impressão digital do vocabulário (skills, sinônimos, padrões) e o perfil. Assim
+o mesmo currículo analisado em /extract e depois em /evaluate, num backfill com
+--force ou num re-upload do mesmo PDF não passa de novo pelo spaCy, e qualquer
+mudança de vocabulário/versão invalida as entradas antigas sozinha.
+
+Dois níveis:
+    - memória: LRU de ANALYSIS_CACHE_SIZE entradas (padrão 2048; 0 desliga)
+    - disco (opcional): SQLite em ANALYSIS_CACHE_DB, compartilhado entre
+      processos e reinícios
+
+O lock protege só o LRU e os contadores. O SQLite é acessado fora dele, com uma
+conexão por thread (WAL permite leituras concorrentes), para que os workers do
+pool de scoring não esperem uns pelos outros em I/O de disco.
+
+Uso:
+    from app.nlp.analysis_cache import analysis_cache
+    analysis_cache.stats()  # hits/misses por nível
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_MAXSIZE = 2048
+
+
+def text_key(text: str, namespace: str) -> str:
+    """Chave do cache: sha256(namespace + texto)."""
+    h = hashlib.sha256(namespace.encode("utf-8"))
+    h.update(b"\0")
+    h.update((text or "").encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def _copy(value: Dict[str, Any]) -> Dict[str, Any]:
+    # Cópia rasa + listas copiadas: quem recebe pode alterar o dict sem sujar o cache
+    return {k: list(v) if isinstance(v, list) else v for k, v in value.items()}
+
+
+class AnalysisCache:
+    """LRU em memória + SQLite opcional (uma conexão por thread), thread-safe."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, db_path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.db_path = db_path
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._db_error: Optional[str] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---------- disco ----------
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Conexão SQLite da thread atual, aberta na primeira vez (tabela criada uma vez)."""
+        if not self.db_path or self._db_error:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                with self._schema_lock:
+                    if not self._schema_ready:
+                        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                        init = sqlite3.connect(self.db_path, timeout=5.0)
+                        init.execute("PRAGMA journal_mode=WAL")
+                        init.execute(
+                            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                        )
+                        init.commit()
+                        init.close()
+                        self._schema_ready = True
+                conn = sqlite3.connect(self.db_path, timeout=5.0)
+                self._local.conn = conn
+            except sqlite3.Error as e:
+                # Disco indisponível não derruba a análise: segue só com memória
+                self._db_error = str(e)
+                print(f"⚠️  Cache de análise em disco desativado ({self.db_path}): {e}")
+                return None
+        return conn
+
+    # ---------- API ----------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna cópia do resultado em cache, ou None (conta hit/miss)."""
+        with self._lock:
+            value = self._mem.get(key)
+            if value is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return _copy(value)
+
+        conn = self._db()
+        if conn is not None:
+            try:
+                row = conn.execute("SELECT value FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is not None:
+                value = json.loads(row[0])
+                with self._lock:
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return _copy(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(key, _copy(value))
+        conn = self._db()
+        if conn is not None:
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Falha ao gravar cache de análise: {e}")
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def clear(self, disk: bool = False) -> None:
+        """Limpa a memória (e o SQLite, se disk=True) e zera os contadores."""
+        with self._lock:
+            self._mem.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        conn = self._db() if disk else None
+        if conn is not None:
+            conn.execute("DELETE FROM analysis_cache")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "size": len(self._mem),
+            "maxsize": self.maxsize,
+            "db_path": self.db_path if not self._db_error else None,
+        }
+
+
+# Instância única do processo (configurada por variáveis de ambiente)
+analysis_cache = AnalysisCache(
+    maxsize=int(os.getenv("ANALYSIS_CACHE_SIZE", DEFAULT_MAXSIZE)),
+    db_path=os.getenv("ANALYSIS_CACHE_DB") or None,
+)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Detecção de certificações a partir de uma única tabela declarativa.
+
+CERT_TABLE reúne o que antes estava espalhado em três lugares:
+    - CERT_MAP + padrões de linha + plataformas de extract_cert_points (use_case)
+    - EntityRuler CERT do spaCy (AZ-900, DP-203, Security+) em spacy_nlp
+    - palavras-chave de cert_count em extract_features_array (unsupervised_scoring)
+
+As regras de regex da tabela são compiladas uma vez num PatternScanner e o texto
+é percorrido numa só passada; as regras de presença são literais, checadas com
+`in` sobre o texto em minúsculas (busca em C, mais barata que entrar na
+alternação). A pontuação é a mesma do extract_cert_points antigo.
+
+Uso:
+    from app.nlp.certifications import scan_certs
+    res = scan_certs(text)
+    res.points, res.certs, res.keyword_count
+"""
+import re
+from typing import Dict, List, Tuple, Union
+
+from app.nlp.text_scanner import PatternScanner
+from app.nlp.text_view import TextView
+
+# Tipos de regra
+CERT = "cert"            # certificação nomeada: pontos por ocorrência e entra em `certs`
+GENERIC = "generic"      # menção genérica (curso de..., fluente em...): pontos por ocorrência
+LINE = "line"            # linha de lista de certificações: conta só se houver seção de certificações
+SECTION = "section"      # palavra que indica seção de certificações (presença)
+PLATFORM = "platform"    # plataforma de cursos: bônus único por plataforma (presença)
+KEYWORD = "keyword"      # palavra-chave da feature cert_count do modelo não-supervisionado (presença)
+
+LINE_POINTS = 0.2        # Cada linha de certificação vale 0.2 (5 certificações = 1.0)
+MAX_POINTS = 1.0
+MAX_KEYWORDS = 5
+
+# (id, nome exibido, padrão, pontos, tipo)
+# CERT/GENERIC/LINE: regex sem diferenciar maiúsculas, modo multilinha
+# SECTION/PLATFORM/KEYWORD: substring literal em minúsculas
+CERT_TABLE: List[Tuple[str, str, str, float, str]] = [
+    # Certificações de Cloud/TI (EN)
+    ("aws_ccp", "AWS Cloud Practitioner", r"\bAWS\s*(CCP|Cloud Practitioner)\b", 0.3, CERT),
+    ("aws_saa", "AWS Solutions Architect Associate", r"\bAWS\s*(SAA|Solutions Architect Associate)\b", 0.5, CERT),
+    ("az_900", "AZ-900", r"\bAZ-900\b", 0.3, CERT),
+    ("dp_203", "DP-203", r"\bDP-203\b", 0.5, CERT),
+    # (?!\w) em vez de \b: "Security+" seguido de espaço não casava com \b depois do "+"
+    ("security_plus", "Security+", r"\bSecurity\+(?!\w)", 0.4, CERT),
+
+    # Marketing Digital (PT-BR)
+    ("google_ads", "Google Ads", r"\bGoogle\s*Ads\s*(Certification|Certificação)\b", 0.4, CERT),
+    ("google_analytics", "Google Analytics", r"\bGoogle\s*Analytics\s*(Certification|Certificação|4|GA4)\b", 0.4, CERT),
+    ("google_skillshop", "Google Skillshop", r"\bGoogle\s*Skillshop\b", 0.3, CERT),
+    ("facebook_blueprint", "Facebook Blueprint", r"\bFacebook\s*(Blueprint|Ads|Marketing)\s*(Certification|Certificação)\b", 0.4, CERT),
+    ("meta_blueprint", "Meta Blueprint", r"\bMeta\s*(Blueprint|Ads)\s*(Certification|Certificação)\b", 0.4, CERT),
+    ("inbound_marketing", "Inbound/Content Marketing", r"\b(Inbound|Content)\s*Marketing\s*(Certification|Certificação)\b", 0.3, CERT),
+    ("hubspot", "HubSpot", r"\bHubSpot\s*(Certification|Certificação|Academy)\b", 0.4, CERT),
+    ("rd_station", "RD Station", r"\bRD\s*Station\s*(Certification|Certificação)\b", 0.3, CERT),
+
+    # Design (PT-BR + EN)
+    ("adobe", "Adobe Certified", r"\bAdobe\s*(Certified|Certificado)\b", 0.4, CERT),
+    ("ux_ui", "UX/UI Design", r"\b(UX|UI)\s*Design\s*(Certification|Certificação)\b", 0.4, CERT),
+    ("figma", "Figma", r"\bFigma\s*(Certification|Certificação)\b", 0.3, CERT),
+
+    # Gestão de Projetos (PT-BR + EN)
+    ("pmp", "PMP", r"\bPMP\b", 0.5, CERT),
+    ("pmbok", "PMBOK", r"\bPMBOK\b", 0.4, CERT),
+    ("scrum_master", "Scrum Master", r"\bScrum\s*Master\s*(Certification|Certificação|PSM|CSM)\b", 0.4, CERT),
+    ("product_owner", "Product Owner", r"\bProduct\s*Owner\s*(Certification|Certificação|PSPO|CSPO)\b", 0.4, CERT),
+    ("prince2", "PRINCE2", r"\bPrince2\b", 0.4, CERT),
+    ("cobit", "COBIT", r"\bCobit\b", 0.4, CERT),
+    ("itil", "ITIL", r"\bItil\b", 0.4, CERT),
+
+    # Finanças/Contabilidade (PT-BR)
+    ("crc", "CRC", r"\bCRC\b", 0.4, CERT),  # Conselho Regional de Contabilidade
+    ("cpa", "CPA", r"\bCPA\b", 0.5, CERT),
+    ("cfa", "CFA", r"\bCFA\b", 0.5, CERT),
+    ("anbima", "Certificação CPA/Anbima", r"\bCertificação\s*(CPA|Anbima)\b", 0.4, CERT),
+
+    # Idiomas (PT-BR + EN)
+    ("language_exam", "Exame de idioma", r"\b(TOEFL|IELTS|Cambridge|TOEIC)\b", 0.3, CERT),
+    ("fluency", "Fluência", r"\b(Fluente|Fluent|Avançado|Advanced)\s*(em|in)\s*(inglês|espanhol|english|spanish)\b", 0.2, GENERIC),
+
+    # Genéricos (PT-BR + EN) - menor pontuação
+    ("generic_cert", "Certificação", r"\b(Certificação|Certificado|Certificate|Certification)\s+(em|de|in)\b", 0.15, GENERIC),
+    ("generic_course", "Curso", r"\b(Curso|Course)\s+(de|em|in)\s+\w+", 0.1, GENERIC),
+
+    # Linhas de lista de certificações (contam só com seção de certificações)
+    ("line_dash", "", r"[-–—•]\s*.+?(certificação|certificado|certificate|curso|course|treinamento)", LINE_POINTS, LINE),
+    ("line_issuer", "", r"^\s*.+?\s*[-–—]\s*.+?(google|meta|facebook|aws|azure|microsoft|adobe|ibm|oracle|salesforce)", LINE_POINTS, LINE),
+    ("line_year", "", r"\d{4}\s*[-–—]\s*.+?(certificação|certificado|certificate|curso|course)", LINE_POINTS, LINE),
+    ("line_numbered", "", r"^\s*\d+\.\s*.+?(certificação|certificado|curso|course)", LINE_POINTS, LINE),  # Listas numeradas
+    ("line_bullet", "", r"^\s*•\s*.+?(certificação|certificado|curso|course)", LINE_POINTS, LINE),  # Bullets
+
+    # Seção de certificações (presença)
+    ("sec_certificacoes", "", r"certificações", 0.0, SECTION),
+    ("sec_certificados", "", r"certificados", 0.0, SECTION),
+    ("sec_cursos", "", r"cursos", 0.0, SECTION),
+    ("sec_certifications", "", r"certifications", 0.0, SECTION),
+    ("sec_certificates", "", r"certificates", 0.0, SECTION),
+    ("sec_courses", "", r"courses", 0.0, SECTION),
+    ("sec_formacao_complementar", "", r"formação complementar", 0.0, SECTION),
+    ("sec_treinamentos", "", r"treinamentos", 0.0, SECTION),
+
+    # Bônus por plataformas conhecidas (presença)
+    ("plat_coursera", "", r"coursera", 0.1, PLATFORM),
+    ("plat_udemy", "", r"udemy", 0.1, PLATFORM),
+    ("plat_alura", "", r"alura", 0.1, PLATFORM),
+    ("plat_rocketseat", "", r"rocketseat", 0.1, PLATFORM),
+    ("plat_dio", "", r"dio", 0.1, PLATFORM),
+    ("plat_edx", "", r"edx", 0.1, PLATFORM),
+    ("plat_linkedin_learning", "", r"linkedin learning", 0.1, PLATFORM),
+    ("plat_pluralsight", "", r"pluralsight", 0.1, PLATFORM),
+    ("plat_udacity", "", r"udacity", 0.1, PLATFORM),
+    ("plat_skillshare", "", r"skillshare", 0.1, PLATFORM),
+
+    # Feature cert_count do modelo não-supervisionado (presença)
+    ("kw_certificacao", "", r"certificação", 0.0, KEYWORD),
+    ("kw_certificado", "", r"certificado", 0.0, KEYWORD),
+    ("kw_certified", "", r"certified", 0.0, KEYWORD),
+    ("kw_certificate", "", r"certificate", 0.0, KEYWORD),
+    ("kw_aws", "", r"aws", 0.0, KEYWORD),
+    ("kw_azure", "", r"azure", 0.0, KEYWORD),
+    ("kw_google_cloud", "", r"google cloud", 0.0, KEYWORD),
+]
+
+_PRESENCE_KINDS = (SECTION, PLATFORM, KEYWORD)
+_LITERALS = [(rid, pattern) for rid, _, pattern, _, kind in CERT_TABLE if kind in _PRESENCE_KINDS]
+_KEYWORDS = [(rid, pattern, pts, kind) for rid, _, pattern, pts, kind in CERT_TABLE if kind == KEYWORD]
+
+# Linhas que começam em travessão/bullet ou no meio de um número (ano) entram no guard
+_SCANNER = PatternScanner(
+    [(rid, rx) for rid, _, rx, _, kind in CERT_TABLE if kind not in _PRESENCE_KINDS],
+    start_guard="[-–—•\\d]",
+    flags=re.IGNORECASE | re.MULTILINE,
+)
+
+
+class CertResult:
+    """Certificações encontradas num texto."""
+
+    __slots__ = ("points", "certs", "keyword_count", "has_section", "line_count")
+
+    def __init__(self, points: float, certs: List[str], keyword_count: int, has_section: bool, line_count: int):
+        self.points = points
+        self.certs = certs
+        self.keyword_count = keyword_count
+        self.has_section = has_section
+        self.line_count = line_count
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def scan_certs(text: Union[str, TextView]) -> CertResult:
+    """
+    Uma passada pelo texto com todas as regras de CERT_TABLE.
+
+    Returns:
+        CertResult com pontos (0-1), nomes das certificações nomeadas encontradas,
+        contagem de palavras-chave (feature cert_count, até 5), se há seção de
+        certificações e quantas linhas de certificação foram contadas.
+    """
+    if not text:
+        return CertResult(0.0, [], 0, False, 0)
+
+    view = TextView.of(text)
+    counts = _SCANNER.counts(view.original)
+    text_lower = view.lower
+    counts.update((rid, 1) for rid, literal in _LITERALS if literal in text_lower)
+    cert_pts = 0.0
+    certs: List[str] = []
+    has_section = False
+    line_count = 0
+    platforms = 0
+    keywords = 0
+    # na ordem da tabela, para a soma em ponto flutuante bater com a versão antiga
+    for rid, label, _, value, kind in CERT_TABLE:
+        n = counts.get(rid, 0)
+        if not n:
+            continue
+        if kind in (CERT, GENERIC):
+            cert_pts += n * value
+            if kind == CERT:
+                certs.append(label)
+        elif kind == LINE:
+            line_count += n
+        elif kind == SECTION:
+            has_section = True
+        elif kind == PLATFORM:
+            platforms += 1
+        elif kind == KEYWORD:
+            keywords += 1
+
+    pts = cert_pts
+    if has_section:
+        pts += line_count * LINE_POINTS
+    else:
+        line_count = 0
+    for _ in range(platforms):
+        pts += 0.1
+
+    return CertResult(
+        points=min(pts, MAX_POINTS),
+        certs=sorted(certs),
+        keyword_count=min(keywords, MAX_KEYWORDS),
+        has_section=has_section,
+        line_count=line_count,
+    )
+
+
+def count_cert_keywords(text: Union[str, TextView]) -> int:
+    """Feature cert_count do modelo não-supervisionado: palavras-chave presentes (até 5)."""
+    text_lower = TextView.of(text).lower
+    found = sum(1 for _, pattern, _, kind in _KEYWORDS if pattern in text_lower)
+    return min(found, MAX_KEYWORDS)
+
+
+def extract_cert_points(text: Union[str, TextView]) -> float:
+    """Pontos de certificações (PT-BR + EN), de 0 a 1."""
+    return scan_certs(text).points
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Matcher de skills sem spaCy: autômato Aho-Corasick compilado uma vez sobre o
+vocabulário normalizado (casefold + sem acentos + espaços colapsados).
+
+Uma única passada pelo texto encontra todas as skills; as variantes são
+canonicalizadas (node / nodejs / node.js -> "node.js"). Usado pelo spacy_nlp,
+pelo pré-processamento e pela auto-anotação de matching, que não carregam spaCy.
+
+Benchmark contra o PhraseMatcher do spaCy:
+    python -m app.nlp.skill_matcher --limit 500
+"""
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.ml.model_registry import registry
+
+# --- Vocabulário de skills (MULTIDISCIPLINAR: Todas as áreas) ---
+SKILLS = [
+    # ========== TI & PROGRAMAÇÃO ==========
+    # Linguagens
+    "python", "java", "javascript", "typescript", "c", "c++", "c#", "golang", "go",
+    "rust", "ruby", "php", "swift", "kotlin", "scala", "r", "matlab", "sql",
+    # Web
+    "html", "html5", "css", "css3", "react", "angular", "vue", "vue.js", "next.js",
+    "node", "nodejs", "node.js", "express", "fastapi", "django", "flask", "spring",
+    "asp.net", ".net", "blazor",
+    "desenvolvimento web", "front-end", "back-end", "full-stack", "full stack",
+    # Mobile
+    "flutter", "react native", "android", "ios", "mobile", "app mobile",
+    "desenvolvimento mobile", "aplicativo", "aplicativos",
+    # Bancos de Dados
+    "mongodb", "mysql", "postgresql", "postgres", "sqlite", "redis", "elasticsearch",
+    "dynamodb", "cassandra", "oracle", "sql server", "mariadb",
+    "banco de dados", "database", "nosql", "sql",
+    # Cloud & DevOps
+    "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "k8s", "terraform",
+    "ansible", "jenkins", "gitlab", "github", "circleci", "travis",
+    "nuvem", "cloud", "devops", "integração contínua", "ci/cd",
+    # Data Science & ML
+    "pandas", "numpy", "scikit-learn", "tensorflow", "pytorch", "keras", "spark",
+    "hadoop", "airflow", "mlflow", "jupyter", "matplotlib", "seaborn", "plotly",
+    "machine learning", "deep learning", "inteligência artificial", "ia", "ai",
+    "ciência de dados", "data science", "análise de dados", "big data",
+    # Ferramentas Dev
+    "git", "linux", "bash", "powershell", "vim", "vscode", "intellij", "eclipse",
+    "postman", "jira", "confluence", "slack", "trello",
+    
+    # ========== MARKETING & VENDAS ==========
+    "marketing digital", "seo", "sem", "google ads", "facebook ads", "instagram ads",
+    "redes sociais", "social media", "marketing de conteúdo", "content marketing",
+    "inbound marketing", "outbound marketing", "email marketing", "crm",
+    "copywriting", "branding", "brand management", "gestão de marca",
+    "análise de mercado", "pesquisa de mercado", "market research",
+    "google analytics", "google tag manager", "gtm", "meta ads",
+    "hubspot", "salesforce", "rdstation", "mailchimp",
+    "vendas", "prospecção", "negociação", "fechamento",
+    "inside sales", "outside sales", "account management", "customer success",
+    
+    # ========== DESIGN & CRIAÇÃO ==========
+    "photoshop", "illustrator", "indesign", "figma", "sketch", "adobe xd",
+    "corel draw", "canva", "after effects", "premiere", "lightroom",
+    "ui design", "ux design", "design gráfico", "design thinking",
+    "prototipagem", "wireframe", "mockup", "tipografia", "identidade visual",
+    "motion design", "animação", "edição de vídeo", "design de produto",
+    
+    # ========== FINANÇAS & CONTABILIDADE ==========
+    "contabilidade", "auditoria", "perícia contábil", "controladoria",
+    "análise financeira", "planejamento financeiro", "orçamento", "budget",
+    "demonstrações financeiras", "balanço patrimonial", "dre",
+    "custos", "gestão de custos", "análise de custos",
+    "impostos", "tributação", "fiscal", "compliance fiscal",
+    "excel", "power bi", "tableau", "qlik", "sap", "erp",
+    "conciliação bancária", "fluxo de caixa", "cash flow",
+    "ifrs", "cpc", "sped", "nota fiscal eletrônica", "nfe",
+    
+    # ========== RH & RECURSOS HUMANOS ==========
+    "recrutamento", "seleção", "r&s", "hunting", "headhunting",
+    "employer branding", "gestão de pessoas", "people analytics",
+    "treinamento", "desenvolvimento", "t&d", "capacitação",
+    "avaliação de desempenho", "performance", "feedback",
+    "climate organizacional", "pesquisa de clima", "endomarketing",
+    "remuneração", "benefícios", "folha de pagamento",
+    "relações trabalhistas", "sindicato", "clt", "legislação trabalhista",
+    "onboarding", "offboarding", "employee experience",
+    
+    # ========== JURÍDICO & DIREITO ==========
+    "direito civil", "direito penal", "direito trabalhista",
+    "direito tributário", "direito empresarial", "direito contratual",
+    "advocacia", "consultoria jurídica", "parecer jurídico",
+    "processo judicial", "petição", "recursos", "contratos",
+    "compliance", "governança corporativa", "due diligence",
+    "mediação", "arbitragem", "negociação de conflitos",
+    
+    # ========== ENGENHARIA & ARQUITETURA ==========
+    "autocad", "revit", "sketchup", "solidworks", "catia", "inventor",
+    "bim", "projetos", "cálculo estrutural", "gestão de obras",
+    "orçamento de obras", "cronograma", "ms project",
+    "segurança do trabalho", "nr", "cipa", "ppra", "pcmso",
+    "qualidade", "iso 9001", "lean", "six sigma", "kaizen",
+    
+    # ========== SAÚDE & BEM-ESTAR ==========
+    "enfermagem", "medicina", "farmácia", "nutrição", "fisioterapia",
+    "psicologia", "terapia", "atendimento clínico", "diagnóstico",
+    "prescrição", "prontuário eletrônico", "sus", "vigilância sanitária",
+    
+    # ========== EDUCAÇÃO & ENSINO ==========
+    "docência", "ensino", "pedagogia", "didática", "metodologia",
+    "ead", "educação a distância", "moodle", "plataforma educacional",
+    "avaliação educacional", "plano de aula", "currículo",
+    
+    # ========== LOGÍSTICA & SUPPLY CHAIN ==========
+    "logística", "supply chain", "cadeia de suprimentos",
+    "armazenagem", "estoque", "inventário", "wms", "tms",
+    "compras", "procurement", "fornecedores", "cotação",
+    "importação", "exportação", "comércio exterior",
+    "transporte", "distribuição", "roteirização",
+    
+    # ========== ATENDIMENTO & RELACIONAMENTO ==========
+    "atendimento ao cliente", "customer service", "sac",
+    "call center", "telemarketing", "contact center",
+    "relacionamento com cliente", "pós-venda", "fidelização",
+    "experiência do cliente", "customer experience", "cx",
+    
+    # ========== SOFT SKILLS & METODOLOGIAS ==========
+    "agile", "scrum", "kanban", "metodologia ágil", "pmbok", "pmp",
+    "gestão de projetos", "project management", "liderança",
+    "trabalho em equipe", "comunicação", "negociação",
+    "resolução de problemas", "pensamento crítico", "criatividade",
+    "gestão de tempo", "organização", "proatividade",
+    "inglês", "espanhol", "francês", "alemão", "mandarim",
+    "fluente", "avançado", "intermediário", "conversação",
+    
+    # ========== ADMINISTRATIVO & GESTÃO ==========
+    "gestão", "administração", "planejamento estratégico",
+    "indicadores", "kpi", "dashboard", "relatórios gerenciais",
+    "processos", "mapeamento de processos", "bpm", "melhoria contínua",
+    "office", "word", "excel", "powerpoint", "outlook",
+    "google workspace", "sheets", "docs", "slides",
+]
+
+# Variantes -> forma canônica (a forma canônica também precisa estar em SKILLS)
+SYNONYMS: Dict[str, str] = {
+    "node": "node.js",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "vue": "vue.js",
+    "vuejs": "vue.js",
+    "vue js": "vue.js",
+    "nextjs": "next.js",
+    "next js": "next.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "react js": "react",
+    "angularjs": "angular",
+    "angular js": "angular",
+    "golang": "go",
+    "js": "javascript",
+    "html5": "html",
+    "css3": "css",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "google cloud": "gcp",
+    "sklearn": "scikit-learn",
+    "c sharp": "c#",
+    "dotnet": ".net",
+    "full stack": "full-stack",
+    "fullstack": "full-stack",
+    "frontend": "front-end",
+    "backend": "back-end",
+    "ms excel": "excel",
+}
+
+_WS = re.compile(r"\s+")
+
+# Fronteiras de token, aproximando o tokenizador do spaCy: "+"/"#" fazem parte da
+# palavra (c++, c#) e "."/"_"/"@"/"-" entre alfanuméricos não quebram o token
+# (node.js, github.com, t-sql), enquanto "/" separa (ui/ux).
+_WORD_EXTRA = "+#"
+_JOINERS = "._@-"
+
+
+def fold(text: str) -> str:
+    """Normaliza para matching: casefold, remove acentos e colapsa espaços."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WS.sub(" ", stripped)
+
+
+class SkillMatcher:
+    """
+    Autômato Aho-Corasick sobre padrões já normalizados por fold().
+
+    Os matches respeitam fronteiras de token (ver _WORD_EXTRA/_JOINERS), como o
+    PhraseMatcher, que só casa tokens inteiros. Matches sobrepostos são resolvidos
+    por leftmost-longest: "node js" é só node.js (o "js" dentro dele não vira
+    javascript) e "react native" não conta também "react".
+    """
+
+    def __init__(self, vocabulary: Iterable[str], synonyms: Optional[Dict[str, str]] = None):
+        synonyms = synonyms or {}
+        # padrão normalizado -> nome canônico
+        self.canonical: Dict[str, str] = {}
+        for skill in vocabulary:
+            self.canonical.setdefault(fold(skill).strip(), skill)
+        for variant, canon in synonyms.items():
+            self.canonical[fold(variant).strip()] = synonyms.get(canon, canon)
+        # a forma canônica de um alvo de sinônimo também aponta para si mesma
+        for canon in set(synonyms.values()):
+            self.canonical[fold(canon).strip()] = canon
+        self.canonical.pop("", None)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Tuple[int, str], ...]] = [()]
+        self._build()
+
+    def _build(self) -> None:
+        outputs: List[List[Tuple[int, str]]] = [[]]
+        for pattern, canon in self.canonical.items():
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                node = nxt
+            outputs[node].append((len(pattern), canon))
+
+        # BFS para links de falha; saídas herdadas do sufixo mais longo
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                outputs[nxt].extend(outputs[self._fail[nxt]])
+        self._out = [tuple(o) for o in outputs]
+
+    def finditer_folded(self, folded: str) -> Iterator[Tuple[int, int, str]]:
+        """Matches (início, fim, canônico) sem sobreposição sobre texto JÁ normalizado por fold()."""
+        last_end = 0
+        for start, end, canon in sorted(self._candidates(folded), key=lambda m: (m[0], -m[1])):
+            if start >= last_end:
+                last_end = end
+                yield start, end, canon
+
+    def _candidates(self, folded: str) -> Iterator[Tuple[int, int, str]]:
+        """Todos os matches em fronteira de token, inclusive sobrepostos."""
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(folded)
+        node = 0
+        for i, ch in enumerate(folded):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < n:
+                nxt = folded[end]
+                if nxt.isalnum() or nxt in _WORD_EXTRA:
+                    continue
+                if nxt in _JOINERS and end + 1 < n and folded[end + 1].isalnum():
+                    continue
+            for length, canon in out[node]:
+                start = end - length
+                if start > 0:
+                    prev = folded[start - 1]
+                    if prev.isalnum() or prev in _WORD_EXTRA:
+                        continue
+                    if prev in _JOINERS and start > 1 and folded[start - 2].isalnum():
+                        continue
+                yield start, end, canon
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Matches (início, fim, canônico); posições referem-se a fold(text)."""
+        return self.finditer_folded(fold(text))
+
+    def find(self, text: str) -> List[str]:
+        """Skills canônicas distintas encontradas no texto, ordenadas."""
+        return self.find_folded(fold(text))
+
+    def find_folded(self, folded: str) -> List[str]:
+        """Como find(), sobre texto JÁ normalizado por fold() (ex.: TextView.folded)."""
+        return sorted({canon for _, _, canon in self.finditer_folded(folded)})
+
+    def canonicalize(self, skill: str) -> Optional[str]:
+        """Nome canônico de uma skill isolada, ou None se não está no vocabulário."""
+        return self.canonical.get(fold(skill).strip())
+
+
+def _build_default() -> SkillMatcher:
+    return SkillMatcher(SKILLS, SYNONYMS)
+
+
+registry.register("skill_matcher", _build_default)
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Matcher padrão (vocabulário SKILLS + SYNONYMS), compilado uma vez por processo."""
+    return registry.get("skill_matcher")
+
+
+def find_skills(text: str) -> List[str]:
+    """Atalho: skills canônicas encontradas no texto."""
+    return get_skill_matcher().find(text)
+
+
+def canonicalize_skills(skills: Iterable[str]) -> List[str]:
+    """Canonicaliza uma lista de skills (desconhecidas ficam em fold())."""
+    matcher = get_skill_matcher()
+    out = set()
+    for s in skills or []:
+        if not s:
+            continue
+        out.add(matcher.canonicalize(s) or fold(s).strip())
+    return sorted(out)
+
+
+# ======================== BENCHMARK ========================
+
+def _load_texts(limit: int, path: Optional[str]) -> List[str]:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [t for t in f.read().split("\f") if t.strip()][:limit or None]
+    from app.db.mongo import get_db
+    cur = get_db()["dados_processados"].find(
+        {"resume_text_clean": {"$exists": True, "$ne": ""}},
+        {"resume_text_clean": 1},
+    ).limit(limit)
+    return [d["resume_text_clean"] for d in cur]
+
+
+def benchmark(texts: List[str]) -> Dict[str, object]:
+    """Compara tempo e resultado do autômato com o PhraseMatcher (attr=LOWER)."""
+    import time
+
+    matcher = get_skill_matcher()
+    t0 = time.perf_counter()
+    ac_results = [set(matcher.find(t)) for t in texts]
+    ac_seconds = time.perf_counter() - t0
+
+    result: Dict[str, object] = {
+        "documents": len(texts),
+        "chars": sum(len(t) for t in texts),
+        "aho_corasick_ms_per_doc": round(ac_seconds * 1000 / max(len(texts), 1), 3),
+    }
+
+    try:
+        import spacy
+        from spacy.matcher import PhraseMatcher
+    except ImportError:
+        result["phrase_matcher"] = "spaCy não instalado"
+        return result
+
+    # Mesmos padrões (SKILLS + variantes) e mesma regra de sobreposição (filter_spans):
+    # as diferenças que sobram vêm da tokenização e da normalização de acentos
+    nlp = spacy.blank("pt")
+    phrase = PhraseMatcher(nlp.vocab, attr="LOWER")
+    phrase.add("SKILL", [nlp.make_doc(s) for s in list(SKILLS) + list(SYNONYMS)])
+    t0 = time.perf_counter()
+    pm_results = []
+    for doc in nlp.pipe(texts):
+        spans = spacy.util.filter_spans([doc[s:e] for _, s, e in phrase(doc)])
+        found = {span.text.lower() for span in spans}
+        pm_results.append({matcher.canonicalize(x) or x for x in found})
+    pm_seconds = time.perf_counter() - t0
+
+    agree = sum(1 for a, b in zip(ac_results, pm_results) if a == b)
+    only_ac = sum(len(a - b) for a, b in zip(ac_results, pm_results))
+    only_pm = sum(len(b - a) for a, b in zip(ac_results, pm_results))
+    result.update({
+        "phrase_matcher_ms_per_doc": round(pm_seconds * 1000 / max(len(texts), 1), 3),
+        "speedup": round(pm_seconds / ac_seconds, 1) if ac_seconds else None,
+        "identical_docs": agree,
+        "skills_only_aho_corasick": only_ac,
+        "skills_only_phrase_matcher": only_pm,
+    })
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark: Aho-Corasick vs PhraseMatcher")
+    parser.add_argument("--limit", type=int, default=500, help="Número de currículos")
+    parser.add_argument("--file", default=None, help="Arquivo de textos separados por \\f (em vez do MongoDB)")
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(_load_texts(args.limit, args.file)), indent=2, ensure_ascii=False))
@@ -1,251 +1,249 @@
-import spacy
-from spacy.matcher import PhraseMatcher
+import hashlib
+import json
+import os
 import re
+from functools import lru_cache
 
-# Carrega o modelo (precisa ter baixado: python -m spacy download pt_core_news_sm)
-_nlp = spacy.load("pt_core_news_sm")
-
-# --- Skills via PhraseMatcher (MULTIDISCIPLINAR: Todas as áreas) ---
-_SKILLS = [
-    # ========== TI & PROGRAMAÇÃO ==========
-    # Linguagens
-    "python", "java", "javascript", "typescript", "c", "c++", "c#", "golang", "go",
-    "rust", "ruby", "php", "swift", "kotlin", "scala", "r", "matlab", "sql",
-    # Web
-    "html", "html5", "css", "css3", "react", "angular", "vue", "vue.js", "next.js",
-    "node", "nodejs", "node.js", "express", "fastapi", "django", "flask", "spring",
-    "asp.net", ".net", "blazor",
-    "desenvolvimento web", "front-end", "back-end", "full-stack", "full stack",
-    # Mobile
-    "flutter", "react native", "android", "ios", "mobile", "app mobile",
-    "desenvolvimento mobile", "aplicativo", "aplicativos",
-    # Bancos de Dados
-    "mongodb", "mysql", "postgresql", "postgres", "sqlite", "redis", "elasticsearch",
-    "dynamodb", "cassandra", "oracle", "sql server", "mariadb",
-    "banco de dados", "database", "nosql", "sql",
-    # Cloud & DevOps
-    "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "k8s", "terraform",
-    "ansible", "jenkins", "gitlab", "github", "circleci", "travis",
-    "nuvem", "cloud", "devops", "integração contínua", "ci/cd",
-    # Data Science & ML
-    "pandas", "numpy", "scikit-learn", "tensorflow", "pytorch", "keras", "spark",
-    "hadoop", "airflow", "mlflow", "jupyter", "matplotlib", "seaborn", "plotly",
-    "machine learning", "deep learning", "inteligência artificial", "ia", "ai",
-    "ciência de dados", "data science", "análise de dados", "big data",
-    # Ferramentas Dev
-    "git", "linux", "bash", "powershell", "vim", "vscode", "intellij", "eclipse",
-    "postman", "jira", "confluence", "slack", "trello",
-    
-    # ========== MARKETING & VENDAS ==========
-    "marketing digital", "seo", "sem", "google ads", "facebook ads", "instagram ads",
-    "redes sociais", "social media", "marketing de conteúdo", "content marketing",
-    "inbound marketing", "outbound marketing", "email marketing", "crm",
-    "copywriting", "branding", "brand management", "gestão de marca",
-    "análise de mercado", "pesquisa de mercado", "market research",
-    "google analytics", "google tag manager", "gtm", "meta ads",
-    "hubspot", "salesforce", "rdstation", "mailchimp",
-    "vendas", "prospecção", "negociação", "fechamento",
-    "inside sales", "outside sales", "account management", "customer success",
-    
-    # ========== DESIGN & CRIAÇÃO ==========
-    "photoshop", "illustrator", "indesign", "figma", "sketch", "adobe xd",
-    "corel draw", "canva", "after effects", "premiere", "lightroom",
-    "ui design", "ux design", "design gráfico", "design thinking",
-    "prototipagem", "wireframe", "mockup", "tipografia", "identidade visual",
-    "motion design", "animação", "edição de vídeo", "design de produto",
-    
-    # ========== FINANÇAS & CONTABILIDADE ==========
-    "contabilidade", "auditoria", "perícia contábil", "controladoria",
-    "análise financeira", "planejamento financeiro", "orçamento", "budget",
-    "demonstrações financeiras", "balanço patrimonial", "dre",
-    "custos", "gestão de custos", "análise de custos",
-    "impostos", "tributação", "fiscal", "compliance fiscal",
-    "excel", "power bi", "tableau", "qlik", "sap", "erp",
-    "conciliação bancária", "fluxo de caixa", "cash flow",
-    "ifrs", "cpc", "sped", "nota fiscal eletrônica", "nfe",
-    
-    # ========== RH & RECURSOS HUMANOS ==========
-    "recrutamento", "seleção", "r&s", "hunting", "headhunting",
-    "employer branding", "gestão de pessoas", "people analytics",
-    "treinamento", "desenvolvimento", "t&d", "capacitação",
-    "avaliação de desempenho", "performance", "feedback",
-    "climate organizacional", "pesquisa de clima", "endomarketing",
-    "remuneração", "benefícios", "folha de pagamento",
-    "relações trabalhistas", "sindicato", "clt", "legislação trabalhista",
-    "onboarding", "offboarding", "employee experience",
-    
-    # ========== JURÍDICO & DIREITO ==========
-    "direito civil", "direito penal", "direito trabalhista",
-    "direito tributário", "direito empresarial", "direito contratual",
-    "advocacia", "consultoria jurídica", "parecer jurídico",
-    "processo judicial", "petição", "recursos", "contratos",
-    "compliance", "governança corporativa", "due diligence",
-    "mediação", "arbitragem", "negociação de conflitos",
-    
-    # ========== ENGENHARIA & ARQUITETURA ==========
-    "autocad", "revit", "sketchup", "solidworks", "catia", "inventor",
-    "bim", "projetos", "cálculo estrutural", "gestão de obras",
-    "orçamento de obras", "cronograma", "ms project",
-    "segurança do trabalho", "nr", "cipa", "ppra", "pcmso",
-    "qualidade", "iso 9001", "lean", "six sigma", "kaizen",
-    
-    # ========== SAÚDE & BEM-ESTAR ==========
-    "enfermagem", "medicina", "farmácia", "nutrição", "fisioterapia",
-    "psicologia", "terapia", "atendimento clínico", "diagnóstico",
-    "prescrição", "prontuário eletrônico", "sus", "vigilância sanitária",
-    
-    # ========== EDUCAÇÃO & ENSINO ==========
-    "docência", "ensino", "pedagogia", "didática", "metodologia",
-    "ead", "educação a distância", "moodle", "plataforma educacional",
-    "avaliação educacional", "plano de aula", "currículo",
-    
-    # ========== LOGÍSTICA & SUPPLY CHAIN ==========
-    "logística", "supply chain", "cadeia de suprimentos",
-    "armazenagem", "estoque", "inventário", "wms", "tms",
-    "compras", "procurement", "fornecedores", "cotação",
-    "importação", "exportação", "comércio exterior",
-    "transporte", "distribuição", "roteirização",
-    
-    # ========== ATENDIMENTO & RELACIONAMENTO ==========
-    "atendimento ao cliente", "customer service", "sac",
-    "call center", "telemarketing", "contact center",
-    "relacionamento com cliente", "pós-venda", "fidelização",
-    "experiência do cliente", "customer experience", "cx",
-    
-    # ========== SOFT SKILLS & METODOLOGIAS ==========
-    "agile", "scrum", "kanban", "metodologia ágil", "pmbok", "pmp",
-    "gestão de projetos", "project management", "liderança",
-    "trabalho em equipe", "comunicação", "negociação",
-    "resolução de problemas", "pensamento crítico", "criatividade",
-    "gestão de tempo", "organização", "proatividade",
-    "inglês", "espanhol", "francês", "alemão", "mandarim",
-    "fluente", "avançado", "intermediário", "conversação",
-    
-    # ========== ADMINISTRATIVO & GESTÃO ==========
-    "gestão", "administração", "planejamento estratégico",
-    "indicadores", "kpi", "dashboard", "relatórios gerenciais",
-    "processos", "mapeamento de processos", "bpm", "melhoria contínua",
-    "office", "word", "excel", "powerpoint", "outlook",
-    "google workspace", "sheets", "docs", "slides",
-]
-_phrase = PhraseMatcher(_nlp.vocab, attr="LOWER")
-_phrase.add("SKILL", [_nlp.make_doc(s) for s in _SKILLS])
-
-# --- EntityRuler no spaCy v3: use o NOME do componente ---
-if "entity_ruler" in _nlp.pipe_names:
-    ruler = _nlp.get_pipe("entity_ruler")
-else:
-    ruler = _nlp.add_pipe("entity_ruler", before="ner", config={"overwrite_ents": True})
-
-ruler.add_patterns([
-    {"label": "CERT", "pattern": [{"LOWER": "az-900"}]},
-    {"label": "CERT", "pattern": [{"LOWER": "dp-203"}]},
-    {"label": "CERT", "pattern": [{"LOWER": "security+"}]},
-])
-
-def extract_email(text: str) -> bool:
-    """Detecta se há email no texto."""
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    return bool(re.search(email_pattern, text))
-
-def extract_phone(text: str) -> bool:
-    """Detecta se há telefone no texto (formatos brasileiros).
-    
-    Normaliza o texto antes para remover caracteres Unicode extras
-    que podem aparecer na extração de PDFs.
+from app.ml.model_registry import registry
+from app.nlp.analysis_cache import analysis_cache, text_key
+from app.nlp.certifications import CERT_TABLE, scan_certs
+from app.nlp.skill_matcher import SKILLS, SYNONYMS, get_skill_matcher
+from app.nlp import text_scanner
+from app.nlp.text_view import TextView
+from app.nlp.text_scanner import (  # noqa: F401 (reexportados)
+    scan, extract_email, extract_phone, count_sections, detect_projects
+)
+
+# Modelo spaCy (precisa ter baixado: python -m spacy download pt_core_news_sm).
+# spaCy e o modelo são importados/carregados sob demanda, não no import deste módulo:
+# contato, seções e projetos vêm do text_scanner (regex), que não depende dele.
+_SPACY_MODEL = "pt_core_news_sm"
+
+# Versão da saída de analyze(): incremente ao mudar o formato/lógica do resultado
+# (invalida o cache de análise; mudanças de vocabulário já invalidam sozinhas)
+ANALYZER_VERSION = "analyze-v4"
+
+
+def _load_pipeline():
+    """Carrega o modelo spaCy (certificações vêm de app.nlp.certifications, sem EntityRuler)."""
+    import spacy
+
+    return spacy.load(_SPACY_MODEL)
+
+
+registry.register("spacy_pt", _load_pipeline)
+
+
+def get_pipeline():
+    """Retorna o pipeline spaCy, carregado uma única vez por processo."""
+    return registry.get("spacy_pt")
+
+# --- Perfis de análise ---
+# "scoring": só o que os scorers consomem: contagem de tokens (só o tokenizer roda;
+#   skills vêm do SkillMatcher e certificações do CERT_TABLE, sem spaCy).
+# "full": pipeline completo, incluindo datas (NER) e lemas.
+# Os componentes são desligados por chamada (disable=...), sem alterar o pipeline
+# compartilhado entre threads.
+PROFILES = {
+    "scoring": {"enable": (), "outputs": ()},
+    "full": {"enable": None, "outputs": ("dates", "lemmas")},
+}
+SCORING_PROFILE = "scoring"
+FULL_PROFILE = "full"
+
+def _disabled_pipes(nlp, profile: str) -> list:
+    if profile not in PROFILES:
+        raise ValueError(f"Perfil de análise desconhecido: {profile} (use {', '.join(PROFILES)})")
+    enable = PROFILES[profile]["enable"]
+    if enable is None:
+        return []
+    return [name for name in nlp.pipe_names if name not in enable]
+
+
+@lru_cache(maxsize=None)
+def vocabulary_fingerprint() -> str:
+    """Hash do vocabulário que afeta analyze(): skills, sinônimos, padrões de regex e certificações."""
+    payload = json.dumps({
+        "model": _SPACY_MODEL,
+        "skills": SKILLS,
+        "synonyms": SYNONYMS,
+        "scanner": [text_scanner.SECTION_PATTERNS, text_scanner.PROJECT_PATTERNS,
+                    text_scanner.CONTACT_PATTERNS],
+        "certs": CERT_TABLE,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def _cache_key(text: str, profile: str) -> str:
+    limits = f"{MAX_ANALYZE_CHARS}:{CHUNK_CHARS}"
+    return text_key(text, f"{ANALYZER_VERSION}:{vocabulary_fingerprint()}:{profile}:{limits}")
+
+# --- Textos longos ---
+# O spaCy recebe o texto em pedaços de até CHUNK_CHARS (quebrados em parágrafos/
+# linhas), nunca acima de nlp.max_length, e tudo além de MAX_ANALYZE_CHARS é
+# descartado: a memória por requisição fica limitada mesmo com PDFs concatenados.
+CHUNK_CHARS = int(os.getenv("ANALYZE_CHUNK_CHARS", 20000))
+MAX_ANALYZE_CHARS = int(os.getenv("ANALYZE_MAX_CHARS", 300000))
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+_LINE_BREAK = re.compile(r"\n")
+_SPACE = re.compile(r"\s+")
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Corta em max_chars, recuando até o último espaço para não partir palavras."""
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > max_chars // 2 else max_chars]
+
+def split_chunks(text: str, max_chars: int = CHUNK_CHARS) -> list:
     """
-    # Normalizar texto: remover espaços extras, tabs, quebras de linha estranhas
-    normalized = ' '.join(text.split())
-    
-    phone_patterns = [
-        r'\(\d{2}\)\s*\d{4,5}\s*[-\s]?\s*\d{4}',  # (11) 98765-4321 ou (11) 98765 -4321 (PDF)
-        r'\d{2}[\s.-]?\d{4,5}\s*[-\s]?\s*\d{4}',  # 11 98765-4321 ou 11 98765 -4321
-        r'\+55[\s.-]?\d{2}[\s.-]?\(?\d{2}\)?[\s.-]?\d{4,5}\s*[-\s]?\s*\d{4}',  # +55 11 98765-4321 ou +55 (11) 98765 -4321
-        r'\d{10,11}',  # 11987654321 (formato sem separadores)
-    ]
-    return any(re.search(pattern, normalized) for pattern in phone_patterns)
-
-def count_sections(text: str) -> int:
-    """Conta seções importantes do currículo (PT-BR + EN)."""
-    if not text:
-        return 0
-    
-    text_lower = text.lower()
-    sections = [
-        # Contato/Dados pessoais (PT + EN)
-        r'\b(contato|dados pessoais|informações pessoais|contact|personal info)\b',
-        # Resumo/Objetivo (PT + EN)
-        r'\b(resumo|perfil|objetivo|sobre|summary|profile|about|objective)\b',
-        # Experiência Profissional (PT + EN)
-        r'\b(experiência|experiencia|histórico profissional|carreira|experience|work history|employment)\b',
-        # Formação/Educação (PT + EN)
-        r'\b(formação|educação|education|academic|qualificações|qualifications)\b',
-        # Habilidades/Skills (PT + EN)
-        r'\b(habilidades|competências|skills|tecnologias|technologies|conhecimentos)\b',
-        # Projetos (PT + EN)
-        r'\b(projetos|portfolio|portfólio|projects|work samples)\b',
-        # Certificações (PT + EN)
-        r'\b(certificações|certificados|cursos|certifications|certificates|courses)\b',
-        # Idiomas (PT + EN)
-        r'\b(idiomas|languages)\b',
-        # Extras comuns em PT-BR
-        r'\b(conquistas|realizações|achievements)\b',
-        r'\b(publicações|publications)\b',
-    ]
-    
-    count = sum(1 for pattern in sections if re.search(pattern, text_lower))
-    return count
+    Divide o texto em pedaços de até max_chars, preferindo fronteiras de parágrafo,
+    depois de linha e depois de espaço (corte seco só para "palavras" gigantes).
+    Parágrafos pequenos são agrupados para não gerar Docs minúsculos.
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    def pieces(segment: str, separators):
+        if len(segment) <= max_chars:
+            yield segment
+            return
+        if not separators:
+            for i in range(0, len(segment), max_chars):
+                yield segment[i:i + max_chars]
+            return
+        sep, rest = separators[0], separators[1:]
+        start = 0
+        for m in sep.finditer(segment):
+            # o separador fica no fim do pedaço anterior
+            yield from pieces(segment[start:m.end()], rest)
+            start = m.end()
+        if start < len(segment):
+            yield from pieces(segment[start:], rest)
 
-def detect_projects(text: str) -> int:
-    """Detecta menções a projetos (acadêmicos, pessoais, profissionais) PT-BR + EN."""
-    if not text:
-        return 0
+    chunks, current = [], ""
+    for piece in pieces(text, (_PARAGRAPH_BREAK, _LINE_BREAK, _SPACE)):
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _pipe_chunked(nlp, texts: list, profile: str, batch_size: int = 64, n_process: int = 1):
+    """
+    Passa os textos pelo spaCy em pedaços (nlp.pipe) e devolve, para cada texto
+    e na ordem de entrada, a lista de Docs dos seus pedaços.
+    """
+    limit = max(1, min(CHUNK_CHARS, nlp.max_length))
+    counts = []
+
+    def chunk_stream():
+        for text in texts:
+            parts = split_chunks(text, limit)
+            counts.append(len(parts))  # registrado antes do 1º pedaço sair do gerador
+            yield from parts
+
+    docs = iter(nlp.pipe(chunk_stream(), batch_size=batch_size, n_process=n_process,
+                         disable=_disabled_pipes(nlp, profile)))
+    for i in range(len(texts)):
+        first = next(docs)
+        yield [first] + [next(docs) for _ in range(counts[i] - 1)]
+
+def _summarize(docs: list, text, profile: str = FULL_PROFILE, truncated: bool = False) -> dict:
+    """Converte os Docs spaCy (pedaços de um texto) no dict de features do perfil."""
+    outputs = PROFILES[profile]["outputs"]
+    view   = TextView.of(text)  # minúsculas/fold calculados uma vez para os extratores abaixo
+    skills = get_skill_matcher().find_folded(view.folded)
+    certs  = scan_certs(view).certs
+    hits   = scan(view)  # uma passada: contato, seções e projetos
+    
+    result = {
+        "tokens": sum(len(doc) for doc in docs), 
+        "skills": skills, 
+        "certs": certs, 
+        # Detecções adicionais
+        "has_email": hits.has_email,
+        "has_phone": hits.has_phone,
+        "sections_count": hits.sections_count,
+        "project_hits": hits.project_hits,
+        "truncated": truncated
+    }
+    if "dates" in outputs:
+        result["dates"] = [ent.text for doc in docs for ent in doc.ents if ent.label_ == "DATE"]
+    if "lemmas" in outputs:
+        result["lemmas"] = [t.lemma_.lower() for doc in docs for t in doc if not t.is_space]
+    return result
+
+def analyze(text: str, profile: str = FULL_PROFILE, use_cache: bool = True) -> dict:
+    """
+    Analisa o texto e retorna features básicas para o scoring.
     
-    text_lower = text.lower()
-    project_patterns = [
-        # Padrões PT-BR
-        r'\bprojeto\s+(de|em|sobre|para|com|usando)',
-        r'\bdesenvol(vi|veu|vemos|vendo|vimento de)\s+(um|uma|o|a|sistema|aplicativo|site|aplicação|aplicativo)',
-        r'\b(criação|criou|criei|criamos)\s+(de|do|da|um|uma)\s+(sistema|aplicativo|app|site|plataforma|solução)',
-        r'\b(implementação|implementou|implementei|implementamos)\s+(de|do|da)',
-        r'\b(construção|construí|construiu)\s+(de|do|da)',
-        r'\batuei\s+(no|na)\s+(desenvolvimento|criação|implementação)',
-        # Padrões EN
-        r'\b(developed|created|built|implemented)\s+(a|an|the)?\s*(system|application|app|website|platform|solution)',
-        r'\bproject\s+(for|with|using|in)',
-        # Comuns
-        r'\b(trabalho de conclusão|tcc|projeto final|final project)',
-        r'\b(projeto acadêmico|academic project|projeto pessoal|personal project)',
-        r'\bgithub\.com',
-        r'\bgitlab\.com',
-        r'\bportfólio|portfolio',
-    ]
+    Textos longos são processados em pedaços (ver split_chunks) e cortados em
+    MAX_ANALYZE_CHARS; nesse caso o resultado vem com truncated=True.
     
-    count = sum(1 for pattern in project_patterns if re.search(pattern, text_lower))
-    return min(count, 5)  # Cap em 5 para evitar falsos positivos
-
-def analyze(text: str) -> dict:
-    """Analisa o texto e retorna features básicas para o scoring."""
-    doc = _nlp(text or "")
-    skills = sorted(set(doc[s:e].text.lower() for _, s, e in _phrase(doc)))
-    certs  = [ent.text for ent in doc.ents if ent.label_ == "CERT"]
-    dates  = [ent.text for ent in doc.ents if ent.label_ == "DATE"]
-    lemmas = [t.lemma_.lower() for t in doc if not t.is_space]
+    Args:
+        text: Texto do currículo
+        profile: "full" (inclui dates/lemmas) ou "scoring" (só o que os scorers usam)
+        use_cache: Consulta/grava o cache de análise (ver analysis_cache)
+    """
+    return analyze_batch([text], batch_size=1, profile=profile, use_cache=use_cache)[0]
+
+def analyze_lite(text: str) -> dict:
+    """
+    analyze() no perfil "scoring" sem passar pelo spaCy: tokens contados por
+    espaços, o resto igual. Usado quando o orçamento de latência não comporta o
+    pipeline (ver app.scoring.budget); não entra no cache de análise.
+    """
+    text = text or ""
+    bounded = _truncate(text, MAX_ANALYZE_CHARS)
+    result = _summarize([], bounded, SCORING_PROFILE, truncated=len(bounded) < len(text))
+    result["tokens"] = len(TextView.of(bounded).tokens)
+    return result
+
+def analyze_batch(texts, batch_size: int = 64, n_process: int = 1, profile: str = FULL_PROFILE,
+                  use_cache: bool = True) -> list:
+    """
+    Versão em lote de analyze() usando nlp.pipe.
     
-    # Detecções adicionais
-    has_email = extract_email(text)
-    has_phone = extract_phone(text)
-    sections_count = count_sections(text)
-    project_hits = detect_projects(text)
+    Args:
+        texts: Iterável de textos (None vira "")
+        batch_size: Pedaços de texto por lote do spaCy
+        n_process: Processos do spaCy (>1 usa multiprocessing)
+        profile: Perfil de análise (ver PROFILES)
+        use_cache: Só os textos fora do cache passam pelo spaCy
     
-    return {
-        "tokens": len(doc), 
-        "skills": skills, 
-        "certs": certs, 
-        "dates": dates, 
-        "lemmas": lemmas,
-        "has_email": has_email,
-        "has_phone": has_phone,
-        "sections_count": sections_count,
-        "project_hits": project_hits
-    }
+    Returns:
+        Lista de dicts no mesmo formato de analyze(), na ordem de entrada
+    """
+    texts = [t or "" for t in texts]
+    results = [None] * len(texts)
+    keys = [_cache_key(t, profile) if use_cache else None for t in texts]
+
+    # textos repetidos no mesmo lote são analisados uma vez só
+    pending = {}
+    for i, (text, key) in enumerate(zip(texts, keys)):
+        if key is not None:
+            if key in pending:
+                pending[key].append(i)
+                continue
+            cached = analysis_cache.get(key)
+            if cached is not None:
+                results[i] = cached
+                continue
+        pending.setdefault(key if key is not None else i, []).append(i)
+
+    if pending:
+        nlp = get_pipeline()
+        groups = list(pending.values())
+        bounded = [_truncate(texts[g[0]], MAX_ANALYZE_CHARS) for g in groups]
+        chunked = _pipe_chunked(nlp, bounded, profile, batch_size=batch_size, n_process=n_process)
+        for docs, text, group in zip(chunked, bounded, groups):
+            first = group[0]
+            result = _summarize(docs, text, profile, truncated=len(text) < len(texts[first]))
+            if keys[first] is not None:
+                analysis_cache.put(keys[first], result)
+            for i in group:
+                results[i] = result if i == first else dict(result)
+    return results
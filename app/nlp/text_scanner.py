@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Scanner único de padrões de currículo: seções, projetos e contato (email/telefone).
+
+Os ~25 regex que antes eram buscados um a um (um re.search por padrão) viram uma
+única alternação com grupos nomeados, envolvida em lookahead. Uma passada de
+finditer encontra as posições onde algum padrão começa; nessas posições (poucas
+por currículo) os padrões ainda não vistos são confirmados com match ancorado.
+Assim padrões que começam no mesmo ponto (ex.: "portfolio" como seção e como
+projeto) continuam sendo contados. O resultado é o mesmo da versão antiga, exceto
+que seções/projetos também veem o texto com espaços colapsados (como o telefone já via).
+
+Uso:
+    from app.nlp.text_scanner import scan
+    hits = scan(text)
+    hits.sections_count, hits.project_hits, hits.has_email, hits.has_phone
+"""
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+from app.nlp.text_view import TextView
+
+# --- Seções (PT-BR + EN): conta quantos grupos aparecem ---
+SECTION_PATTERNS: List[Tuple[str, str]] = [
+    # Contato/Dados pessoais
+    ("sec_contato", r'\b(contato|dados pessoais|informações pessoais|contact|personal info)\b'),
+    # Resumo/Objetivo
+    ("sec_resumo", r'\b(resumo|perfil|objetivo|sobre|summary|profile|about|objective)\b'),
+    # Experiência Profissional
+    ("sec_experiencia", r'\b(experiência|experiencia|histórico profissional|carreira|experience|work history|employment)\b'),
+    # Formação/Educação
+    ("sec_formacao", r'\b(formação|educação|education|academic|qualificações|qualifications)\b'),
+    # Habilidades/Skills
+    ("sec_habilidades", r'\b(habilidades|competências|skills|tecnologias|technologies|conhecimentos)\b'),
+    # Projetos
+    ("sec_projetos", r'\b(projetos|portfolio|portfólio|projects|work samples)\b'),
+    # Certificações
+    ("sec_certificacoes", r'\b(certificações|certificados|cursos|certifications|certificates|courses)\b'),
+    # Idiomas
+    ("sec_idiomas", r'\b(idiomas|languages)\b'),
+    # Extras comuns em PT-BR
+    ("sec_conquistas", r'\b(conquistas|realizações|achievements)\b'),
+    ("sec_publicacoes", r'\b(publicações|publications)\b'),
+]
+
+# --- Menções a projetos (acadêmicos, pessoais, profissionais) ---
+PROJECT_PATTERNS: List[Tuple[str, str]] = [
+    # Padrões PT-BR
+    ("prj_projeto_de", r'\bprojeto\s+(de|em|sobre|para|com|usando)'),
+    ("prj_desenvolvi", r'\bdesenvol(vi|veu|vemos|vendo|vimento de)\s+(um|uma|o|a|sistema|aplicativo|site|aplicação|aplicativo)'),
+    ("prj_criacao", r'\b(criação|criou|criei|criamos)\s+(de|do|da|um|uma)\s+(sistema|aplicativo|app|site|plataforma|solução)'),
+    ("prj_implementacao", r'\b(implementação|implementou|implementei|implementamos)\s+(de|do|da)'),
+    ("prj_construcao", r'\b(construção|construí|construiu)\s+(de|do|da)'),
+    ("prj_atuei", r'\batuei\s+(no|na)\s+(desenvolvimento|criação|implementação)'),
+    # Padrões EN
+    ("prj_developed", r'\b(developed|created|built|implemented)\s+(a|an|the)?\s*(system|application|app|website|platform|solution)'),
+    ("prj_project_for", r'\bproject\s+(for|with|using|in)'),
+    # Comuns
+    ("prj_tcc", r'\b(trabalho de conclusão|tcc|projeto final|final project)'),
+    ("prj_academico", r'\b(projeto acadêmico|academic project|projeto pessoal|personal project)'),
+    ("prj_github", r'\bgithub\.com'),
+    ("prj_gitlab", r'\bgitlab\.com'),
+    ("prj_portfolio", r'\bportfólio|portfolio'),
+]
+MAX_PROJECT_HITS = 5  # Cap para evitar falsos positivos
+
+# --- Contato ---
+CONTACT_PATTERNS: List[Tuple[str, str]] = [
+    ("email", r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    # (11) 98765-4321 ou (11) 98765 -4321 (PDF)
+    ("phone_ddd", r'\(\d{2}\)\s*\d{4,5}\s*[-\s]?\s*\d{4}'),
+    # 11 98765-4321 ou 11 98765 -4321
+    ("phone_local", r'\d{2}[\s.-]?\d{4,5}\s*[-\s]?\s*\d{4}'),
+    # +55 11 98765-4321 ou +55 (11) 98765 -4321
+    ("phone_intl", r'\+55[\s.-]?\d{2}[\s.-]?\(?\d{2}\)?[\s.-]?\d{4,5}\s*[-\s]?\s*\d{4}'),
+    # 11987654321 (formato sem separadores)
+    ("phone_digits", r'\d{10,11}'),
+]
+
+SECTION_NAMES: FrozenSet[str] = frozenset(name for name, _ in SECTION_PATTERNS)
+PROJECT_NAMES: FrozenSet[str] = frozenset(name for name, _ in PROJECT_PATTERNS)
+PHONE_NAMES: FrozenSet[str] = frozenset(name for name, _ in CONTACT_PATTERNS if name.startswith("phone_"))
+
+
+class PatternScanner:
+    """
+    Alternação única de padrões nomeados que informa quais deles aparecem no texto.
+
+    Os padrões são compilados como (?=(?P<nome>...)|...): o lookahead não consome
+    texto, então o finditer passa por todas as posições de início. Em cada posição
+    encontrada, os padrões ainda pendentes são confirmados com pattern.match(text, pos),
+    o que cobre padrões que começam no mesmo lugar que o alternativo vencedor.
+
+    Para não testar a alternação inteira em cada caractere, só se tenta casar em
+    início de palavra ou onde `start_guard` casar. Todo padrão precisa começar
+    num desses pontos (os com \b no início já começam em início de palavra).
+    """
+
+    def __init__(self, patterns: List[Tuple[str, str]], start_guard: str = "", flags: int = 0):
+        self.names = [name for name, _ in patterns]
+        # Grupos internos dos padrões viram não-capturantes só no combinado, para
+        # que lastgroup aponte sempre para o nome do padrão.
+        alternation = "|".join(f"(?P<{name}>{_non_capturing(rx)})" for name, rx in patterns)
+        guard = f"(?:(?<!\\w)|(?=(?:{start_guard})))" if start_guard else "(?<!\\w)"
+        self._combined = re.compile(f"{guard}(?=(?:{alternation}))", flags)
+        self._single: Dict[str, "re.Pattern"] = {name: re.compile(rx, flags) for name, rx in patterns}
+
+    def hits(self, text: str) -> FrozenSet[str]:
+        """Nomes dos padrões que ocorrem em `text` (mesmo resultado de um re.search por padrão)."""
+        found = set()
+        pending = dict(self._single)
+        for m in self._combined.finditer(text):
+            name = m.lastgroup
+            if name in pending:
+                found.add(name)
+                del pending[name]
+            pos = m.start()
+            for other in [n for n, rx in pending.items() if rx.match(text, pos)]:
+                found.add(other)
+                del pending[other]
+            if not pending:
+                break
+        return frozenset(found)
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """
+        Ocorrências de cada padrão, com a mesma contagem de len(re.findall(padrão, text)):
+        depois de um match, o padrão só volta a ser testado a partir do fim dele.
+        """
+        counts: Dict[str, int] = {}
+        next_pos: Dict[str, int] = {}
+        for m in self._combined.finditer(text):
+            pos = m.start()
+            for name, rx in self._single.items():
+                if next_pos.get(name, 0) > pos:
+                    continue
+                hit = rx.match(text, pos)
+                if hit:
+                    counts[name] = counts.get(name, 0) + 1
+                    next_pos[name] = max(hit.end(), pos + 1)
+        return counts
+
+
+def _non_capturing(pattern: str) -> str:
+    """Troca '(' de grupos capturantes por '(?:' (os padrões daqui não usam classes com parênteses)."""
+    return re.sub(r'(?<!\\)\((?!\?)', '(?:', pattern)
+
+
+class ScanResult:
+    """Resultado do scan: padrões encontrados e contagens derivadas."""
+
+    __slots__ = ("hits",)
+
+    def __init__(self, hits: FrozenSet[str]):
+        self.hits = hits
+
+    @property
+    def sections_count(self) -> int:
+        return len(self.hits & SECTION_NAMES)
+
+    @property
+    def project_hits(self) -> int:
+        return min(len(self.hits & PROJECT_NAMES), MAX_PROJECT_HITS)
+
+    @property
+    def has_email(self) -> bool:
+        return "email" in self.hits
+
+    @property
+    def has_phone(self) -> bool:
+        return bool(self.hits & PHONE_NAMES)
+
+
+# Seções/projetos/contato num só scanner: os padrões de seção e projeto são
+# minúsculos e tolerantes a espaços (\s+), e os de contato independem de caixa,
+# então todos rodam sobre o mesmo texto normalizado.
+# Telefones podem começar no meio de um número e "portfolio" (sem \b) no meio
+# de uma palavra: esses inícios entram no guard.
+_SCANNER = PatternScanner(
+    SECTION_PATTERNS + PROJECT_PATTERNS + CONTACT_PATTERNS,
+    start_guard=r"[\d(+]|portfolio",
+)
+
+
+_SECTION_RX = [(name, re.compile(rx)) for name, rx in SECTION_PATTERNS]
+
+
+def normalize(text: Union[str, TextView]) -> str:
+    """Minúsculas + espaços colapsados (remove tabs/quebras estranhas de PDF)."""
+    return TextView.of(text).normalized
+
+
+def scan(text: Union[str, TextView]) -> ScanResult:
+    """Uma passada pelo texto: seções, projetos, email e telefone."""
+    if not text:
+        return ScanResult(frozenset())
+    return ScanResult(_SCANNER.hits(normalize(text)))
+
+
+def match_section_heading(line: str) -> Optional[str]:
+    """Nome do padrão de seção que casa com uma linha (já em minúsculas), ou None."""
+    for name, rx in _SECTION_RX:
+        if rx.search(line):
+            return name
+    return None
+
+
+def extract_email(text: str) -> bool:
+    """Detecta se há email no texto."""
+    return scan(text).has_email
+
+
+def extract_phone(text: str) -> bool:
+    """Detecta se há telefone no texto (formatos brasileiros)."""
+    return scan(text).has_phone
+
+
+def count_sections(text: str) -> int:
+    """Conta seções importantes do currículo (PT-BR + EN)."""
+    return scan(text).sections_count
+
+
+def detect_projects(text: str) -> int:
+    """Detecta menções a projetos (acadêmicos, pessoais, profissionais) PT-BR + EN."""
+    return scan(text).project_hits
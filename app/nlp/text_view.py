@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Visão imutável de um texto de currículo, montada uma vez por documento.
+
+Os extratores (seniority, projetos, seções, duplicação, skills, features do
+modelo não-supervisionado, spacy_nlp) chamavam text.lower()/text.split() cada um
+por conta própria: várias cópias O(n) do mesmo texto por currículo. O TextView
+calcula cada forma na primeira vez que é pedida e a reaproveita daí em diante.
+
+Uso:
+    from app.nlp.text_view import TextView
+    view = TextView.of(text)      # aceita str ou TextView (devolve o mesmo objeto)
+    view.lower, view.tokens, view.folded, view.line_offsets, view.section_spans
+"""
+import bisect
+from typing import List, Optional, Tuple, Union
+
+from app.nlp.skill_matcher import fold
+
+# Linhas até este tamanho que casam com um padrão de seção são tratadas como título
+_MAX_HEADING_CHARS = 60
+
+
+class TextView:
+    """
+    Formas derivadas de um texto, calculadas sob demanda e guardadas.
+
+    Atributos (somente leitura):
+        original: texto original
+        lower: minúsculas (str.lower, como os extratores já usavam)
+        folded: casefold + sem acentos + espaços colapsados (skill_matcher.fold)
+        tokens / lower_tokens: original.split() / lower.split()
+        normalized: lower com espaços colapsados (" ".join(lower_tokens))
+        line_offsets: offset de início de cada linha em original
+        section_spans: (seção, início, fim) das seções detectadas por título
+    """
+
+    __slots__ = ("original", "_lower", "_folded", "_tokens", "_lower_tokens",
+                 "_normalized", "_line_offsets", "_section_spans")
+
+    def __init__(self, text: Optional[str]):
+        object.__setattr__(self, "original", text or "")
+        for name in self.__slots__[1:]:
+            object.__setattr__(self, name, None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TextView é imutável")
+
+    @classmethod
+    def of(cls, text: Union[str, "TextView", None]) -> "TextView":
+        """Reaproveita um TextView existente ou cria um para o texto."""
+        return text if isinstance(text, TextView) else cls(text)
+
+    def _memo(self, slot: str, factory):
+        value = object.__getattribute__(self, slot)
+        if value is None:
+            value = factory()
+            object.__setattr__(self, slot, value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self.original)
+
+    def __bool__(self) -> bool:
+        return bool(self.original)
+
+    def __str__(self) -> str:
+        return self.original
+
+    def __repr__(self) -> str:
+        preview = self.original[:40].replace("\n", " ")
+        return f"TextView({preview!r}{'...' if len(self.original) > 40 else ''}, {len(self.original)} chars)"
+
+    @property
+    def lower(self) -> str:
+        return self._memo("_lower", self.original.lower)
+
+    @property
+    def folded(self) -> str:
+        return self._memo("_folded", lambda: fold(self.original))
+
+    @property
+    def tokens(self) -> List[str]:
+        return self._memo("_tokens", self.original.split)
+
+    @property
+    def lower_tokens(self) -> List[str]:
+        return self._memo("_lower_tokens", lambda: self.lower.split())
+
+    @property
+    def normalized(self) -> str:
+        return self._memo("_normalized", lambda: " ".join(self.lower_tokens))
+
+    @property
+    def line_offsets(self) -> List[int]:
+        def build():
+            offsets = [0]
+            find = self.original.find
+            pos = find("\n")
+            while pos >= 0:
+                offsets.append(pos + 1)
+                pos = find("\n", pos + 1)
+            return offsets
+        return self._memo("_line_offsets", build)
+
+    def line_of(self, offset: int) -> int:
+        """Índice (0-based) da linha que contém o offset."""
+        return bisect.bisect_right(self.line_offsets, offset) - 1
+
+    def line(self, index: int) -> str:
+        offsets = self.line_offsets
+        start = offsets[index]
+        end = offsets[index + 1] - 1 if index + 1 < len(offsets) else len(self.original)
+        return self.original[start:end]
+
+    @property
+    def section_spans(self) -> List[Tuple[str, int, int]]:
+        """Seções (nome do padrão em text_scanner.SECTION_PATTERNS, início, fim) por linha-título."""
+        return self._memo("_section_spans", self._build_section_spans)
+
+    def _build_section_spans(self) -> List[Tuple[str, int, int]]:
+        # import tardio: text_scanner usa TextView
+        from app.nlp.text_scanner import match_section_heading
+
+        lower = self.lower
+        offsets = self.line_offsets
+        headings = []
+        for i, start in enumerate(offsets):
+            end = offsets[i + 1] - 1 if i + 1 < len(offsets) else len(lower)
+            line = lower[start:end].strip()
+            if not line or len(line) > _MAX_HEADING_CHARS:
+                continue
+            name = match_section_heading(line)
+            if name:
+                headings.append((name, start))
+
+        spans = []
+        for j, (name, start) in enumerate(headings):
+            end = headings[j + 1][1] if j + 1 < len(headings) else len(self.original)
+            spans.append((name, start, end))
+        return spans
+
+    def section_at(self, offset: int) -> Optional[str]:
+        """Seção que contém o offset (None antes do primeiro título)."""
+        for name, start, end in self.section_spans:
+            if start <= offset < end:
+                return name
+        return None
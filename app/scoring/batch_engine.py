@@ -0,0 +1,289 @@
+# scoring/batch_engine.py
+"""
+Rubric vetorizado: avalia N currículos de uma vez com NumPy.
+
+Mesma aritmética de subscores.py + engine.py, coluna a coluna:
+    features (lista de dicts) -> matriz X (N x FEATURE_COLUMNS)
+    X -> subscores S (N x SUBSCORE_NAMES)      (np.select / np.clip)
+    S -> final, label, top_up/top_down         (pesos por agente)
+
+Os resultados são idênticos aos de evaluate_resume_from_doc (mesmas operações
+em float64, na mesma ordem; o arredondamento final usa o round() do Python).
+Só o bônus de profundidade de skills depende do texto e é calculado por linha
+em feature_matrix().
+
+Uso:
+    from app.scoring.batch_engine import evaluate_batch
+    res = evaluate_batch(features_list)   # res["final"], res["label"], res["by_block"]
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .config import Agent
+from .engine import active_subscores
+from .rubric import Rubric, get_rubric
+from .subscores import SUBSCORE_FEATURES, FEATURE_DEFAULTS, skill_depth_bonus
+
+SUBSCORE_NAMES = tuple(SUBSCORE_FEATURES)
+_COL = {name: i for i, name in enumerate(SUBSCORE_NAMES)}
+
+FEATURE_COLUMNS = (
+    "n_skills", "skill_depth", "years_total", "seniority_align", "project_hits",
+    "cert_points", "metrics_hits", "cosine", "tokens", "sections_present", "dup_rate",
+    "has_email", "has_phone", "remote_align", "comp_score",
+)
+_F = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+
+def _feature_row(f: dict) -> List[float]:
+    # Mesmos defaults de use_case.build_subscores; None vira 0 (ou NaN em comp_score)
+    skills = f.get("skills")
+    comp = f.get("comp_score")
+    return [
+        float(len(set(map(str.lower, skills or [])))),
+        skill_depth_bonus(skills, f.get("text", "")) if f.get("text") else 0.0,
+        float(f.get("years_total", 0) or 0.0),
+        float(f.get("seniority_align", 0) or 0.0),
+        float(f.get("project_hits", 0) or 0),
+        float(f.get("cert_points", 0) or 0),
+        float(f.get("metrics_hits", 0) or 0),
+        float(f.get("cosine", 0) or 0.0),
+        float(f.get("tokens", 0) or 0),
+        float(f.get("sections_present", 0) or 0),
+        float(f.get("dup_rate", 0) or 0.0),
+        1.0 if f.get("has_email", False) else 0.0,
+        1.0 if f.get("has_phone", False) else 0.0,
+        float(f.get("remote_align", 0) or 0.0),
+        np.nan if comp is None else float(comp),
+    ]
+
+
+def feature_matrix(features_list: Sequence[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte dicts de build_features_from_doc na matriz de features do rubric.
+
+    Returns:
+        (X, experienced): X com shape (N, len(FEATURE_COLUMNS)) e máscara bool do agente
+    """
+    X = np.array([_feature_row(f) for f in features_list], dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+    experienced = np.array([bool(f.get("has_experience", False)) for f in features_list], dtype=bool)
+    return X, experienced
+
+
+# ---------- subscores (versões vetorizadas de subscores.py) ----------
+
+def _clip(x: np.ndarray) -> np.ndarray:
+    return np.clip(x, 0.0, 1.0)
+
+
+def _skills(X):
+    return _clip(np.minimum(X[:, _F["n_skills"]] / 12.0, 1.0) + X[:, _F["skill_depth"]])
+
+
+def _experience(X):
+    years = X[:, _F["years_total"]]
+    years_norm = np.select(
+        [years == 0.0, years < 1.0, years < 2.0, years < 3.0, years < 5.0],
+        [np.full_like(years, 0.20),
+         0.20 + (years * 0.20),
+         0.40 + ((years - 1.0) * 0.20),
+         0.60 + ((years - 2.0) * 0.15),
+         0.75 + ((years - 3.0) * 0.075)],
+        default=np.minimum(0.90 + ((years - 5.0) * 0.02), 1.0),
+    )
+    return _clip(0.75*years_norm + 0.25*X[:, _F["seniority_align"]])
+
+
+def _hits_curve(hits, zero_value):
+    # score_projects / score_impact: 0 -> zero_value, 1 -> 0.5, 2 -> 0.75, 3+ -> +0.10 cada
+    return np.select(
+        [hits == 0, hits == 1, hits == 2],
+        [np.full_like(hits, zero_value), np.full_like(hits, 0.50), np.full_like(hits, 0.75)],
+        default=np.minimum(0.75 + (hits - 2) * 0.10, 1.0),
+    )
+
+
+def _projects(X):
+    return _hits_curve(X[:, _F["project_hits"]], 0.10)
+
+
+def _certs(X):
+    points = X[:, _F["cert_points"]]
+    return np.where(points == 0, 0.0, _clip(points * 1.0))
+
+
+def _impact(X):
+    return _hits_curve(X[:, _F["metrics_hits"]], 0.20)
+
+
+def _semantic(X):
+    return _clip(X[:, _F["cosine"]])
+
+
+def _doc_quality(X):
+    tokens = X[:, _F["tokens"]]
+    len_score = np.select(
+        [tokens < 300, tokens <= 1500],
+        [tokens / 300.0, np.ones_like(tokens)],
+        default=np.maximum(0.7, 1.0 - (tokens - 1500) / 3000.0),
+    )
+    structure_score = np.minimum(X[:, _F["sections_present"]] / 6.0, 1.0)
+    clarity_score = 1.0 - X[:, _F["dup_rate"]]
+    return _clip(0.4*len_score + 0.4*structure_score + 0.2*clarity_score)
+
+
+def _contact(X):
+    return _clip(np.where(X[:, _F["has_email"]] > 0, 0.6, 0.0) + np.where(X[:, _F["has_phone"]] > 0, 0.4, 0.0))
+
+
+def _context(X):
+    remote = X[:, _F["remote_align"]]
+    comp = X[:, _F["comp_score"]]
+    return np.where(np.isnan(comp), _clip(remote), _clip(0.7*remote + 0.3*np.nan_to_num(comp)))
+
+
+_SUBSCORE_FNS = {
+    "skills": _skills,
+    "experience": _experience,
+    "projects": _projects,
+    "certs": _certs,
+    "impact": _impact,
+    "semantic": _semantic,
+    "doc_quality": _doc_quality,
+    "contact": _contact,
+    "context": _context,
+}
+
+
+def _compute(X: np.ndarray) -> np.ndarray:
+    return np.column_stack([_SUBSCORE_FNS[name](X) for name in SUBSCORE_NAMES])
+
+
+def _default_subscores() -> np.ndarray:
+    """Subscores dos valores neutros (usados nos blocos de peso zero)."""
+    X, _ = feature_matrix([FEATURE_DEFAULTS])
+    return _compute(X)[0]
+
+
+def subscore_matrix(X: np.ndarray, experienced: np.ndarray, require: Iterable[str] = (),
+                    rubric: Rubric = None) -> np.ndarray:
+    """Subscores (N x SUBSCORE_NAMES); blocos inativos do agente recebem o valor neutro."""
+    rubric = rubric or get_rubric()
+    S = _compute(X)
+    defaults = _default_subscores()
+    for agent, rows in ((Agent.EXPERIENCED, experienced), (Agent.NOEXP, ~experienced)):
+        active = active_subscores(agent, require, rubric)
+        for name in SUBSCORE_NAMES:
+            if name not in active:
+                S[rows, _COL[name]] = defaults[_COL[name]]
+    return S
+
+
+# ---------- engine (combine / label / explain) ----------
+
+def _weight_rows(experienced: np.ndarray, rubric: Rubric) -> np.ndarray:
+    """Matriz de pesos (N x SUBSCORE_NAMES) escolhida pelo agente de cada linha."""
+    table = {agent: np.array([rubric.weights[agent].get(name, 0) for name in SUBSCORE_NAMES], dtype=np.float64)
+             for agent in (Agent.EXPERIENCED, Agent.NOEXP)}
+    return np.where(experienced[:, None], table[Agent.EXPERIENCED], table[Agent.NOEXP])
+
+
+def combine_batch(S: np.ndarray, experienced: np.ndarray, rubric: Rubric = None) -> np.ndarray:
+    """engine.combine para N linhas."""
+    rubric = rubric or get_rubric()
+    acc = np.zeros(len(S), dtype=np.float64)
+    for agent, rows in ((Agent.EXPERIENCED, experienced), (Agent.NOEXP, ~experienced)):
+        if not rows.any():
+            continue
+        total = np.zeros(int(rows.sum()), dtype=np.float64)
+        # Soma na ordem das chaves de rubric.weights[agent], como engine.combine (float não é associativo)
+        for name, w in rubric.weights[agent].items():
+            if name in _COL:
+                total = total + w*S[rows, _COL[name]]
+        acc[rows] = total
+    # round() do Python (np.round difere em alguns casos ...x5)
+    return np.array([round(v, 1) for v in (100 * acc).tolist()], dtype=np.float64)
+
+
+def labels_batch(final: np.ndarray, experienced: np.ndarray, rubric: Rubric = None) -> List[str]:
+    """engine.label_from para N linhas."""
+    cutoffs = (rubric or get_rubric()).cutoffs
+    cutoff = np.where(experienced, cutoffs["experienced"], cutoffs["noexp"])
+    return np.where(final >= cutoff, "Bom", "Ruim").tolist()
+
+
+def explain_top_batch(S: np.ndarray, experienced: np.ndarray, k: int = 3,
+                      rubric: Rubric = None) -> Tuple[List[List[str]], List[List[str]]]:
+    """engine.explain_top para N linhas (ordenação estável, como sorted())."""
+    contrib = _weight_rows(experienced, rubric or get_rubric()) * S
+    up = np.argsort(-contrib, axis=1, kind="stable")[:, :k]
+    down = np.argsort(contrib, axis=1, kind="stable")[:, :k]
+    names = np.array(SUBSCORE_NAMES)
+    return names[up].tolist(), names[down].tolist()
+
+
+def evaluate_batch(features_list: Sequence[dict], require: Iterable[str] = (), explain: bool = True) -> Dict[str, object]:
+    """
+    Avalia N currículos (features de build_features_from_doc / build_features_batch).
+
+    Returns:
+        Dict com arrays/listas alinhados à entrada: agent, by_block (N x SUBSCORE_NAMES),
+        final, label e, com explain=True, top_up/top_down
+    """
+    rubric = get_rubric()
+    X, experienced = feature_matrix(features_list)
+    S = subscore_matrix(X, experienced, require, rubric)
+    result = _result(S, experienced, explain, rubric)
+    result["evaluated"] = {agent.value: sorted(active_subscores(agent, require, rubric))
+                           for agent in (Agent.EXPERIENCED, Agent.NOEXP)}
+    return result
+
+
+def _result(S: np.ndarray, experienced: np.ndarray, explain: bool, rubric: Rubric) -> Dict[str, object]:
+    final = combine_batch(S, experienced, rubric)
+    result = {
+        "version": rubric.version,
+        "subscores": SUBSCORE_NAMES,
+        "agent": np.where(experienced, Agent.EXPERIENCED.value, Agent.NOEXP.value).tolist(),
+        "by_block": S,
+        "final": final,
+        "label": labels_batch(final, experienced, rubric),
+    }
+    if explain:
+        result["top_up"], result["top_down"] = explain_top_batch(S, experienced, rubric=rubric)
+    return result
+
+
+def rescore_batch(by_blocks: Sequence[Dict[str, float]], agents: Sequence[str], explain: bool = True,
+                  rubric: Rubric = None) -> Dict[str, object]:
+    """
+    Aplica o rubric (padrão: o ativo, ver rubric.get_rubric) a subscores já calculados,
+    ex.: evaluations.scores.by_block, sem reextrair features.
+
+    Args:
+        by_blocks: Subscores guardados, um dict por avaliação (bloco ausente = 0)
+        agents: "experienced" ou "noexp" de cada avaliação
+    """
+    S = np.array([[float(b.get(name, 0) or 0.0) for name in SUBSCORE_NAMES] for b in by_blocks],
+                 dtype=np.float64).reshape(-1, len(SUBSCORE_NAMES))
+    experienced = np.array([a == Agent.EXPERIENCED.value for a in agents], dtype=bool)
+    return _result(S, experienced, explain, rubric or get_rubric())
+
+
+def batch_rows(result: Dict[str, object]) -> List[dict]:
+    """Converte o resultado de evaluate_batch no formato de engine.evaluate, um dict por currículo."""
+    rows = []
+    for i, agent in enumerate(result["agent"]):
+        rows.append({
+            "scores": {
+                "version": result["version"],
+                "by_block": dict(zip(result["subscores"], result["by_block"][i].tolist())),
+                "final": float(result["final"][i]),
+                "label": result["label"][i],
+                **({"evaluated": result["evaluated"][agent]} if "evaluated" in result else {}),
+            },
+            "explain": {"top_up": result["top_up"][i], "top_down": result["top_down"][i]},
+            "agent": agent,
+        })
+    return rows
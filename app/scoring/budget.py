@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Orçamento de latência (deadline) por chamada do scorer.
+
+Chamadores interativos (/api/analyze, interface Tk) preferem um score um pouco
+menos preciso em ~200 ms a um exato em 3 s. Com um Deadline, cada etapa cara da
+extração só roda se o custo estimado couber no tempo restante; senão entra o
+fallback que o sistema já usa quando o modelo não está disponível:
+
+    classifier  DistilBERT            -> regra years >= 2.0
+    semantic    embeddings da vaga    -> 0.0
+    nlp         spaCy (tokenizer)     -> tokens contados por espaços (analyze_lite)
+
+O custo de cada etapa é a média móvel dos tempos observados por currículo; a
+primeira observação de cada etapa (chamada fria: alocação, cache de kernels) fica
+fora da média. Um modelo ainda não carregado não cabe em orçamento nenhum: a carga
+é disparada em segundo plano e a chamada usa o fallback; as seguintes já usam o
+modelo. Uma etapa pulada não é medida de novo e a estimativa dela só sobe, então
+ela volta a rodar de vez em quando (a cada _PROBE_EVERY chamadas puladas ou
+_PROBE_AFTER_S segundos) para a estimativa poder cair.
+As etapas degradadas ficam em Deadline.degraded (e no 'degraded' do resultado).
+"""
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from app.ml.model_registry import registry
+from . import parallel  # noqa: F401 (registra o "scoring_pool")
+
+# Ordem = prioridade: o classificador decide o agente, o spaCy tem fallback quase igual
+STAGES = ("classifier", "semantic", "nlp")
+STAGE_MODELS = {"classifier": "resume_classifier", "semantic": "embedding", "nlp": "spacy_pt"}
+
+# Custos iniciais (ms por currículo), substituídos pelos tempos observados
+_estimates = {"classifier": 120.0, "semantic": 100.0, "nlp": 20.0, "extractors": 10.0}
+_ALPHA = 0.2
+_lock = threading.Lock()
+_warming: Set[str] = set()
+_observed: Set[str] = set()
+
+# Etapa pulada volta a rodar após tantas chamadas puladas ou tantos segundos
+_PROBE_EVERY = 20
+_PROBE_AFTER_S = 30.0
+_skipped: Dict[str, List[float]] = {}  # etapa -> [chamadas puladas, início (perf_counter)]
+
+
+def observe(stage: str, ms_per_doc: float) -> None:
+    """Atualiza a estimativa de custo de uma etapa (média móvel exponencial)."""
+    with _lock:
+        if stage not in _observed:
+            _observed.add(stage)  # chamada fria: não representa o custo em regime
+            return
+        prev = _estimates.get(stage)
+        _estimates[stage] = ms_per_doc if prev is None else prev + _ALPHA * (ms_per_doc - prev)
+
+
+def estimate(stage: str) -> float:
+    return _estimates.get(stage, 0.0)
+
+
+def _probe_due(stage: str) -> bool:
+    """Conta uma chamada pulada; True quando a etapa deve rodar mesmo assim para ser medida."""
+    now = time.perf_counter()
+    with _lock:
+        skips = _skipped.setdefault(stage, [0, now])
+        skips[0] += 1
+        if skips[0] > _PROBE_EVERY or now - skips[1] >= _PROBE_AFTER_S:
+            del _skipped[stage]
+            return True
+        return False
+
+
+def _ran(stage: str) -> None:
+    with _lock:
+        _skipped.pop(stage, None)
+
+
+def _warm(model: str) -> None:
+    """Carrega o modelo no pool de scoring (uma carga por vez) sem bloquear quem chamou."""
+    with _lock:
+        if model in _warming:
+            return
+        _warming.add(model)
+
+    def load():
+        try:
+            registry.get(model)
+        except Exception:
+            pass  # a falha fica no registro; o fallback continua valendo
+        finally:
+            with _lock:
+                _warming.discard(model)  # vencido o retry de uma falha, pode carregar de novo
+
+    registry.get("scoring_pool").submit(load)
+
+
+class Deadline:
+    """Tempo restante de uma chamada e etapas degradadas por falta dele."""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = float(budget_ms)
+        self._end = time.perf_counter() + self.budget_ms / 1000.0
+        self.degraded: List[str] = []
+
+    @classmethod
+    def of(cls, deadline: Union[float, "Deadline", None]) -> Optional["Deadline"]:
+        """Aceita ms, um Deadline já em curso (compartilhado entre etapas) ou None."""
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining_ms(self) -> float:
+        return (self._end - time.perf_counter()) * 1000.0
+
+    def plan(self, stages: Iterable[str], n_docs: int = 1, concurrent: bool = False) -> Set[str]:
+        """
+        Etapas que cabem no tempo restante, na ordem de STAGES; as demais são
+        marcadas como degradadas. Uma etapa carregada que vem sendo pulada roda
+        de vez em quando mesmo sem caber (ver _probe_due).
+
+        Args:
+            stages: Etapas que a chamada precisaria rodar
+            n_docs: Currículos na chamada (o custo estimado é por currículo)
+            concurrent: Etapas rodam em paralelo (o custo não se soma)
+        """
+        wanted = set(stages)
+        left = self.remaining_ms() - estimate("extractors") * n_docs
+        keep, used = set(), 0.0
+        for stage in STAGES:
+            if stage not in wanted:
+                continue
+            model = STAGE_MODELS[stage]
+            cost = estimate(stage) * n_docs
+            if registry.has_failed(model):
+                # sem modelo o caminho normal já é o fallback barato
+                cost, fits = 0.0, True
+            elif not registry.is_loaded(model):
+                _warm(model)
+                fits = False
+            elif concurrent:
+                fits = cost <= left
+            else:
+                fits = used + cost <= left
+            if not fits and registry.is_loaded(model) and _probe_due(stage):
+                fits = True
+            if fits:
+                _ran(stage)
+                keep.add(stage)
+                used += cost
+            elif stage not in self.degraded:
+                self.degraded.append(stage)
+        return keep
+
+
+def interactive_deadline() -> Optional[Deadline]:
+    """Deadline dos chamadores interativos: ANALYZE_DEADLINE_MS (padrão 200; 0 desliga)."""
+    budget = float(os.getenv("ANALYZE_DEADLINE_MS", "200"))
+    return Deadline(budget) if budget > 0 else None
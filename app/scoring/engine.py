@@ -1,45 +1,61 @@
 # scoring/engine.py
-from typing import Dict, Any
-from .config import Agent, WEIGHTS, CUTOFFS, RUBRIC_VERSION
+from typing import Dict, Any, Iterable
+from .config import Agent
+from .rubric import Rubric, get_rubric
+from .subscores import SUBSCORE_FEATURES
 
-def combine(agent: Agent, subs: Dict[str, float]) -> float:
-    w = WEIGHTS[agent]
+def active_subscores(agent: Agent, require: Iterable[str] = (), rubric: Rubric = None) -> set:
+    """Subscores avaliados para o agente: peso > 0 ou pedidos em `require`."""
+    weights = (rubric or get_rubric()).weights[agent]
+    return {name for name in SUBSCORE_FEATURES if weights.get(name, 0) or name in require}
+
+def combine(agent: Agent, subs: Dict[str, float], rubric: Rubric = None) -> float:
+    w = (rubric or get_rubric()).weights[agent]
     return round(100 * sum(w.get(k, 0)*subs.get(k, 0) for k in w), 1)
 
-def label_from(score: float, agent: Agent = None) -> str:
+def label_from(score: float, agent: Agent = None, rubric: Rubric = None) -> str:
     """Retorna BOM ou RUIM baseado no perfil.
     
     Args:
         score: Score final (0-100)
         agent: Agent.NOEXP (estagiário) ou Agent.EXPERIENCED (profissional)
+        rubric: Rubric usado (padrão: o ativo)
     
     Returns:
         'Bom' ou 'Ruim'
     """
+    cutoffs = (rubric or get_rubric()).cutoffs
     if agent == Agent.NOEXP:
         # Estagiários: critério mais leve (>= 40 = BOM)
-        return "Bom" if score >= CUTOFFS["noexp"] else "Ruim"
+        return "Bom" if score >= cutoffs["noexp"] else "Ruim"
     else:
         # Experientes: critério mais rigoroso (>= 50 = BOM)
-        return "Bom" if score >= CUTOFFS["experienced"] else "Ruim"
+        return "Bom" if score >= cutoffs["experienced"] else "Ruim"
 
-def explain_top(subs: Dict[str,float], agent: Agent, k=3):
-    w = WEIGHTS[agent]
+def explain_top(subs: Dict[str,float], agent: Agent, k=3, rubric: Rubric = None):
+    w = (rubric or get_rubric()).weights[agent]
     contrib = {name: w.get(name,0)*val for name,val in subs.items()}
     up = sorted(contrib.items(), key=lambda x: x[1], reverse=True)[:k]
     down = sorted(contrib.items(), key=lambda x: x[1])[:k]
     return [n for n,_ in up], [n for n,_ in down]
 
-def evaluate(agent: Agent, subscores: Dict[str,float]) -> Dict[str, Any]:
-    final = combine(agent, subscores)
-    top_up, top_down = explain_top(subscores, agent)
+def evaluate(agent: Agent, subscores: Dict[str,float], evaluated: Iterable[str] = None,
+             rubric: Rubric = None) -> Dict[str, Any]:
+    # Uma referência só: uma troca de rubric no meio não mistura versões
+    rubric = rubric or get_rubric()
+    final = combine(agent, subscores, rubric)
+    top_up, top_down = explain_top(subscores, agent, rubric=rubric)
+    scores = {
+        "version": rubric.version,
+        "by_block": subscores,
+        "final": final,
+        "label": label_from(final, agent, rubric)
+    }
+    if evaluated is not None:
+        # Blocos calculados de fato (os demais valem o neutro); usado pelo rescore
+        scores["evaluated"] = sorted(evaluated)
     return {
-        "scores": {
-            "version": RUBRIC_VERSION,
-            "by_block": subscores,
-            "final": final,
-            "label": label_from(final, agent)
-        },
+        "scores": scores,
         "explain": { "top_up": top_up, "top_down": top_down },
         "agent": agent.value
     }
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Feature store persistente: guarda no MongoDB (coleção `features`) o dict completo
+de build_features_from_doc, indexado pelo hash do documento + versão dos extratores.
+
+Reavaliar um currículo já processado (/evaluate/{id}, /rank, backfill, rescore)
+passa a custar só a aritmética do rubric: spaCy, classificador DistilBERT,
+similaridade semântica e regex rodam uma vez por (conteúdo, versão). Textos
+avulsos (/evaluate, interface web/Tk) não passam pelo store.
+
+Chave (_id): "<versão>:<hash do documento>:<modo de experiência>"
+    - hash: texto + skills + years_experience + job_description (tudo que entra nas features)
+    - versão: EXTRACTOR_VERSION + versão/vocabulário do analisador NLP; mudar qualquer
+      extrator invalida as entradas antigas sem precisar apagar nada
+    - modo: auto (classificador ML), exp ou noexp (has_experience forçado)
+
+Desative com FEATURE_STORE=0. O store usa um cliente MongoDB próprio com
+timeout curto (FEATURE_STORE_TIMEOUT_MS, padrão 2000): MongoDB fora do ar vira
+miss rápido em vez de travar a avaliação.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.ml.model_registry import registry, ModelLoadError
+
+# Incremente ao mudar build_features_from_doc ou algum extrator de app/scoring
+EXTRACTOR_VERSION = "features-v1"
+COLLECTION = "features"
+
+
+def extractor_version() -> str:
+    from app.nlp.spacy_nlp import ANALYZER_VERSION, vocabulary_fingerprint
+    return f"{EXTRACTOR_VERSION}+{ANALYZER_VERSION}+{vocabulary_fingerprint()}"
+
+
+def document_hash(doc: dict) -> str:
+    """Hash de tudo que o documento fornece para a extração de features."""
+    payload = {
+        "text": (doc.get("description_clean") or doc.get("resume_text_clean") or "").strip(),
+        "skills": sorted(str(s) for s in (doc.get("skills") or [])),
+        "years_experience": doc.get("years_experience") or None,
+        "job_description": doc.get("job_description") or None,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def is_transient(doc: dict, feats: dict) -> bool:
+    """
+    Features que dependem de um modelo indisponível ou do orçamento de latência:
+    não vão para o store, senão o fallback ficaria congelado para aquele conteúdo.
+    """
+    if feats.get("degraded"):
+        return True
+    if (feats.get("classification") or {}).get("method") in ("rule_fallback", "rule_only"):
+        return True
+    # cosine exatamente 0.0 com vaga e texto só sai quando o modelo de embeddings falhou
+    text = (doc.get("description_clean") or doc.get("resume_text_clean") or "").strip()
+    return bool(doc.get("job_description") and text and feats.get("cosine") == 0.0)
+
+
+def _mode(has_experience) -> str:
+    if has_experience is None:
+        return "auto"
+    return "exp" if has_experience else "noexp"
+
+
+class FeatureStore:
+    """Leitura/gravação em lote de features na coleção `features`."""
+
+    def __init__(self, db, collection: str = COLLECTION, version: Optional[str] = None):
+        self.coll = db[collection]
+        self.version = version or extractor_version()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def key(self, doc: dict, has_experience=None, doc_hash: Optional[str] = None) -> str:
+        return f"{self.version}:{doc_hash or document_hash(doc)}:{_mode(has_experience)}"
+
+    def get_many(self, docs: List[dict], flags: List) -> List[Optional[dict]]:
+        """Features guardadas para cada (doc, has_experience), ou None."""
+        keys = [self.key(d, f) for d, f in zip(docs, flags)]
+        try:
+            found = {r["_id"]: r["features"] for r in self.coll.find({"_id": {"$in": list(set(keys))}})}
+        except Exception as e:
+            # Store indisponível não impede a avaliação: extrai normalmente
+            self.errors += 1
+            print(f"⚠️  Feature store indisponível (leitura): {e}")
+            found = {}
+
+        out = []
+        for doc, key in zip(docs, keys):
+            feats = found.get(key)
+            if feats is None:
+                self.misses += 1
+                out.append(None)
+            else:
+                self.hits += 1
+                # o texto não é gravado (já está no documento)
+                out.append({"text": (doc.get("description_clean") or doc.get("resume_text_clean") or "").strip(),
+                            **feats})
+        return out
+
+    def put_many(self, docs: List[dict], flags: List, features: List[dict]) -> None:
+        from pymongo import ReplaceOne
+
+        ops = []
+        for doc, flag, feats in zip(docs, flags, features):
+            if is_transient(doc, feats):
+                continue
+            doc_hash = document_hash(doc)
+            key = self.key(doc, flag, doc_hash)
+            ops.append(ReplaceOne({"_id": key}, {
+                "_id": key,
+                "extractor_version": self.version,
+                "doc_hash": doc_hash,
+                "mode": _mode(flag),
+                "source_doc_id": doc.get("_id"),
+                "features": {k: v for k, v in feats.items() if k != "text"},
+                "created_at": datetime.utcnow(),
+            }, upsert=True))
+        if not ops:
+            return
+        try:
+            self.coll.bulk_write(ops, ordered=False)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️  Feature store indisponível (gravação): {e}")
+
+    def stats(self) -> Dict[str, object]:
+        return {"version": self.version, "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+def _load_feature_store() -> Optional[FeatureStore]:
+    if os.getenv("FEATURE_STORE", "1").lower() in ("0", "false", "no"):
+        return None
+    from pymongo import MongoClient
+    from app.db.mongo import MONGO_DB, MONGO_URI
+
+    timeout_ms = int(os.getenv("FEATURE_STORE_TIMEOUT_MS", "2000"))
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=timeout_ms,
+                         connectTimeoutMS=timeout_ms, socketTimeoutMS=timeout_ms * 5)
+    return FeatureStore(client[MONGO_DB])
+
+
+registry.register("feature_store", _load_feature_store)
+
+
+def get_feature_store() -> Optional[FeatureStore]:
+    """Feature store do processo (None se desativado ou sem MongoDB)."""
+    try:
+        return registry.get("feature_store")
+    except ModelLoadError:
+        return None
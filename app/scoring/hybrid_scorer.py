@@ -2,12 +2,23 @@
 """
 Sistema Híbrido de Scoring: Combina ML Não-Supervisionado + Rule-Based
 """
-from typing import Dict, Tuple
+import time
+from typing import Dict, List, Tuple
 import numpy as np
 from pathlib import Path
 
-from app.ml.unsupervised_scoring import UnsupervisedResumeScorer, extract_features_array
-from app.scoring.use_case import evaluate_resume_from_doc
+from app.ml.model_registry import registry
+from app.ml.unsupervised_scoring import extract_features_array, extract_features_matrix
+from app.ml.fused_scorer import load_unsupervised_scorer
+from app.nlp.text_view import TextView
+from app.scoring.use_case import (
+    evaluate_resume_from_doc, evaluate_features_batch, build_features_batch, doc_text,
+)
+from app.scoring.feature_store import get_feature_store
+from app.scoring.parallel import run_parallel, parallel_enabled
+from app.scoring.budget import Deadline
+
+DEFAULT_MODEL_PATH = 'models/unsupervised_scorer.pkl'
 
 
 class HybridScorer:
@@ -22,31 +33,135 @@ class HybridScorer:
     - Ajusta pesos baseado em confiança
     """
     
-    def __init__(self, model_path: str = 'models/unsupervised_scorer.pkl'):
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH, parallel: bool = None):
         """
         Args:
-            model_path: Caminho para modelo ML treinado
+            model_path: Caminho para modelo ML treinado (carregado uma vez por processo)
+            parallel: Roda os ramos ML e rule-based (e as etapas independentes da
+                      extração) ao mesmo tempo no pool de scoring; None = SCORING_PARALLEL
         """
-        self.ml_scorer = UnsupervisedResumeScorer.load(model_path)
+        # .npz fundido (só NumPy, mmap) quando exportado; senão o .pkl do sklearn
+        self.ml_scorer = registry.get_or_register(
+            f"unsupervised_scorer:{model_path}",
+            lambda: load_unsupervised_scorer(model_path)
+        )
         self.ml_weight = 0.5
         self.rb_weight = 0.5
+        self.parallel = parallel_enabled() if parallel is None else parallel
         
-    def score(self, doc: dict) -> Dict:
+    def score(self, doc: dict, features: dict = None, use_store: bool = False, require=(),
+              deadline=None) -> Dict:
         """
         Avalia currículo com sistema híbrido
         
         Args:
             doc: Documento do currículo
+            features: Features rule-based já extraídas (ex.: build_features_batch)
+            use_store: Sem `features`, consulta o feature store antes de extrair
+                (só para currículos salvos: /evaluate/{id}, /rank, backfill)
+            require: Subscores rule-based a avaliar mesmo com peso zero (ex.: ("semantic",))
+            deadline: Orçamento de latência em ms (ou um Deadline já em curso): etapas
+                      caras que não cabem usam o fallback (ver app.scoring.budget)
         
         Returns:
-            Dict com scores, metadata e explicação
+            Dict com scores, metadata, explicação, tempos por ramo ('timings', em ms)
+            e etapas degradadas pelo orçamento ('degraded')
         """
+        deadline = Deadline.of(deadline)
+        store = get_feature_store() if (use_store and features is None) else None
+        stages = {}
+        
         # 1. ML Score
-        features = extract_features_array(doc)
-        ml_score, ml_meta = self.ml_scorer.predict_score(features)
+        def ml_branch():
+            ml_features = extract_features_array(doc)
+            return self.ml_scorer.predict_score(ml_features)
         
         # 2. Rule-Based Score
-        rb_result = evaluate_resume_from_doc(doc)
+        def rb_branch():
+            return evaluate_resume_from_doc(doc, features=features, store=store, require=require,
+                                            parallel=self.parallel, timings=stages, deadline=deadline)
+        
+        t0 = time.perf_counter()
+        branches, timings = run_parallel({"ml": ml_branch, "rule_based": rb_branch}, parallel=self.parallel)
+        ml_score, ml_meta = branches["ml"]
+        result = self._combine(doc, ml_score, ml_meta, branches["rule_based"])
+        result['timings'] = self._timings(timings, stages, t0)
+        result['degraded'] = self._degraded(branches["rule_based"], deadline)
+        return result
+    
+    def score_batch(self, docs: List[dict], features_list: List[dict] = None, use_store: bool = False,
+                    require=(), batch_size: int = 64, n_process: int = 1) -> List[Dict]:
+        """
+        Avalia vários currículos com uma passada de features por documento.
+        
+        O texto de cada currículo vira um TextView compartilhado entre as features
+        do rule-based e as do modelo não-supervisionado; spaCy, classificador e
+        embeddings rodam em lote (build_features_batch) e o rubric é vetorizado
+        (evaluate_features_batch).
+        
+        Args:
+            docs: Documentos dos currículos
+            features_list: Features rule-based já extraídas (pula a extração)
+            use_store: Sem `features_list`, consulta o feature store antes de extrair
+                (só para currículos salvos)
+            require: Subscores rule-based a avaliar mesmo com peso zero
+            batch_size / n_process: Repassados ao spaCy (nlp.pipe)
+        
+        Returns:
+            Lista de dicts no mesmo formato de score(), na ordem de entrada
+        """
+        docs = list(docs)
+        views = [TextView(doc_text(doc)) for doc in docs]
+        store = get_feature_store() if (use_store and features_list is None) else None
+        stages = {}
+        
+        # 1. ML: uma matriz para o lote (o TextView é reaproveitado quando o texto é o mesmo),
+        #    scaler/PCA/K-Means/IsolationForest numa passada só
+        def ml_branch():
+            return self.ml_scorer.predict_scores(extract_features_matrix(docs, views))
+        
+        # 2. Rule-Based: extração em lote + rubric vetorizado
+        def rb_branch():
+            feats = features_list
+            if feats is None:
+                feats = build_features_batch(
+                    docs, batch_size=batch_size, n_process=n_process, require=require, views=views,
+                    store=store, parallel=self.parallel, timings=stages,
+                )
+            return evaluate_features_batch(feats, require)
+        
+        t0 = time.perf_counter()
+        branches, timings = run_parallel({"ml": ml_branch, "rule_based": rb_branch}, parallel=self.parallel)
+        timings = self._timings(timings, stages, t0)
+        
+        results = []
+        for doc, (ml_score, ml_meta), rb_result in zip(docs, branches["ml"], branches["rule_based"]):
+            result = self._combine(doc, ml_score, ml_meta, rb_result)
+            result['timings'] = timings  # do lote inteiro
+            result['degraded'] = self._degraded(rb_result)
+            results.append(result)
+        return results
+    
+    @staticmethod
+    def _degraded(rb_result: Dict, deadline: Deadline = None) -> List[str]:
+        """Etapas degradadas: as do orçamento desta chamada e as das features recebidas (ex.: do store)."""
+        degraded = list(deadline.degraded) if deadline is not None else []
+        for stage in rb_result.get('features', {}).get('degraded') or []:
+            if stage not in degraded:
+                degraded.append(stage)
+        return degraded
+    
+    def _timings(self, branches: Dict[str, float], stages: Dict[str, float], t0: float) -> Dict:
+        """Tempos em ms: por ramo, por etapa da extração rule-based e total."""
+        return {
+            **branches,
+            "rule_based_stages": stages,
+            "total": round((time.perf_counter() - t0) * 1000.0, 1),
+            "parallel": self.parallel,
+        }
+    
+    def _combine(self, doc: dict, ml_score: float, ml_meta: Dict, rb_result: Dict) -> Dict:
+        """Score híbrido a partir dos resultados ML e rule-based de um currículo."""
         rb_score = rb_result['scores']['final']
         rb_subscores = rb_result['scores']['by_block']
         
@@ -181,6 +296,14 @@ class HybridScorer:
         return '. '.join(explanation_parts) + '.'
 
 
+def get_hybrid_scorer(model_path: str = DEFAULT_MODEL_PATH) -> HybridScorer:
+    """Instância compartilhada do HybridScorer (API, web, CLI e GUI)."""
+    return registry.get_or_register(
+        f"hybrid_scorer:{model_path}",
+        lambda: HybridScorer(model_path)
+    )
+
+
 def main():
     """Exemplo de uso"""
     from app.db.mongo import get_db
@@ -189,7 +312,7 @@ def main():
     print("🎯 SISTEMA HÍBRIDO DE SCORING")
     print("="*80)
     
-    scorer = HybridScorer()
+    scorer = get_hybrid_scorer()
     
     # Carregar amostra
     db = get_db()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pool de threads compartilhado para etapas independentes do scoring.
+
+O ramo ML (scaler → PCA → KMeans → IsolationForest) e o rule-based (spaCy,
+DistilBERT, regex) não dependem um do outro, e dentro do rule-based o
+classificador, o spaCy e os embeddings também não. Torch, NumPy e boa parte do
+spaCy liberam o GIL, então rodar essas etapas em threads reduz a latência de
+uma requisição em hosts com vários núcleos.
+
+    results, timings = run_parallel({"ml": ramo_ml, "rule_based": ramo_rb})
+
+A última tarefa roda na thread de quem chamou e as demais no pool. Chamadas
+aninhadas feitas de dentro de um worker rodam em sequência: um worker nunca
+espera outro, então o pool não trava mesmo pequeno.
+
+Ative com SCORING_PARALLEL=1 (ou HybridScorer(parallel=True)); o tamanho do
+pool vem de SCORING_THREADS (padrão: min(4, núcleos)).
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from app.ml.model_registry import registry
+
+_worker = threading.local()
+
+
+def parallel_enabled() -> bool:
+    return os.getenv("SCORING_PARALLEL", "0").lower() in ("1", "true", "yes")
+
+
+def _mark_worker() -> None:
+    _worker.active = True
+
+
+def _load_pool() -> ThreadPoolExecutor:
+    threads = int(os.getenv("SCORING_THREADS", "0")) or min(4, os.cpu_count() or 1)
+    return ThreadPoolExecutor(max_workers=threads, thread_name_prefix="scoring",
+                              initializer=_mark_worker)
+
+
+registry.register("scoring_pool", _load_pool)
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    value = fn()
+    return value, (time.perf_counter() - t0) * 1000.0
+
+
+def run_parallel(tasks: Dict[str, Callable[[], Any]],
+                 parallel: bool = True) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Executa as tarefas {nome: função sem argumentos}.
+
+    Returns:
+        (resultados por nome, tempo de cada tarefa em ms)
+
+    Raises:
+        A primeira exceção das tarefas, depois que todas terminaram
+    """
+    names = list(tasks)
+    if not parallel or len(names) < 2 or getattr(_worker, "active", False):
+        results, timings = {}, {}
+        for name in names:
+            results[name], ms = _timed(tasks[name])
+            timings[name] = round(ms, 1)
+        return results, timings
+
+    pool = registry.get("scoring_pool")
+    futures = {name: pool.submit(_timed, tasks[name]) for name in names[:-1]}
+    outcomes = {}
+    try:
+        outcomes[names[-1]] = _timed(tasks[names[-1]])
+    finally:
+        # Espera todas antes de propagar erro: nenhuma tarefa fica rodando solta
+        for name, future in futures.items():
+            try:
+                outcomes[name] = future.result()
+            except Exception as e:
+                outcomes.setdefault("__error__", e)
+    if "__error__" in outcomes:
+        raise outcomes["__error__"]
+    return ({name: outcomes[name][0] for name in names},
+            {name: round(outcomes[name][1], 1) for name in names})
@@ -0,0 +1,169 @@
+# scoring/rubric.py
+"""
+Rubric ativo (versão, pesos e cutoffs) com troca a quente.
+
+Os valores de config.py são o padrão. Com RUBRIC_FILE apontando para um JSON
+versionado, o rubric passa a vir do arquivo e é recarregado quando ele muda
+(checagem de mtime a cada RUBRIC_WATCH_SECONDS, padrão 2s, na próxima chamada
+de get_rubric). Também dá para trocar pela API (POST /admin/rubric).
+
+A troca é atômica: get_rubric() devolve um objeto imutável e quem avalia pega
+uma referência no início (engine.evaluate, batch_engine), então uma avaliação
+nunca mistura pesos de duas versões. Modelos (spaCy, DistilBERT, ...) não são
+recarregados.
+
+Formato do arquivo:
+    {
+      "version": "rubric-v1.1.0",
+      "cutoffs": {"noexp": 40.0, "experienced": 50.0},
+      "weights": {
+        "experienced": {"skills": 0.25, "experience": 0.25, ...},
+        "noexp": {"skills": 0.22, "projects": 0.20, ...}
+      }
+    }
+A ordem das chaves em "weights" é a ordem da soma do score final.
+"""
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from .config import Agent, WEIGHTS, CUTOFFS, RUBRIC_VERSION
+from .subscores import SUBSCORE_FEATURES
+
+
+class RubricError(ValueError):
+    """Definição de rubric inválida (o rubric ativo não é trocado)."""
+
+
+class Rubric:
+    """Versão + pesos por agente + cutoffs, somente leitura."""
+
+    __slots__ = ("version", "weights", "cutoffs", "source")
+
+    def __init__(self, version: str, weights: Mapping, cutoffs: Mapping, source: str = "config.py"):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "weights", MappingProxyType(
+            {Agent(a): MappingProxyType(dict(w)) for a, w in weights.items()}))
+        object.__setattr__(self, "cutoffs", MappingProxyType(dict(cutoffs)))
+        object.__setattr__(self, "source", source)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Rubric é imutável")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "cutoffs": dict(self.cutoffs),
+            "weights": {a.value: dict(w) for a, w in self.weights.items()},
+            "source": self.source,
+        }
+
+
+def rubric_from_dict(data: Mapping, source: str = "dict") -> Rubric:
+    """Valida e monta um Rubric (levanta RubricError)."""
+    if not isinstance(data, Mapping):
+        raise RubricError("rubric deve ser um objeto JSON")
+    version = data.get("version")
+    if not version or not isinstance(version, str):
+        raise RubricError("'version' é obrigatório")
+
+    weights = data.get("weights") or {}
+    cutoffs = data.get("cutoffs") or {}
+    agents = {a.value for a in Agent}
+    if set(weights) != agents or set(cutoffs) != agents:
+        raise RubricError(f"'weights' e 'cutoffs' precisam de exatamente {sorted(agents)}")
+
+    for agent, w in weights.items():
+        unknown = set(w) - set(SUBSCORE_FEATURES)
+        if unknown:
+            raise RubricError(f"subscores desconhecidos em weights.{agent}: {sorted(unknown)}")
+        for name, value in w.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                raise RubricError(f"peso inválido weights.{agent}.{name}: {value!r}")
+    for agent, value in cutoffs.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0 <= value <= 100:
+            raise RubricError(f"cutoff inválido cutoffs.{agent}: {value!r}")
+
+    return Rubric(version, weights, cutoffs, source=source)
+
+
+def load_rubric_file(path: str) -> Rubric:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RubricError(f"não foi possível ler {path}: {e}") from e
+    return rubric_from_dict(data, source=path)
+
+
+DEFAULT_RUBRIC = Rubric(RUBRIC_VERSION, {a.value: w for a, w in WEIGHTS.items()}, CUTOFFS)
+
+_lock = threading.Lock()
+_current = DEFAULT_RUBRIC
+_file_mtime: Optional[float] = None
+_next_check = 0.0
+
+
+def _rubric_file() -> Optional[str]:
+    return os.getenv("RUBRIC_FILE") or None
+
+
+def _check_file() -> None:
+    """Recarrega RUBRIC_FILE se o mtime mudou (chamar com o lock)."""
+    global _current, _file_mtime
+    path = _rubric_file()
+    if not path:
+        return
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return
+    if mtime == _file_mtime:
+        return
+    _file_mtime = mtime
+    try:
+        rubric = load_rubric_file(path)
+    except RubricError as e:
+        # Arquivo inválido (ou meio escrito): mantém o rubric atual
+        print(f"⚠️  Rubric não recarregado: {e}")
+        return
+    if rubric.version != _current.version or rubric.to_dict() != _current.to_dict():
+        print(f"🔄 Rubric {rubric.version} carregado de {path}")
+    _current = rubric
+
+
+def get_rubric() -> Rubric:
+    """Rubric ativo (checa RUBRIC_FILE no máximo a cada RUBRIC_WATCH_SECONDS)."""
+    global _next_check
+    if _rubric_file():
+        now = time.monotonic()
+        if now >= _next_check:
+            with _lock:
+                if now >= _next_check:
+                    _check_file()
+                    _next_check = now + float(os.getenv("RUBRIC_WATCH_SECONDS", "2"))
+    return _current
+
+
+def set_rubric(rubric: Rubric) -> Rubric:
+    """Troca o rubric ativo deste processo; devolve o anterior."""
+    global _current
+    with _lock:
+        previous, _current = _current, rubric
+    print(f"🔄 Rubric {rubric.version} ativo ({rubric.source})")
+    return previous
+
+
+def reload_rubric() -> Rubric:
+    """Relê RUBRIC_FILE agora (levanta RubricError se inválido); sem arquivo, volta ao padrão."""
+    global _file_mtime, _next_check
+    path = _rubric_file()
+    rubric = load_rubric_file(path) if path else DEFAULT_RUBRIC
+    set_rubric(rubric)
+    with _lock:
+        _file_mtime = os.stat(path).st_mtime if path else None
+        _next_check = time.monotonic() + float(os.getenv("RUBRIC_WATCH_SECONDS", "2"))
+    return rubric
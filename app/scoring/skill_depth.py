@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Índice posicional para os bônus de profundidade de skills.
+
+Antes, cada skill rodava um regex "skill.*(\\d+) anos" sobre o texto inteiro e
+mais um find() para o contexto: com ~50 skills e linhas longas (PDF sem quebras)
+o custo ficava quadrático, com backtracking do ".*" em cada ocorrência.
+
+Aqui o texto é indexado uma vez:
+    - menções de anos ("5 anos", "3 years"): para cada linha, a posição do
+      último início possível de menção (o ".*" não atravessa quebra de linha);
+    - palavras de nível (sênior, expert, ...): posições ordenadas, indexadas
+      sob demanda por palavra.
+e cada skill é resolvida olhando só as suas ocorrências (busca em C) contra
+esse índice, com uma janela de ±50 caracteres para o contexto. O resultado é o
+mesmo dos regex antigos.
+"""
+import bisect
+import re
+from typing import Dict, Iterable, List, Union
+
+from app.nlp.text_view import TextView
+
+# \b(\d+)\s*(anos|years)\b  -> usado por subscores.score_skills
+YEARS_STRICT = re.compile(r"\b(\d+)\s*(anos|years)\b", re.I)
+# (\d+)\s*(anos?|years?)    -> usado por use_case.score_skills_with_depth
+YEARS_LOOSE = re.compile(r"(\d+)\s*(anos?|years?)", re.I)
+
+CONTEXT_RADIUS = 50
+
+
+class SkillDepthIndex:
+    """Índice de um texto para has_years_after() e has_context() em tempo linear."""
+
+    def __init__(self, text: Union[str, TextView]):
+        view = TextView.of(text)
+        self.lower = view.lower
+        if len(self.lower) == len(view.original):
+            self.line_offsets = view.line_offsets
+        else:
+            # lower() mudou o tamanho (ex.: "İ"): offsets precisam ser do texto em minúsculas
+            self.line_offsets = [0] + [m.end() for m in re.finditer("\n", self.lower)]
+        self._years: Dict[str, List[int]] = {}
+        self._keywords: Dict[str, List[int]] = {}
+
+    def _line_of(self, pos: int) -> int:
+        return bisect.bisect_right(self.line_offsets, pos) - 1
+
+    def _last_year_start(self, strict: bool) -> List[int]:
+        """Por linha: maior posição onde uma menção de anos pode começar (-1 se nenhuma)."""
+        key = "strict" if strict else "loose"
+        last = self._years.get(key)
+        if last is None:
+            last = [-1] * len(self.line_offsets)
+            for m in (YEARS_STRICT if strict else YEARS_LOOSE).finditer(self.lower):
+                # No padrão solto o \d+ pode começar em qualquer dígito da sequência
+                start = m.start() if strict else m.end(1) - 1
+                line = self._line_of(m.start())
+                if start > last[line]:
+                    last[line] = start
+            self._years[key] = last
+        return last
+
+    def _keyword_starts(self, keyword: str) -> List[int]:
+        starts = self._keywords.get(keyword)
+        if starts is None:
+            starts = []
+            find = self.lower.find
+            pos = find(keyword)
+            while pos >= 0:
+                starts.append(pos)
+                pos = find(keyword, pos + 1)
+            self._keywords[keyword] = starts
+        return starts
+
+    def has_years_after(self, skill: str, strict: bool = True) -> bool:
+        """
+        Equivale a re.search(rf"{skill}.*<menção de anos>", text, re.I): alguma
+        ocorrência da skill seguida, na mesma linha, de uma menção de anos.
+        """
+        needle = skill.lower()
+        if not needle:
+            return False
+        last = self._last_year_start(strict)
+        find = self.lower.find
+        offsets = self.line_offsets
+        pos = find(needle)
+        while pos >= 0:
+            line = self._line_of(pos)
+            # a primeira ocorrência da linha é a melhor candidata: testa e pula para a próxima linha
+            if pos + len(needle) <= last[line]:
+                return True
+            if line + 1 >= len(offsets):
+                break
+            pos = find(needle, offsets[line + 1])
+        return False
+
+    def has_context(self, skill: str, keywords: Iterable[str], radius: int = CONTEXT_RADIUS,
+                    missing_at_start: bool = False) -> bool:
+        """
+        Alguma palavra de `keywords` inteira dentro de text[pos-radius : pos+radius],
+        com pos = primeira ocorrência da skill.
+
+        Skill ausente retorna False; com missing_at_start=True reproduz o fatiamento
+        de score_skills_with_depth (pos = -1 vira a janela text[0 : radius-1]).
+        """
+        pos = self.lower.find(skill.lower())
+        if pos < 0 and not missing_at_start:
+            return False
+        lo = max(0, pos - radius)
+        hi = min(len(self.lower), max(0, pos + radius))
+        for kw in keywords:
+            starts = self._keyword_starts(kw)
+            i = bisect.bisect_left(starts, lo)
+            if i < len(starts) and starts[i] + len(kw) <= hi:
+                return True
+        return False
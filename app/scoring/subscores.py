@@ -2,8 +2,45 @@
 
 import re, numpy as np
 
+from app.scoring.skill_depth import SkillDepthIndex
+
 def clamp(x, a=0.0, b=1.0): return max(a, min(b, x))
 
+# Features (chaves de build_features_from_doc) de que cada subscore depende.
+# build_features_from_doc só extrai as dos subscores com peso > 0 no agente.
+SUBSCORE_FEATURES = {
+    "skills":      ("skills", "text"),
+    "experience":  ("years_total", "seniority_align"),
+    "projects":    ("project_hits",),
+    "certs":       ("cert_points",),
+    "impact":      ("metrics_hits",),
+    "semantic":    ("cosine",),
+    "doc_quality": ("tokens", "sections_present", "dup_rate"),
+    "contact":     ("has_email", "has_phone"),
+    "context":     ("remote_align", "comp_score"),
+}
+
+# Valores neutros usados no lugar de features não extraídas (sem vaga)
+FEATURE_DEFAULTS = {
+    "remote_align": 0.5,
+    "comp_score": None,
+}
+
+def skill_depth_bonus(cv_skills, text="") -> float:
+    """Bônus de profundidade do fallback sem vaga (anos e contexto avançado por skill)."""
+    depth = 0.0
+    if text:
+        index = SkillDepthIndex(text)
+        for s in set(map(str.lower, cv_skills or [])):
+            # Bonus por mencionar anos com skills
+            if index.has_years_after(s):
+                depth += 0.03
+            
+            # Bonus por contexto avançado
+            if index.has_context(s, ["avançado", "expert", "sênior", "senior"]):
+                depth += 0.02
+    return depth
+
 def score_skills(cv_skills, must=None, nice=None, text="", use_depth=True):
     cv = set(map(str.lower, cv_skills or []))
     m = set(map(str.lower, must or []))
@@ -12,21 +49,7 @@ def score_skills(cv_skills, must=None, nice=None, text="", use_depth=True):
     # Caso não exista vaga/role (must/nice vazios), usar fallback por quantidade de skills.
     if not m and not n:
         count_norm = min(len(cv)/12.0, 1.0)
-        depth = 0.0
-        
-        if use_depth and text:
-            # Bonus por mencionar anos com skills
-            for s in cv:
-                if re.search(rf"{re.escape(s)}.*\b(\d+)\s*(anos|years)\b", text, flags=re.I):
-                    depth += 0.03
-                
-                # Bonus por contexto avançado
-                skill_pos = text.lower().find(s.lower())
-                if skill_pos >= 0:
-                    skill_context = text[max(0, skill_pos-50):skill_pos+50]
-                    if any(kw in skill_context.lower() for kw in ["avançado", "expert", "sênior", "senior"]):
-                        depth += 0.02
-        
+        depth = skill_depth_bonus(cv_skills, text) if use_depth else 0.0
         return clamp(count_norm + depth)
 
     hard = len(cv & m) / len(m) if m else 0.0
@@ -34,8 +57,9 @@ def score_skills(cv_skills, must=None, nice=None, text="", use_depth=True):
     depth = 0.0
     
     if use_depth and text:
+        index = SkillDepthIndex(text)
         for s in cv & (m | n):
-            if re.search(rf"{re.escape(s)}.*\b(\d+)\s*(anos|years)\b", text, flags=re.I):
+            if index.has_years_after(s):
                 depth += 0.05
     
     return clamp(2*hard + soft + depth)
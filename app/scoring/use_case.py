@@ -1,126 +1,56 @@
 import re
+import time
+from collections import namedtuple
+from typing import TYPE_CHECKING, Iterable
 from .config import Agent
-from .engine import evaluate
-from app.nlp.spacy_nlp import analyze
-from app.ml.predict import ResumeClassifier
-from app.ml.semantic_similarity import compute_semantic_similarity
+from .engine import evaluate, active_subscores
+from .rubric import Rubric, get_rubric
+from app.nlp.spacy_nlp import analyze, analyze_batch, analyze_lite, SCORING_PROFILE
+from app.nlp.text_scanner import extract_email, extract_phone  # noqa: F401 (compat)
+from app.nlp.certifications import scan_certs, extract_cert_points  # noqa: F401 (compat)
+from app.nlp.text_view import TextView
+from .skill_depth import SkillDepthIndex
+from app.ml.semantic_similarity import compute_semantic_similarity, compute_semantic_similarity_batch
+from app.ml.model_registry import registry, ModelLoadError
+from .parallel import run_parallel
+from .budget import Deadline, STAGES, observe
 from .subscores import (
     score_skills, score_experience, score_projects, score_certs,
-    score_impact, score_semantic, score_doc_quality, score_contact, score_context
+    score_impact, score_semantic, score_doc_quality, score_contact, score_context,
+    SUBSCORE_FEATURES, FEATURE_DEFAULTS,
 )
 
-# Classificador híbrido global (carregado uma vez)
-_CLASSIFIER = None
-
-def get_classifier() -> ResumeClassifier:
-    """Retorna instância singleton do classificador híbrido."""
-    global _CLASSIFIER
-    if _CLASSIFIER is None:
-        try:
-            _CLASSIFIER = ResumeClassifier(
-                model_path="models/resume_classifier/run-2025-11-18-balanced",
-                use_hybrid=True,
-                years_threshold=2.0,
-                confidence_threshold=0.85
-            )
-            print("✅ Classificador híbrido carregado com sucesso")
-        except Exception as e:
-            print(f"⚠️  Erro ao carregar classificador: {e}")
-            print("   Sistema continuará usando detecção baseada em regras")
-            _CLASSIFIER = None
-    return _CLASSIFIER
-
-CERT_MAP = {
-    # Certificações de Cloud/TI (EN)
-    r"\bAWS\s*(CCP|Cloud Practitioner)\b": 0.3,
-    r"\bAWS\s*(SAA|Solutions Architect Associate)\b": 0.5,
-    r"\bAZ-900\b": 0.3,
-    r"\bDP-203\b": 0.5,
-    r"\bSecurity\+\b": 0.4,
-    
-    # Marketing Digital (PT-BR)
-    r"\bGoogle\s*Ads\s*(Certification|Certificação)\b": 0.4,
-    r"\bGoogle\s*Analytics\s*(Certification|Certificação|4|GA4)\b": 0.4,
-    r"\bGoogle\s*Skillshop\b": 0.3,
-    r"\bFacebook\s*(Blueprint|Ads|Marketing)\s*(Certification|Certificação)\b": 0.4,
-    r"\bMeta\s*(Blueprint|Ads)\s*(Certification|Certificação)\b": 0.4,
-    r"\b(Inbound|Content)\s*Marketing\s*(Certification|Certificação)\b": 0.3,
-    r"\bHubSpot\s*(Certification|Certificação|Academy)\b": 0.4,
-    r"\bRD\s*Station\s*(Certification|Certificação)\b": 0.3,
-    
-    # Design (PT-BR + EN)
-    r"\bAdobe\s*(Certified|Certificado)\b": 0.4,
-    r"\b(UX|UI)\s*Design\s*(Certification|Certificação)\b": 0.4,
-    r"\bFigma\s*(Certification|Certificação)\b": 0.3,
-    
-    # Gestão de Projetos (PT-BR + EN)
-    r"\bPMP\b": 0.5,
-    r"\bPMBOK\b": 0.4,
-    r"\bScrum\s*Master\s*(Certification|Certificação|PSM|CSM)\b": 0.4,
-    r"\bProduct\s*Owner\s*(Certification|Certificação|PSPO|CSPO)\b": 0.4,
-    r"\bPrince2\b": 0.4,
-    r"\bCobit\b": 0.4,
-    r"\bItil\b": 0.4,
-    
-    # Finanças/Contabilidade (PT-BR)
-    r"\bCRC\b": 0.4,  # Conselho Regional de Contabilidade
-    r"\bCPA\b": 0.5,
-    r"\bCFA\b": 0.5,
-    r"\bCertificação\s*(CPA|Anbima)\b": 0.4,
-    
-    # Idiomas (PT-BR + EN)
-    r"\b(TOEFL|IELTS|Cambridge|TOEIC)\b": 0.3,
-    r"\b(Fluente|Fluent|Avançado|Advanced)\s*(em|in)\s*(inglês|espanhol|english|spanish)\b": 0.2,
-    
-    # Genéricos (PT-BR + EN) - menor pontuação
-    r"\b(Certificação|Certificado|Certificate|Certification)\s+(em|de|in)\b": 0.15,
-    r"\b(Curso|Course)\s+(de|em|in)\s+\w+": 0.1,
-}
+if TYPE_CHECKING:
+    from app.ml.predict import ResumeClassifier
 
-def extract_cert_points(text: str) -> float:
-    """Extrai pontos de certificações (PT-BR + EN)."""
-    if not text: return 0.0
-    
-    pts = 0.0
-    text_lower = text.lower()
-    
-    # 1. Certificações específicas do CERT_MAP
-    for pat, val in CERT_MAP.items():
-        matches = re.findall(pat, text, flags=re.I)
-        pts += len(matches) * val
-    
-    # 2. Detecção genérica de seções de certificação
-    has_cert_section = any(keyword in text_lower for keyword in [
-        "certificações", "certificados", "cursos", "certifications", 
-        "certificates", "courses", "formação complementar", "treinamentos"
-    ])
-    
-    if has_cert_section:
-        # Contar linhas com padrões de certificação (mais agressivo)
-        cert_patterns = [
-            r"[-–—•]\s*.+?(certificação|certificado|certificate|curso|course|treinamento)",
-            r"^\s*.+?\s*[-–—]\s*.+?(google|meta|facebook|aws|azure|microsoft|adobe|ibm|oracle|salesforce)",
-            r"\d{4}\s*[-–—]\s*.+?(certificação|certificado|certificate|curso|course)",
-            r"^\s*\d+\.\s*.+?(certificação|certificado|curso|course)",  # Listas numeradas
-            r"^\s*•\s*.+?(certificação|certificado|curso|course)",  # Bullets
-        ]
-        
-        cert_count = 0
-        for pattern in cert_patterns:
-            matches = re.findall(pattern, text_lower, re.MULTILINE)
-            cert_count += len(matches)
-        
-        # Cada certificação vale 0.2 pontos (5 certificações = 1.0)
-        pts += cert_count * 0.2
-    
-    # 3. Bonus por plataformas conhecidas mencionadas
-    platforms = ["coursera", "udemy", "alura", "rocketseat", "dio", "edx", 
-                 "linkedin learning", "pluralsight", "udacity", "skillshare"]
-    for platform in platforms:
-        if platform in text_lower:
-            pts += 0.1
-    
-    return min(pts, 1.0)  # Cap em 1.0
+_CLASSIFIER_PATH = "models/resume_classifier/run-2025-11-18-balanced"
+
+def _load_classifier() -> "ResumeClassifier":
+    # Import tardio: torch/transformers só quando o classificador é usado
+    from app.ml.predict import ResumeClassifier
+
+    try:
+        classifier = ResumeClassifier(
+            model_path=_CLASSIFIER_PATH,
+            use_hybrid=True,
+            years_threshold=2.0,
+            confidence_threshold=0.85
+        )
+    except Exception as e:
+        print(f"⚠️  Erro ao carregar classificador: {e}")
+        print("   Sistema continuará usando detecção baseada em regras")
+        raise
+    print("✅ Classificador híbrido carregado com sucesso")
+    return classifier
+
+registry.register("resume_classifier", _load_classifier)
+
+def get_classifier() -> "ResumeClassifier":
+    """Retorna instância única do classificador híbrido (None se falhou ao carregar)."""
+    try:
+        return registry.get("resume_classifier")
+    except ModelLoadError:
+        return None
 
 def extract_years_total(text: str) -> float:
     """Extrai anos de experiência com suporte a padrões PT-BR e EN.
@@ -173,8 +103,8 @@ def extract_years_total(text: str) -> float:
     
     return min(yrs, 20.0)  # Cap em 20 anos para evitar outliers
 
-def extract_seniority_align(text: str, agent: Agent) -> float:
-    t = text.lower() if text else ""
+def extract_seniority_align(text, agent: Agent) -> float:
+    t = TextView.of(text).lower
     has_jr  = any(w in t for w in ["estagi", "trainee", "júnior", "junior"])
     has_pl  = "pleno" in t
     has_sr  = any(w in t for w in ["sênior", "senior", "sr"])
@@ -182,8 +112,8 @@ def extract_seniority_align(text: str, agent: Agent) -> float:
         return 1.0 if has_jr and not (has_pl or has_sr) else 0.6
     return 1.0 if (has_pl or has_sr) else (0.6 if has_jr else 0.7)
 
-def extract_projects_hits(text: str) -> int:
-    t = text.lower() if text else ""
+def extract_projects_hits(text) -> int:
+    t = TextView.of(text).lower
     return sum(1 for k in ["github.com", "gitlab.com", "kaggle.com", "portfólio", "portfolio", "projeto"] if k in t)
 
 def extract_metrics_hits(text: str) -> int:
@@ -214,13 +144,13 @@ def extract_metrics_hits(text: str) -> int:
     
     return min(hits, 12)  # Cap para evitar inflação
 
-def score_skills_with_depth(cv_skills: list, text: str, skill_weights: dict = None) -> float:
+def score_skills_with_depth(cv_skills: list, text, skill_weights: dict = None) -> float:
     """
     Score de skills ponderado por relevância e profundidade.
     
     Args:
         cv_skills: Lista de skills identificadas
-        text: Texto do currículo
+        text: Texto do currículo (str ou TextView)
         skill_weights: Dict com peso de cada skill (opcional)
     
     Returns:
@@ -231,23 +161,18 @@ def score_skills_with_depth(cv_skills: list, text: str, skill_weights: dict = No
     
     total_score = 0.0
     skill_weights = skill_weights or {}
+    index = SkillDepthIndex(text)
+    advanced_keywords = ["avançado", "expert", "especialista", "sênior", "senior", "proficiente"]
     
     for skill in cv_skills:
         # Peso base da skill (padrão: 1.0)
         weight = skill_weights.get(skill.lower(), 1.0)
         
         # Bonus por mencionar anos de experiência com a skill
-        years_match = re.search(
-            rf"{re.escape(skill)}.*?(\d+)\s*(anos?|years?)",
-            text,
-            flags=re.I
-        )
-        years_bonus = 0.3 if years_match else 0.0
+        years_bonus = 0.3 if index.has_years_after(skill, strict=False) else 0.0
         
         # Bonus por contexto avançado
-        skill_context = text[max(0, text.lower().find(skill.lower())-50):text.lower().find(skill.lower())+50]
-        advanced_keywords = ["avançado", "expert", "especialista", "sênior", "senior", "proficiente"]
-        context_bonus = 0.2 if any(kw in skill_context.lower() for kw in advanced_keywords) else 0.0
+        context_bonus = 0.2 if index.has_context(skill, advanced_keywords, missing_at_start=True) else 0.0
         
         skill_score = weight * (1.0 + years_bonus + context_bonus)
         total_score += skill_score
@@ -255,158 +180,360 @@ def score_skills_with_depth(cv_skills: list, text: str, skill_weights: dict = No
     # Normalizar por número ideal de skills (12)
     return min(total_score / 12.0, 1.0)
 
-def tokens_count(text: str) -> int:
-    return len(text.split()) if text else 0
+def tokens_count(text) -> int:
+    return len(TextView.of(text).tokens)
 
-def sections_present_count(text: str) -> int:
-    t = text.lower() if text else ""
+def sections_present_count(text) -> int:
+    t = TextView.of(text).lower
     keys = ["experiência", "experiencia", "education", "formação", "formacao", "projetos", "projects", "skills", "habilidades"]
     return min(4, sum(1 for k in ["experiência|experiencia","formação|formacao|education","projetos|projects","skills|habilidades"] if re.search(k, t)))
 
-def dup_rate_trigram(text: str) -> float:
+def dup_rate_trigram(text) -> float:
     if not text: return 0.0
-    toks = text.lower().split()
+    toks = TextView.of(text).lower_tokens
     if len(toks) < 10: return 0.0
     tri = [" ".join(toks[i:i+3]) for i in range(len(toks)-2)]
     total = len(tri)
     uniq = len(set(tri))
     return max(0.0, (total - uniq)/total)
 
-def extract_email(text: str) -> bool:
-    """Detecta se há email no texto."""
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    return bool(re.search(email_pattern, text))
-
-def extract_phone(text: str) -> bool:
-    """Detecta se há telefone no texto (formatos brasileiros)."""
-    phone_patterns = [
-        r'\(\d{2}\)\s*\d{4,5}-?\d{4}',  # (11) 98765-4321 ou (11) 8765-4321
-        r'\d{2}\s*\d{4,5}-?\d{4}',       # 11 98765-4321
-        r'\+55\s*\d{2}\s*\d{4,5}-?\d{4}', # +55 11 98765-4321
-    ]
-    return any(re.search(pattern, text) for pattern in phone_patterns)
+def doc_text(doc: dict) -> str:
+    """Texto usado na extração: description_clean ou resume_text_clean."""
+    return (doc.get("description_clean") or doc.get("resume_text_clean") or "").strip()
+
+# Features sempre extraídas: definem o agente e alimentam o feature store
+BASE_FEATURES = ("text", "skills", "years_total", "has_experience", "classification")
+
+# Contexto passado aos extratores sob demanda
+_FeatureContext = namedtuple("_FeatureContext", "doc text view sp agent")
 
-def build_features_from_doc(doc: dict, has_experience: bool = None) -> dict:
+# Extratores por feature (a ordem aqui é a ordem das chaves no dict de features)
+_FEATURE_EXTRACTORS = {
+    "seniority_align":    lambda c: extract_seniority_align(c.view, c.agent),
+    "project_hits":       lambda c: c.sp.get("project_hits", 0),  # ✅ Usar detecção do spaCy
+    "cert_points":        lambda c: max(scan_certs(c.view).points, 0.2 if c.sp["certs"] else 0.0),  # pequeno boost
+    "metrics_hits":       lambda c: extract_metrics_hits(c.text),
+    "tokens":             lambda c: c.sp["tokens"],
+    "sections_present":   lambda c: c.sp.get("sections_count", 0),  # ✅ Usar detecção melhorada do spaCy
+    "dup_rate":           lambda c: dup_rate_trigram(c.view),
+    "has_email":          lambda c: c.sp.get("has_email", False),  # ✅ Usar detecção do spaCy
+    "has_phone":          lambda c: c.sp.get("has_phone", False),  # ✅ Usar detecção do spaCy
+    "cosine":             lambda c: compute_semantic_similarity(c.text, c.doc.get("job_description")),  # MODELO FINE-TUNED
+    "remote_align":       lambda c: FEATURE_DEFAULTS["remote_align"],
+    "comp_score":         lambda c: FEATURE_DEFAULTS["comp_score"],
+    "career_progression": lambda c: any(w in c.view.lower for w in ["jr","júnior","junior"]) and any(w in c.view.lower for w in ["pleno","sênior","senior"]),
+}
+
+def required_features(agent: Agent, require: Iterable[str] = ()) -> set:
     """
-    Extrai features do documento. Se has_experience=None, usa classificador ML.
-    
-    Args:
-        doc: Documento do currículo
-        has_experience: True/False para forçar classificação, None para usar ML
+    Features necessárias para o agente.
     
-    Returns:
-        Dict com features extraídas + classificação de experiência
+    `require` aceita nomes de subscores (ex.: "semantic") e de features
+    (ex.: "cosine", "career_progression") que devem ser extraídos mesmo com peso zero.
     """
-    text = (doc.get("description_clean") or doc.get("resume_text_clean") or "").strip()
-    sp = analyze(text)  # ← usa spaCy aqui
+    require = set(require or ())
+    names = set(BASE_FEATURES)
+    for sub in active_subscores(agent, require):
+        names.update(SUBSCORE_FEATURES[sub])
+    names.update(r for r in require if r in _FEATURE_EXTRACTORS)
+    return names
 
-    skills = sorted(set((doc.get("skills") or []) + sp["skills"]))
-    tokens = sp["tokens"]
-    years  = doc.get("years_experience") or extract_years_total(text)
-    
-    # Extrair contatos
-    has_email = extract_email(text)
-    has_phone = extract_phone(text)
-    
-    # Classificação de experiência
-    if has_experience is None:
-        # Usar classificador híbrido ML
-        classifier = get_classifier()
-        if classifier:
-            try:
-                result = classifier.predict(
-                    text=text,
-                    years_experience=years,
-                    return_details=True
-                )
-                has_experience = result["prediction"] == 1
-                classification_info = {
-                    "ml_used": True,
-                    "method": result["method"],
-                    "confidence": result["confidence"],
-                    "reason": result.get("reason", "")
-                }
-            except Exception as e:
-                print(f"⚠️  Erro na classificação ML: {e}")
-                # Fallback: regra simples
-                has_experience = years >= 2.0
-                classification_info = {
-                    "ml_used": False,
-                    "method": "rule_fallback",
-                    "confidence": 1.0,
-                    "reason": f"ML error, using years >= 2.0"
-                }
-        else:
-            # Fallback: regra simples se ML não disponível
-            has_experience = years >= 2.0
-            classification_info = {
-                "ml_used": False,
-                "method": "rule_only",
-                "confidence": 1.0,
-                "reason": "ML classifier not available"
-            }
-    else:
+def _classify(text: str, years: float, has_experience: bool = None):
+    """(has_experience, classification_info) de um currículo."""
+    if has_experience is not None:
         # Classificação manual fornecida
-        classification_info = {
+        return has_experience, {
             "ml_used": False,
             "method": "manual",
             "confidence": 1.0,
             "reason": "manually specified"
         }
 
-    return {
+    # Usar classificador híbrido ML
+    classifier = get_classifier()
+    if not classifier:
+        # Fallback: regra simples se ML não disponível
+        return _classify_rule(years, "rule_only", "ML classifier not available")
+    try:
+        result = classifier.predict(
+            text=text,
+            years_experience=years,
+            return_details=True
+        )
+    except Exception as e:
+        print(f"⚠️  Erro na classificação ML: {e}")
+        # Fallback: regra simples
+        return _classify_rule(years, "rule_fallback", f"ML error, using years >= 2.0")
+    return _classification_from(result)
+
+def _classify_rule(years: float, method: str, reason: str):
+    return years >= 2.0, {
+        "ml_used": False,
+        "method": method,
+        "confidence": 1.0,
+        "reason": reason
+    }
+
+def _classification_from(result: dict):
+    return result["prediction"] == 1, {
+        "ml_used": True,
+        "method": result["method"],
+        "confidence": result["confidence"],
+        "reason": result.get("reason", "")
+    }
+
+def _classify_batch(texts: list, years_list: list) -> list:
+    """_classify(..., None) para vários currículos, com o DistilBERT em lotes."""
+    classifier = get_classifier()
+    if not classifier or not texts:
+        return [_classify(t, y) for t, y in zip(texts, years_list)]
+    try:
+        results = classifier.predict_many(texts, years_list)
+    except Exception as e:
+        print(f"⚠️  Erro na classificação ML: {e}")
+        return [_classify_rule(y, "rule_fallback", f"ML error, using years >= 2.0") for y in years_list]
+    return [_classification_from(r) for r in results]
+
+def _assemble_features(doc: dict, text: str, view: TextView, sp: dict, years: float, has_experience: bool,
+                       classification_info: dict, require: Iterable[str] = (), precomputed: dict = None) -> dict:
+    """Dict de features: base + as exigidas pelo rubric para o agente (ver required_features)."""
+    skills = sorted(set((doc.get("skills") or []) + sp["skills"]))
+    agent = Agent.EXPERIENCED if has_experience else Agent.NOEXP
+    wanted = required_features(agent, require)
+    ctx = _FeatureContext(doc, text, view, sp, agent)
+    precomputed = precomputed or {}
+
+    features = {
         "text": text,
         "skills": skills,
         "years_total": years,
         "has_experience": has_experience,
         "classification": classification_info,
-        "seniority_align": extract_seniority_align(text, Agent.EXPERIENCED if has_experience else Agent.NOEXP),
-        "project_hits": sp.get("project_hits", 0),  # ✅ Usar detecção do spaCy
-        "cert_points": max(extract_cert_points(text), 0.2 if sp["certs"] else 0.0),  # pequeno boost
-        "metrics_hits": extract_metrics_hits(text),
-        "tokens": tokens,
-        "sections_present": sp.get("sections_count", 0),  # ✅ Usar detecção melhorada do spaCy
-        "dup_rate": dup_rate_trigram(text),
-        "has_email": sp.get("has_email", False),  # ✅ Usar detecção do spaCy
-        "has_phone": sp.get("has_phone", False),  # ✅ Usar detecção do spaCy
-        "cosine": compute_semantic_similarity(text, doc.get("job_description")),  # MODELO FINE-TUNED
-        "remote_align": 0.5, 
-        "comp_score": None,
-        "career_progression": any(w in text.lower() for w in ["jr","júnior","junior"]) and any(w in text.lower() for w in ["pleno","sênior","senior"]),
     }
+    for name, extract in _FEATURE_EXTRACTORS.items():
+        if name in wanted:
+            features[name] = precomputed[name] if name in precomputed else extract(ctx)
+    return features
+
+def _doc_years(doc: dict, text: str) -> float:
+    return doc.get("years_experience") or extract_years_total(text)
+
+def build_features_from_doc(doc: dict, has_experience: bool = None, analysis: dict = None,
+                            use_cache: bool = True, store=None, require: Iterable[str] = (),
+                            parallel: bool = False, timings: dict = None, deadline=None) -> dict:
+    """
+    Extrai features do documento. Se has_experience=None, usa classificador ML.
+    
+    Só são extraídas as features dos subscores com peso > 0 para o agente
+    detectado (ver required_features); as demais ficam fora do dict.
+    
+    Args:
+        doc: Documento do currículo
+        has_experience: True/False para forçar classificação, None para usar ML
+        analysis: Resultado de analyze() já calculado (ex.: via analyze_batch)
+        use_cache: Reaproveita a análise NLP do mesmo texto (cache por hash do conteúdo)
+        store: FeatureStore consultado antes de extrair (ver get_feature_store)
+        require: Subscores/features extras a extrair mesmo com peso zero
+        parallel: Classificador, embeddings e spaCy concorrentes (ver build_features_batch)
+        timings: Dict preenchido com o tempo de cada etapa em ms
+        deadline: Orçamento em ms ou Deadline (ver build_features_batch)
+    
+    Returns:
+        Dict com features extraídas + classificação de experiência
+    """
+    if (store is not None or parallel or timings is not None or deadline is not None) and analysis is None:
+        return build_features_batch([doc], [has_experience], use_cache=use_cache, store=store,
+                                    require=require, parallel=parallel, timings=timings,
+                                    deadline=deadline)[0]
+
+    text = doc_text(doc)
+    view = TextView(text)  # formas derivadas do texto (minúsculas, tokens...) compartilhadas pelos extratores
+    if analysis is not None:
+        sp = analysis
+    else:
+        sp = analyze(text, profile=SCORING_PROFILE, use_cache=use_cache)  # ← usa spaCy aqui (ou o cache)
+
+    years = _doc_years(doc, text)
+    # Classificação de experiência
+    has_experience, classification_info = _classify(text, years, has_experience)
+    return _assemble_features(doc, text, view, sp, years, has_experience, classification_info, require)
+
+def build_features_batch(docs: list, has_experience=None, batch_size: int = 64, n_process: int = 1,
+                         use_cache: bool = True, store=None, require: Iterable[str] = (),
+                         views: list = None, parallel: bool = False, timings: dict = None,
+                         deadline=None) -> list:
+    """
+    Versão em lote de build_features_from_doc: spaCy (nlp.pipe), classificador
+    DistilBERT e embeddings semânticos rodam uma vez para o lote inteiro.
+    Com parallel=True essas etapas rodam ao mesmo tempo no pool de scoring.
+    
+    Args:
+        docs: Lista de documentos
+        has_experience: None/True/False para todos, ou lista com um valor por documento
+        batch_size: Textos por lote do spaCy
+        n_process: Processos do spaCy
+        use_cache: Textos já analisados (mesmo hash) não passam de novo pelo spaCy
+        store: FeatureStore; documentos já guardados não são extraídos de novo
+               e os extraídos agora são gravados
+        require: Subscores/features extras a extrair mesmo com peso zero
+        views: TextView de cada documento (texto de doc_text), se o chamador já tiver
+        parallel: Classificador, embeddings e spaCy concorrentes (ver app.scoring.parallel)
+        timings: Dict preenchido com o tempo de cada etapa em ms (nlp, classifier, ...)
+        deadline: Orçamento em ms ou Deadline; etapas caras que não cabem usam o
+                  fallback e ficam listadas em features["degraded"]
+    
+    Returns:
+        Lista de dicts de features, na ordem de entrada
+    """
+    docs = list(docs)
+    if isinstance(has_experience, (list, tuple)):
+        flags = list(has_experience)
+    else:
+        flags = [has_experience] * len(docs)
+
+    results = store.get_many(docs, flags) if store is not None else [None] * len(docs)
+    # Entrada guardada sem alguma feature exigida agora (pesos/require mudaram) é extraída de novo
+    todo = [i for i, feats in enumerate(results)
+            if feats is None or not _has_required(feats, require)]
+    if not todo:
+        return results
+
+    texts = [doc_text(docs[i]) for i in todo]
+    todo_views = [views[i] for i in todo] if views is not None else [TextView(t) for t in texts]
+    years = [_doc_years(docs[i], t) for i, t in zip(todo, texts)]
+    auto = [k for k, i in enumerate(todo) if flags[i] is None]
+    # Semântica pedida pelos dois agentes não depende da classificação
+    cosine_for = {exp: "cosine" in required_features(Agent.EXPERIENCED if exp else Agent.NOEXP, require)
+                  for exp in (True, False)}
+
+    def semantic_batch(ks):
+        return compute_semantic_similarity_batch([texts[k] for k in ks],
+                                                 [docs[todo[k]].get("job_description") for k in ks])
+
+    # Orçamento de latência: etapas que não cabem usam o fallback (ver app.scoring.budget)
+    deadline = Deadline.of(deadline)
+    run, skipped = set(STAGES), []
+    if deadline is not None:
+        needed = (["classifier"] if auto else []) + (["semantic"] if any(cosine_for.values()) else []) + ["nlp"]
+        run = deadline.plan(needed, n_docs=len(todo), concurrent=parallel)
+        skipped = [stage for stage in needed if stage not in run]
+
+    # Etapas independentes: classificador, embeddings e spaCy (concorrentes com parallel=True)
+    tasks = {}
+    if auto and "classifier" in run:
+        tasks["classifier"] = lambda: _classify_batch([texts[k] for k in auto], [years[k] for k in auto])
+    if cosine_for[True] and cosine_for[False] and "semantic" in run:
+        tasks["semantic"] = lambda: semantic_batch(range(len(todo)))
+    if "nlp" in run:
+        tasks["nlp"] = lambda: analyze_batch(texts, batch_size=batch_size, n_process=n_process,
+                                             profile=SCORING_PROFILE, use_cache=use_cache)
+    staged, stage_ms = run_parallel(tasks, parallel=parallel)
+    analyses = staged["nlp"] if "nlp" in run else [analyze_lite(t) for t in texts]
+
+    # Classificação: manual por documento, ML em lote para os demais
+    classes = [None] * len(todo)
+    for k, i in enumerate(todo):
+        if flags[i] is not None:
+            classes[k] = _classify(texts[k], years[k], flags[i])
+    if "classifier" in run:
+        auto_classes = staged.get("classifier", ())
+    else:
+        auto_classes = [_classify_rule(years[k], "rule_deadline", "latency budget, using years >= 2.0")
+                        for k in auto]
+    for k, cls in zip(auto, auto_classes):
+        classes[k] = cls
+
+    # Similaridade semântica em lote, só para quem o rubric/require pede
+    precomputed = [{} for _ in todo]
+    if "semantic" in staged:
+        semantic, cosines = list(range(len(todo))), staged["semantic"]
+    else:
+        semantic = [k for k, (exp, _) in enumerate(classes) if cosine_for[bool(exp)]]
+        t0 = time.perf_counter()
+        if "semantic" not in run:
+            cosines = [0.0] * len(semantic)  # mesmo valor de quando o modelo não está disponível
+        elif semantic:
+            cosines = semantic_batch(semantic)
+            stage_ms["semantic"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        else:
+            cosines = []
+    for k, cos in zip(semantic, cosines):
+        precomputed[k]["cosine"] = cos
+
+    t0 = time.perf_counter()
+    for k, i in enumerate(todo):
+        exp, info = classes[k]
+        results[i] = _assemble_features(docs[i], texts[k], todo_views[k], analyses[k], years[k], exp, info,
+                                        require, precomputed[k])
+        if skipped:
+            results[i]["degraded"] = skipped
+    stage_ms["extractors"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    for stage, ms in stage_ms.items():
+        observe(stage, ms / len(todo))
+    if timings is not None:
+        timings.update(stage_ms)
+
+    if store is not None:
+        store.put_many([docs[i] for i in todo], [flags[i] for i in todo], [results[i] for i in todo])
+    return results
 
-def build_subscores(features: dict, agent: Agent) -> dict:
+def _has_required(features: dict, require: Iterable[str] = ()) -> bool:
+    agent = Agent.EXPERIENCED if features.get("has_experience") else Agent.NOEXP
+    return required_features(agent, require) <= features.keys()
+
+_SUBSCORES = {
+    "skills":      lambda f: score_skills(f.get("skills"), None, None, TextView.of(f.get("text",""))),
+    "experience":  lambda f: score_experience(f.get("years_total",0), f.get("seniority_align",0)),
+    "projects":    lambda f: score_projects(f.get("project_hits",0)),
+    "certs":       lambda f: score_certs(f.get("cert_points",0)),
+    "impact":      lambda f: score_impact(f.get("metrics_hits",0)),
+    "semantic":    lambda f: score_semantic(f.get("cosine",0)),
+    "doc_quality": lambda f: score_doc_quality(f.get("tokens",0), f.get("sections_present",0), f.get("dup_rate",0)),
+    "contact":     lambda f: score_contact(f.get("has_email",False), f.get("has_phone",False)),
+    "context":     lambda f: score_context(f.get("remote_align",0), f.get("comp_score")),
+}
+
+def build_subscores(features: dict, agent: Agent, require: Iterable[str] = (), rubric: Rubric = None) -> dict:
+    """
+    Subscores do agente. Os de peso zero (e não pedidos em `require`) não olham
+    as features: valem o subscore dos valores neutros (FEATURE_DEFAULTS).
+    """
+    active = active_subscores(agent, require, rubric)
     return {
-        "skills":      score_skills(features.get("skills"), None, None, features.get("text","")),
-        "experience":  score_experience(features.get("years_total",0), features.get("seniority_align",0)),
-        "projects":    score_projects(features.get("project_hits",0)),
-        "certs":       score_certs(features.get("cert_points",0)),
-        "impact":      score_impact(features.get("metrics_hits",0)),
-        "semantic":    score_semantic(features.get("cosine",0)),
-        "doc_quality": score_doc_quality(features.get("tokens",0), features.get("sections_present",0), features.get("dup_rate",0)),
-        "contact":     score_contact(features.get("has_email",False), features.get("has_phone",False)),
-        "context":     score_context(features.get("remote_align",0), features.get("comp_score"))
+        name: fn(features if name in active else FEATURE_DEFAULTS)
+        for name, fn in _SUBSCORES.items()
     }
 
-def evaluate_resume_from_doc(doc: dict, has_experience: bool = None) -> dict:
+def evaluate_resume_from_doc(doc: dict, has_experience: bool = None, features: dict = None, store=None,
+                             require: Iterable[str] = (), parallel: bool = False, timings: dict = None,
+                             deadline=None) -> dict:
     """
     Avalia currículo completo.
     
     Args:
         doc: Documento do currículo
         has_experience: True/False para forçar classificação, None para usar ML automático
+        features: Features já extraídas (ex.: via build_features_batch); pula a extração
+        store: FeatureStore consultado antes de extrair (ver get_feature_store)
+        require: Subscores/features extras a avaliar mesmo com peso zero (ex.: "semantic")
+        parallel: Etapas independentes da extração em paralelo (ver build_features_batch)
+        timings: Dict preenchido com o tempo de cada etapa da extração em ms
+        deadline: Orçamento em ms ou Deadline para a extração (ver build_features_batch)
     
     Returns:
         Dict com features, subscores, score final e explicação
     """
-    feats = build_features_from_doc(doc, has_experience)
+    feats = features if features is not None else build_features_from_doc(
+        doc, has_experience, store=store, require=require, parallel=parallel, timings=timings,
+        deadline=deadline)
     
     # Usar classificação automática se disponível
     detected_experience = feats.get("has_experience", False)
     agent = Agent.EXPERIENCED if detected_experience else Agent.NOEXP
     
-    subs  = build_subscores(feats, agent)
-    result = evaluate(agent, subs)
+    rubric = get_rubric()  # mesma versão do rubric em subscores, final e label
+    subs  = build_subscores(feats, agent, require, rubric)
+    result = evaluate(agent, subs, evaluated=active_subscores(agent, require, rubric), rubric=rubric)
     
     return { 
         "features": feats, 
@@ -417,3 +544,24 @@ def evaluate_resume_from_doc(doc: dict, has_experience: bool = None) -> dict:
             **feats.get("classification", {})
         }
     }
+
+def evaluate_features_batch(features_list: list, require: Iterable[str] = ()) -> list:
+    """
+    Versão em lote de evaluate_resume_from_doc para features já extraídas:
+    o rubric roda vetorizado (batch_engine), com o mesmo resultado por currículo.
+    """
+    from .batch_engine import evaluate_batch, batch_rows
+
+    rows = batch_rows(evaluate_batch(features_list, require))
+    return [
+        {
+            "features": feats,
+            **row,
+            "experience_classification": {
+                "is_experienced": feats.get("has_experience", False),
+                "agent_used": row["agent"],
+                **feats.get("classification", {})
+            }
+        }
+        for feats, row in zip(features_list, rows)
+    ]
@@ -13,8 +13,9 @@ from threading import Thread
 # Adicionar root ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.scoring.hybrid_scorer import HybridScorer
+from app.scoring.hybrid_scorer import get_hybrid_scorer
 from app.scoring.use_case import build_features_from_doc
+from app.scoring.budget import interactive_deadline
 
 try:
     import PyPDF2
@@ -290,15 +291,16 @@ class ResumAIApp:
             
             # 3. Extrair features
             self.append_result("🔍 Analisando conteúdo...\n\n")
-            features = build_features_from_doc(doc)
+            deadline = interactive_deadline()  # ANALYZE_DEADLINE_MS, compartilhado com o scoring
+            features = build_features_from_doc(doc, deadline=deadline)
             doc['has_experience'] = features.get('has_experience', False)
             
             # 4. Executar scoring
             self.append_result("⚙️ Calculando scores...\n\n")
             if not self.scorer:
-                self.scorer = HybridScorer()
+                self.scorer = get_hybrid_scorer()
             
-            result = self.scorer.score(doc)
+            result = self.scorer.score(doc, features=features, deadline=deadline)
             
             # 5. Mostrar apenas resumo final
             self.show_final_summary(features, result)
@@ -378,7 +380,11 @@ class ResumAIApp:
         self.append_result(f"   • Certificações: {num_certs}\n")
         
         self.append_result(f"   • Métricas quantificáveis: {features.get('metrics_hits', 0)}\n\n")
-        
+
+        # Etapas simplificadas pelo orçamento de latência (score aproximado)
+        if result.get('degraded'):
+            self.append_result(f"   ⏱️ Análise rápida (aproximada): {', '.join(result['degraded'])}\n\n", "info")
+
         # Pontos fortes e fracos
         self.show_strengths_weaknesses(subscores)
         
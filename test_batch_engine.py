@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do rubric vetorizado (app/scoring/batch_engine.py): cada linha de
+evaluate_batch / rescore_batch precisa ser idêntica ao caminho escalar
+(build_subscores + engine.evaluate, via evaluate_resume_from_doc).
+
+    python -m pytest test_batch_engine.py
+"""
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("numpy")
+
+from app.scoring.batch_engine import rescore_batch, batch_rows
+from app.scoring.config import Agent
+from app.scoring.engine import evaluate
+from app.scoring.use_case import evaluate_features_batch, evaluate_resume_from_doc
+
+SKILLS = ["python", "sql", "excel", "react", "aws", "scrum", "figma", "java", "docker", "git",
+          "linux", "power bi", "sap", "go"]
+WORDS = ["python", "5 anos", "sênior", "avançado", "com", "experiência", "\n", "sql", "3 years"]
+
+
+def _random_features(rng):
+    # Inteiros pequenos e anos em cima das faixas (0, 1, 2, 3, 5) para cobrir as bordas
+    return {
+        "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 30))),
+        "skills": rng.sample(SKILLS, rng.randint(0, len(SKILLS))),
+        "years_total": rng.choice([0, 0.5, 1, 1.5, 2, 2.5, 3, 4, 5, 7.5, 12, None]),
+        "seniority_align": rng.choice([0, 0.25, 0.5, 1.0, None]),
+        "project_hits": rng.randint(0, 6),
+        "cert_points": rng.choice([0, 0.1, 0.2, 0.35, 0.6, 1.0, 1.4]),
+        "metrics_hits": rng.randint(0, 8),
+        "cosine": rng.choice([0.0, 0.3, 0.75, 1.0, None]),
+        "tokens": rng.choice([0, 50, 120, 300, 800, 2000, 5000]),
+        "sections_present": rng.randint(0, 10),
+        "dup_rate": rng.choice([0.0, 0.05, 0.2, 0.6]),
+        "has_email": rng.random() < 0.7,
+        "has_phone": rng.random() < 0.6,
+        "remote_align": rng.choice([0.0, 0.5, 1.0]),
+        "comp_score": rng.choice([None, 0.0, 0.4, 1.0]),
+        "has_experience": rng.random() < 0.5,
+    }
+
+
+@pytest.mark.parametrize("require", [(), ("semantic",)])
+def test_evaluate_batch_matches_scalar_path(require):
+    rng = random.Random(42)
+    features_list = [_random_features(rng) for _ in range(1500)]
+    batch = evaluate_features_batch(features_list, require)
+    for feats, row in zip(features_list, batch):
+        scalar = evaluate_resume_from_doc({}, features=feats, require=require)
+        assert row["agent"] == scalar["agent"]
+        assert row["scores"] == scalar["scores"], feats
+        assert row["explain"] == scalar["explain"], feats
+
+
+def test_rescore_batch_matches_engine_evaluate():
+    rng = random.Random(7)
+    by_blocks, agents = [], []
+    for _ in range(500):
+        by_blocks.append({name: round(rng.random(), rng.randint(1, 6)) for name in
+                          ("skills", "experience", "projects", "certs", "impact", "semantic",
+                           "doc_quality", "contact", "context")})
+        agents.append(rng.choice([Agent.EXPERIENCED.value, Agent.NOEXP.value]))
+    rows = batch_rows(rescore_batch(by_blocks, agents))
+    for subs, agent, row in zip(by_blocks, agents, rows):
+        scalar = evaluate(Agent(agent), subs)
+        assert row["scores"]["final"] == scalar["scores"]["final"]
+        assert row["scores"]["label"] == scalar["scores"]["label"]
+        assert row["explain"] == scalar["explain"]
+
+
+def test_empty_batch():
+    assert evaluate_features_batch([]) == []
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do orçamento de latência (app/scoring/budget.py): a chamada fria fica fora
+da média e uma etapa pulada volta a rodar para a estimativa poder cair.
+
+    python -m pytest test_budget.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.scoring import budget
+from app.scoring.budget import Deadline, estimate, observe
+
+
+@pytest.fixture(autouse=True)
+def fresh_budget(monkeypatch):
+    """Estimativas iniciais e todos os modelos carregados."""
+    monkeypatch.setattr(budget, "_estimates", dict(budget._estimates))
+    monkeypatch.setattr(budget, "_observed", set())
+    monkeypatch.setattr(budget, "_skipped", {})
+    monkeypatch.setattr(budget.registry, "is_loaded", lambda name: True)
+    monkeypatch.setattr(budget.registry, "has_failed", lambda name: False)
+
+
+def test_cold_call_is_not_averaged():
+    before = estimate("classifier")
+    observe("classifier", 900.0)
+    assert estimate("classifier") == before
+    observe("classifier", 60.0)
+    assert estimate("classifier") == pytest.approx(before + budget._ALPHA * (60.0 - before))
+
+
+def test_skipped_stage_is_probed_and_recovers():
+    observe("classifier", 900.0)   # fria, ignorada
+    observe("classifier", 900.0)   # lenta de verdade: não cabe em 200 ms
+    assert estimate("classifier") > 200.0
+
+    runs = 0
+    for _ in range(budget._PROBE_EVERY * 10):
+        if "classifier" in Deadline(200).plan(["classifier"]):
+            runs += 1
+            observe("classifier", 50.0)  # o modelo já está quente
+        if estimate("classifier") < 150.0:
+            break
+    assert runs >= 1
+    assert "classifier" in Deadline(200).plan(["classifier"])
+
+
+def test_probe_after_timeout(monkeypatch):
+    budget._estimates["classifier"] = 10_000.0
+    assert Deadline(200).plan(["classifier"]) == set()
+    monkeypatch.setattr(budget, "_PROBE_AFTER_S", 0.0)
+    deadline = Deadline(200)
+    assert deadline.plan(["classifier"]) == {"classifier"}
+    assert deadline.degraded == []
+
+
+def test_unloaded_model_is_never_probed(monkeypatch):
+    monkeypatch.setattr(budget.registry, "is_loaded", lambda name: False)
+    monkeypatch.setattr(budget, "_warm", lambda model: None)
+    for _ in range(budget._PROBE_EVERY * 2):
+        deadline = Deadline(10_000)
+        assert deadline.plan(["classifier"]) == set()
+        assert deadline.degraded == ["classifier"]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes da detecção de certificações (app/nlp/certifications.py): a passada única
+sobre CERT_TABLE precisa dar os mesmos pontos do extract_cert_points antigo
+(um re.findall por padrão) e a mesma feature cert_count do modelo não-supervisionado.
+
+    python -m pytest test_certifications.py
+"""
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.nlp.certifications import (
+    CERT, CERT_TABLE, GENERIC, LINE, count_cert_keywords, extract_cert_points, scan_certs,
+)
+
+FRAGMENTS = [
+    "AWS Cloud Practitioner", "AWS SAA", "AZ-900", "DP-203", "Security+", "Google Ads Certificação",
+    "Google Analytics 4", "HubSpot Academy", "Adobe Certified", "UX Design Certification", "PMP",
+    "PMBOK", "Scrum Master PSM", "Prince2", "ITIL", "CRC", "CPA", "Certificação Anbima", "TOEFL",
+    "Fluente em inglês", "Certificado de", "Curso de Python", "course in data",
+    "Certificações", "Cursos", "formação complementar", "treinamentos", "Coursera", "Udemy",
+    "Alura", "DIO", "LinkedIn Learning", "certified", "azure", "google cloud",
+    "- Curso", "• certificado", "1. curso", "2021 - Certificação", "Microsoft", "Oracle",
+    "\n", "\n- ", "\n• ", "\n3. ", " - ", "e", "com", "2019", "Python",
+]
+
+# extract_cert_points antes da tabela (CERT_MAP + padrões de linha + plataformas)
+_OLD_SECTION_WORDS = ["certificações", "certificados", "cursos", "certifications",
+                      "certificates", "courses", "formação complementar", "treinamentos"]
+_OLD_PLATFORMS = ["coursera", "udemy", "alura", "rocketseat", "dio", "edx",
+                  "linkedin learning", "pluralsight", "udacity", "skillshare"]
+_OLD_KEYWORDS = ['certificação', 'certificado', 'certified', 'certificate', 'aws', 'azure', 'google cloud']
+
+
+def _old_cert_points(text):
+    if not text:
+        return 0.0
+    pts = 0.0
+    text_lower = text.lower()
+    for _, _, pat, val, kind in CERT_TABLE:
+        if kind in (CERT, GENERIC):
+            pts += len(re.findall(pat, text, flags=re.I)) * val
+    if any(k in text_lower for k in _OLD_SECTION_WORDS):
+        cert_count = sum(len(re.findall(pat, text_lower, re.MULTILINE))
+                         for _, _, pat, _, kind in CERT_TABLE if kind == LINE)
+        pts += cert_count * 0.2
+    for platform in _OLD_PLATFORMS:
+        if platform in text_lower:
+            pts += 0.1
+    return min(pts, 1.0)
+
+
+def _old_cert_count(text):
+    return min(sum(1 for k in _OLD_KEYWORDS if k in text.lower()), 5)
+
+
+def _random_texts(n, seed=3):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 30))) for _ in range(n)]
+
+
+def test_points_match_old_extractor():
+    for text in _random_texts(2000):
+        assert extract_cert_points(text) == _old_cert_points(text), text
+
+
+def test_keyword_count_matches_old_feature():
+    for text in _random_texts(1000, seed=5):
+        assert count_cert_keywords(text) == _old_cert_count(text), text
+
+
+def test_scan_result():
+    res = scan_certs("Certificações\n- AWS Cloud Practitioner\n- Security+ (2022)\nCoursera")
+    assert res.certs == ["AWS Cloud Practitioner", "Security+"]
+    assert res.has_section
+    assert 0.0 < res.points <= 1.0
+    assert scan_certs("").points == 0.0
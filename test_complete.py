@@ -11,7 +11,7 @@ from typing import Dict, Any
 # Adicionar root ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.scoring.hybrid_scorer import HybridScorer
+from app.scoring.hybrid_scorer import get_hybrid_scorer
 from app.scoring.use_case import build_features_from_doc, build_subscores
 
 try:
@@ -150,7 +150,7 @@ def test_complete_pipeline(resume_path: str):
     # 3. Classificação de Experiência
     print_section("3️⃣ Classificação de Experiência (BERT)")
     try:
-        scorer = HybridScorer()
+        scorer = get_hybrid_scorer()
         result = scorer.score(doc)
         
         # Usar has_experience das features (mais confiável)
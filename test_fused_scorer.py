@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do modelo fundido (app/ml/fused_scorer.py): o FusedScorer carregado do .npz
+precisa dar os mesmos clusters, anomalias e scores do UnsupervisedResumeScorer (sklearn).
+
+    python -m pytest test_fused_scorer.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from app.ml.fused_scorer import FusedScorer, export_fused, load_unsupervised_scorer
+from app.ml.unsupervised_scoring import UnsupervisedResumeScorer
+
+N_FEATURES = 12
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    rng = np.random.default_rng(0)
+    # Três grupos com escalas diferentes, como features de currículo (contagens, anos, flags)
+    centers = rng.uniform(0, 10, (3, N_FEATURES))
+    X = np.vstack([c + rng.standard_normal((200, N_FEATURES)) * rng.uniform(0.2, 3, N_FEATURES)
+                   for c in centers])
+    model = UnsupervisedResumeScorer(n_clusters=4, n_components=5)
+    model.fit(X, [f"f{i}" for i in range(N_FEATURES)])
+    return model
+
+
+@pytest.fixture(scope="module")
+def fused(scorer, tmp_path_factory):
+    path = tmp_path_factory.mktemp("fused") / "unsupervised_scorer.npz"
+    export_fused(scorer, str(path))
+    return FusedScorer.load(str(path))
+
+
+def _rows(scorer, n, seed):
+    rng = np.random.default_rng(seed)
+    return scorer.scaler.mean_ + rng.standard_normal((n, N_FEATURES)) * scorer.scaler.scale_ * 2
+
+
+def test_fused_matches_sklearn(scorer, fused):
+    X = _rows(scorer, 3000, seed=1)
+    a, b = scorer.predict_scores(X), fused.predict_scores(X)
+    assert np.array_equal(a.clusters, b.clusters)
+    assert np.array_equal(a.clusters, scorer.kmeans.predict(scorer.pca.transform(scorer.scaler.transform(X))))
+    assert np.abs(a.anomaly - b.anomaly).max() < 1e-9
+    assert np.abs(a.scores - b.scores).max() < 1e-9
+    assert a.labels() == b.labels()
+
+
+def test_predict_score_is_row_of_predict_scores(scorer, fused):
+    X = _rows(scorer, 20, seed=2)
+    batch = fused.predict_scores(X)
+    for i in range(len(X)):
+        score, meta = fused.predict_score(X[i])
+        # Uma linha e o lote podem passar por kernels BLAS diferentes: igualdade até o ulp
+        assert score == pytest.approx(batch.scores[i], rel=1e-12)
+        expected = batch.metadata(i)
+        assert meta.pop("score_components") == pytest.approx(expected.pop("score_components"), rel=1e-12)
+        assert meta == pytest.approx(expected, rel=1e-12)
+        assert meta["cluster_id"] == scorer.predict_score(X[i])[1]["cluster_id"]
+
+
+def test_load_prefers_newer_npz(scorer, tmp_path):
+    pkl = tmp_path / "model.pkl"
+    scorer.save(str(pkl))
+    assert isinstance(load_unsupervised_scorer(str(pkl)), UnsupervisedResumeScorer)
+    export_fused(scorer, str(pkl.with_suffix(".npz")))
+    assert isinstance(load_unsupervised_scorer(str(pkl)), FusedScorer)
@@ -2,7 +2,7 @@
 """
 Testa sistema híbrido de scoring
 """
-from app.scoring.hybrid_scorer import HybridScorer
+from app.scoring.hybrid_scorer import get_hybrid_scorer
 from app.db.mongo import get_db
 import random
 import numpy as np
@@ -14,7 +14,7 @@ def main():
     print("=" * 80)
     
     print("\n📦 Carregando scorer híbrido...")
-    scorer = HybridScorer()
+    scorer = get_hybrid_scorer()
     
     print("\n📥 Carregando currículos...")
     db = get_db()
@@ -54,11 +54,19 @@ def main():
     
     print(f"\n🔬 Avaliando {len(sample)} currículos...\n")
     
+    # Features, ML e rubric em lote para toda a amostra
+    try:
+        batch = scorer.score_batch(sample)
+    except Exception as e:
+        # Um currículo malformado derruba o lote: avalia um a um (o erro aparece no loop abaixo)
+        print(f"⚠️  Erro no lote, avaliando individualmente: {e}\n")
+        batch = [None] * len(sample)
+    
     results = []
-    for i, doc in enumerate(sample, 1):
+    for i, (doc, result) in enumerate(zip(sample, batch), 1):
         try:
-            result = scorer.score(doc)
-            
+            if result is None:
+                result = scorer.score(doc)
             years = doc.get('years_experience', 0) or 0
             skills = len(doc.get('skills', []))
             
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do registro de modelos (app/ml/model_registry.py): carga única, falha
+registrada dentro do prazo de retry e nova tentativa depois dele.
+
+    python -m pytest test_model_registry.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.ml import model_registry
+from app.ml.model_registry import ModelLoadError, ModelRegistry
+
+
+class FlakyLoader:
+    """Falha nas primeiras `failures` chamadas."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise FileNotFoundError("models/unsupervised_scorer.pkl")
+        return object()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(model_registry.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_loads_once():
+    reg = ModelRegistry()
+    loader = FlakyLoader(0)
+    reg.register("m", loader)
+    assert reg.get("m") is reg.get("m")
+    assert loader.calls == 1
+    assert reg.is_loaded("m") and not reg.has_failed("m")
+
+
+def test_failure_is_cached_until_retry(clock):
+    reg = ModelRegistry(retry_seconds=60)
+    loader = FlakyLoader(1)
+    reg.register("m", loader)
+
+    for _ in range(3):
+        with pytest.raises(ModelLoadError):
+            reg.get("m")
+    assert loader.calls == 1
+    assert reg.has_failed("m")
+
+    clock[0] += 61
+    assert not reg.has_failed("m")
+    assert reg.get("m") is not None
+    assert loader.calls == 2
+    assert reg.is_loaded("m") and not reg.has_failed("m")
+    assert reg.stats()["m"]["error"] is None
+
+
+def test_failed_retry_starts_a_new_window(clock):
+    reg = ModelRegistry(retry_seconds=60)
+    loader = FlakyLoader(2)
+    reg.register("m", loader)
+    with pytest.raises(ModelLoadError):
+        reg.get("m")
+    clock[0] += 61
+    with pytest.raises(ModelLoadError):
+        reg.get("m")
+    assert reg.has_failed("m")
+    clock[0] += 30
+    with pytest.raises(ModelLoadError):
+        reg.get("m")
+    assert loader.calls == 2
+
+
+def test_unload_clears_the_error():
+    reg = ModelRegistry(retry_seconds=3600)
+    loader = FlakyLoader(1)
+    reg.register("m", loader)
+    with pytest.raises(ModelLoadError):
+        reg.get("m")
+    reg.unload("m")
+    assert reg.get("m") is not None
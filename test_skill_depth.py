@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do índice de profundidade de skills (app/scoring/skill_depth.py): os bônus
+precisam ser os mesmos dos regex antigos "skill.*N anos" + janela de ±50 caracteres.
+
+    python -m pytest test_skill_depth.py
+"""
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("numpy")
+
+from app.scoring.subscores import score_skills
+from app.scoring.use_case import score_skills_with_depth
+
+SKILLS = ["python", "java", "sql", "c++", "react", "aws", "excel", "go"]
+FRAGMENTS = SKILLS + [
+    "5 anos", "3 years", "1 ano", "10anos", "avançado", "expert", "sênior", "Senior",
+    "especialista", "proficiente", "de", "com", "experiência", "2019", "\n", "\n\n", "  ",
+    "javascript", "golang", "PYTHON", "Java:", "12",
+]
+
+
+# Versões antigas (antes do SkillDepthIndex)
+def _old_score_skills(cv_skills, must=None, nice=None, text=""):
+    cv = set(map(str.lower, cv_skills or []))
+    m = set(map(str.lower, must or []))
+    n = set(map(str.lower, nice or []))
+    if not m and not n:
+        count_norm = min(len(cv) / 12.0, 1.0)
+        depth = 0.0
+        if text:
+            for s in cv:
+                if re.search(rf"{re.escape(s)}.*\b(\d+)\s*(anos|years)\b", text, flags=re.I):
+                    depth += 0.03
+                skill_pos = text.lower().find(s.lower())
+                if skill_pos >= 0:
+                    skill_context = text[max(0, skill_pos - 50):skill_pos + 50]
+                    if any(kw in skill_context.lower() for kw in ["avançado", "expert", "sênior", "senior"]):
+                        depth += 0.02
+        return max(0.0, min(1.0, count_norm + depth))
+    hard = len(cv & m) / len(m) if m else 0.0
+    soft = len(cv & n) / len(n) if n else 0.0
+    depth = 0.0
+    if text:
+        for s in cv & (m | n):
+            if re.search(rf"{re.escape(s)}.*\b(\d+)\s*(anos|years)\b", text, flags=re.I):
+                depth += 0.05
+    return max(0.0, min(1.0, 2 * hard + soft + depth))
+
+
+def _old_score_skills_with_depth(cv_skills, text):
+    if not cv_skills:
+        return 0.0
+    total = 0.0
+    for skill in cv_skills:
+        years_bonus = 0.3 if re.search(rf"{re.escape(skill)}.*?(\d+)\s*(anos?|years?)", text, flags=re.I) else 0.0
+        pos = text.lower().find(skill.lower())
+        context = text[max(0, pos - 50):pos + 50]
+        keywords = ["avançado", "expert", "especialista", "sênior", "senior", "proficiente"]
+        context_bonus = 0.2 if any(kw in context.lower() for kw in keywords) else 0.0
+        total += 1.0 * (1.0 + years_bonus + context_bonus)
+    return min(total / 12.0, 1.0)
+
+
+def _cases(n, seed=13):
+    rng = random.Random(seed)
+    for _ in range(n):
+        text = " ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 60)))
+        skills = rng.sample(SKILLS, rng.randint(0, len(SKILLS)))
+        yield text, skills, rng
+
+
+def test_score_skills_matches_regex_version():
+    for text, skills, rng in _cases(1500):
+        assert score_skills(skills, text=text) == _old_score_skills(skills, text=text), (text, skills)
+        must = rng.sample(SKILLS, 2)
+        assert score_skills(skills, must=must, text=text) == _old_score_skills(skills, must=must, text=text)
+
+
+def test_score_skills_with_depth_matches_regex_version():
+    for text, skills, _ in _cases(1500, seed=17):
+        assert score_skills_with_depth(skills, text) == _old_score_skills_with_depth(skills, text), (text, skills)
+
+
+def test_years_must_be_on_the_same_line():
+    assert score_skills(["python"], text="python 5 anos") > score_skills(["python"], text="python\n5 anos")
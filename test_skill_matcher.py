@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do matcher de skills (Aho-Corasick): sinônimos, fronteiras de token e
+resolução de matches sobrepostos (leftmost-longest).
+
+    python -m pytest test_skill_matcher.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.nlp.skill_matcher import SkillMatcher, canonicalize_skills, find_skills
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("node js developer", ["node.js"]),
+    ("vue js e react js", ["react", "vue.js"]),
+    ("next js", ["next.js"]),
+    ("angular js", ["angular"]),
+    ("javascript e js", ["javascript"]),
+    ("Node.js, nodejs e NODE", ["node.js"]),
+])
+def test_js_variants_do_not_add_javascript(text, expected):
+    assert find_skills(text) == expected
+
+
+def test_overlapping_matches_keep_the_longest():
+    assert find_skills("react native e sql server") == ["react native", "sql server"]
+    assert find_skills("gestão de custos") == ["gestão de custos"]
+
+
+def test_token_boundaries():
+    assert find_skills("c++ e c#") == ["c#", "c++"]
+    assert find_skills("front-end e back-end") == ["back-end", "front-end"]
+    assert find_skills("t-sql") == []
+    assert find_skills("python-django") == []
+    assert find_skills("pythonista") == []
+    assert find_skills("ci/cd") == ["ci/cd"]
+
+
+def test_accents_and_case_are_folded():
+    assert find_skills("INTELIGENCIA ARTIFICIAL e Ciência de Dados") == [
+        "ciência de dados", "inteligência artificial"]
+
+
+def test_canonicalize_skills():
+    assert canonicalize_skills(["NodeJS", "k8s", "Postgres", "habilidade x"]) == [
+        "habilidade x", "kubernetes", "node.js", "postgresql"]
+
+
+def test_finditer_is_non_overlapping_and_ordered():
+    matcher = SkillMatcher(["ab", "abc", "bcd", "d"])
+    assert list(matcher.finditer("abc d")) == [(0, 3, "abc"), (4, 5, "d")]
+    assert list(matcher.finditer("ab bcd")) == [(0, 2, "ab"), (3, 6, "bcd")]
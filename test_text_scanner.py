@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do scanner único de padrões (app/nlp/text_scanner.py): o resultado precisa
+ser o mesmo de buscar cada regex separadamente (um re.search / re.findall por padrão).
+
+    python -m pytest test_text_scanner.py
+"""
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.nlp.text_scanner import (
+    CONTACT_PATTERNS, PROJECT_PATTERNS, SECTION_PATTERNS, PatternScanner, normalize, scan,
+)
+
+ALL_PATTERNS = SECTION_PATTERNS + PROJECT_PATTERNS + CONTACT_PATTERNS
+
+FRAGMENTS = [
+    "Experiência", "experiencia profissional", "Formação", "Skills:", "Projetos", "portfolio",
+    "meuportfolio.dev", "Certificações", "Idiomas", "Resumo", "sobre mim", "Conquistas",
+    "projeto de", "projeto  em", "desenvolvi um", "desenvolvimento de sistema", "criação de sistema",
+    "implementação de", "construção da", "atuei no desenvolvimento", "developed a system",
+    "built the app", "project for", "TCC", "projeto final", "projeto pessoal", "github.com/x",
+    "gitlab.com/y", "joao.silva@email.com", "(11) 98765-4321", "11 98765 -4321",
+    "+55 11 98765-4321", "11987654321", "2019-2023", "123", "Python", "e", "com", "na",
+    "\n", "\t", ".", ",", "-", "(", ")", "+",
+]
+
+
+def _random_texts(n, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40))) for _ in range(n)]
+
+
+def _reference_hits(text):
+    norm = normalize(text)
+    return frozenset(name for name, rx in ALL_PATTERNS if re.search(rx, norm))
+
+
+def test_scan_matches_one_search_per_pattern():
+    for text in _random_texts(2000):
+        assert scan(text).hits == _reference_hits(text), text
+
+
+def test_counts_match_findall():
+    scanner = PatternScanner(ALL_PATTERNS, start_guard=r"[\d(+]|portfolio")
+    for text in _random_texts(500, seed=11):
+        norm = normalize(text)
+        expected = {name: len(re.findall(rx, norm)) for name, rx in ALL_PATTERNS}
+        expected = {name: n for name, n in expected.items() if n}
+        assert scanner.counts(norm) == expected, text
+
+
+def test_derived_fields():
+    res = scan("Experiência\nFormação\nProjetos: projeto de TCC em github.com/joao\n"
+               "joao@email.com (11) 98765-4321")
+    assert res.sections_count == 3
+    assert res.project_hits == 3
+    assert res.has_email and res.has_phone
+    assert scan("").hits == frozenset()
@@ -14,8 +14,9 @@ import sys
 # Adicionar root ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.scoring.hybrid_scorer import HybridScorer
+from app.scoring.hybrid_scorer import get_hybrid_scorer
 from app.scoring.use_case import build_features_from_doc
+from app.scoring.budget import interactive_deadline
 
 try:
     import PyPDF2
@@ -31,15 +32,9 @@ app.config['UPLOAD_FOLDER'] = 'uploads'
 # Criar pasta de uploads
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-# Instância global do scorer
-scorer = None
-
 def get_scorer():
-    """Retorna instância singleton do scorer"""
-    global scorer
-    if scorer is None:
-        scorer = HybridScorer()
-    return scorer
+    """Retorna instância compartilhada do scorer (registro de modelos)"""
+    return get_hybrid_scorer()
 
 
 def extract_text_from_pdf(pdf_path: str) -> str:
@@ -134,16 +129,21 @@ def analyze():
                 "job_description": None
             }
             
+            # Orçamento de latência compartilhado por features e scoring (ANALYZE_DEADLINE_MS)
+            deadline = interactive_deadline()
+            
             # Extrair features
             print("🔍 Extraindo features...")
-            features = build_features_from_doc(doc)
+            features = build_features_from_doc(doc, deadline=deadline)
             doc['has_experience'] = features.get('has_experience', False)
             print(f"✅ Features extraídas: {len(features.get('skills', []))} skills, {features.get('years_total', 0):.1f} anos")
             
             # Executar scoring
             print("⚙️ Executando scoring...")
-            result = get_scorer().score(doc)
+            result = get_scorer().score(doc, features=features, deadline=deadline)
             print(f"✅ Score calculado: {result.get('score', 0):.1f}/100")
+            if result.get('degraded'):
+                print(f"⏱️ Etapas simplificadas pelo orçamento de latência: {', '.join(result['degraded'])}")
             
             # Preparar resposta
             response_data = {
@@ -160,7 +160,8 @@ def analyze():
                 'result': {
                     'score': float(result.get('score', 0)),
                     'label': str(result.get('label', 'Desconhecido')),
-                    'rb_subscores': result.get('rb_subscores', {})
+                    'rb_subscores': result.get('rb_subscores', {}),
+                    'degraded': result.get('degraded', [])
                 }
             }
             